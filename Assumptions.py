@@ -1,40 +1,48 @@
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, numbers
 from openpyxl.utils import get_column_letter
+from Horizon import DEFAULT_HORIZON
+from Styles import TITLE_FONT, BOLD_FONT, YELLOW_FILL, PERCENT, apply
 
-def create_assumptions(wb):
-    """Create and format the Assumptions sheet."""
+def create_assumptions(wb, overrides=None, horizon=DEFAULT_HORIZON):
+    """Create and format the Assumptions sheet.
+
+    overrides maps assumption labels (e.g. "Tax Rate") to values that
+    replace the defaults below. The base year and forecast period come
+    from the forecast horizon.
+    """
     print("Creating Assumptions sheet...")
+    overrides = dict(overrides or {})
     
     # Get the Assumptions sheet
     ws = wb["Assumptions"]
     
     # Set the title
     ws['A1'] = "MODEL ASSUMPTIONS"
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].font = TITLE_FONT
     
     # General Assumptions section
     ws['A3'] = "General Assumptions"
-    ws['A3'].font = Font(bold=True)
+    ws['A3'].font = BOLD_FONT
     
     # General assumptions data
     assumptions = [
-        ("Base Year", 2025),
-        ("Forecast Period (Years)", 5),
+        ("Base Year", horizon.start),
+        ("Forecast Period (Years)", horizon.years),
         ("Tax Rate", 0.24),
         ("Inflation Rate", 0.03)
     ]
     
     for i, (label, value) in enumerate(assumptions, 4):
+        value = overrides.pop(label, value)
         ws[f'A{i}'] = label
         ws[f'B{i}'] = value
         
         # Format percentages
         if "Rate" in label and value < 1:
-            ws[f'B{i}'].number_format = '0.00%'
+            apply(ws[f'B{i}'], number_format=PERCENT)
     
     # Revenue Growth Assumptions section
     ws['A10'] = "Revenue Growth Assumptions"
-    ws['A10'].font = Font(bold=True)
+    ws['A10'].font = BOLD_FONT
     
     # Revenue growth data
     growth_assumptions = [
@@ -44,13 +52,14 @@ def create_assumptions(wb):
     ]
     
     for i, (label, value) in enumerate(growth_assumptions, 11):
+        value = overrides.pop(label, value)
         ws[f'A{i}'] = label
         ws[f'B{i}'] = value
-        ws[f'B{i}'].number_format = '0.00%'
+        apply(ws[f'B{i}'], number_format=PERCENT)
     
     # Cost Assumptions section
     ws['A16'] = "Cost Assumptions"
-    ws['A16'].font = Font(bold=True)
+    ws['A16'].font = BOLD_FONT
     
     # Cost assumptions data
     cost_assumptions = [
@@ -60,22 +69,25 @@ def create_assumptions(wb):
     ]
     
     for i, (label, value) in enumerate(cost_assumptions, 17):
+        value = overrides.pop(label, value)
         ws[f'A{i}'] = label
         ws[f'B{i}'] = value
-        ws[f'B{i}'].number_format = '0.00%'
+        apply(ws[f'B{i}'], number_format=PERCENT)
     
     # Discount Rate
     ws['A22'] = "Discount Rate (WACC)"
-    ws['B22'] = 0.1
+    ws['B22'] = overrides.pop("Discount Rate (WACC)", 0.1)
     ws['B22'].number_format = '0.00%'
     
+    if overrides:
+        raise ValueError(f"Unknown assumptions: {', '.join(sorted(overrides))}")
+    
     # Set column widths
     ws.column_dimensions['A'].width = 25
     ws.column_dimensions['B'].width = 15
     
     # Add a light yellow background to the section headers
-    section_fill = PatternFill(start_color='FFF2CC', end_color='FFF2CC', fill_type='solid')
     for row in [3, 10, 16]:
-        ws[f'A{row}'].fill = section_fill
+        apply(ws[f'A{row}'], fill=YELLOW_FILL)
     
     print("Assumptions sheet created successfully")
\ No newline at end of file
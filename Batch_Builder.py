@@ -0,0 +1,140 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+
+def _build_one(job):
+    """Worker: build and save one company workbook, returning its filename."""
+    # Imported in the worker so the parent process stays light
+    from main import create_financial_model
+    from Horizon import Horizon
+    from Build_Cache import SheetCache
+    from Model_Inputs import ModelInputs
+
+    inputs = job.get("inputs")
+    if isinstance(inputs, dict):
+        inputs = ModelInputs(source=job["filename"], **inputs)
+
+    # Keep the per-sheet progress output of the builders out of the batch log
+    create_financial_model(job["filename"], assumptions=job.get("assumptions"),
+                           streaming=job.get("streaming", False),
+                           horizon=Horizon(**job.get("horizon", {})),
+                           bond=job.get("bond"), compact_bond=job.get("compact_bond", False),
+                           quiet=True, cache=SheetCache(job["cache"]) if job.get("cache") else None,
+                           inputs=inputs, export=job.get("export"), compresslevel=job.get("compresslevel"),
+                           cached_values=job.get("cached_values", False))
+    return job["filename"]
+
+
+def print_progress(done, total, filename, error):
+    """Default progress callback: one line per finished workbook."""
+    status = "FAILED: " + error.splitlines()[-1] if error else "ok"
+    print(f"[{done}/{total}] {filename} {status}")
+
+
+def build_many(jobs, max_workers=None, max_tasks_per_child=25, progress=print_progress):
+    """Build one workbook per job on a pool of worker processes.
+
+    Each job is a dict with a "filename", optional "inputs" (a
+    Model_Inputs.ModelInputs or a mapping of its fields), optional
+    "assumptions" overrides, an optional "horizon" ({"start", "periods", "granularity"}),
+    optional "bond" terms with a "compact_bond" flag, an optional
+    "streaming" flag, an optional "cache" directory shared by the
+    workers (see main.build_workbook) and an optional "export" .parquet
+    or .arrow file for the computed statements, and an optional zip
+    "compresslevel" (0-9). Workers are replaced after
+    max_tasks_per_child workbooks so their memory cannot creep up over a
+    long batch, and only a few jobs per worker are in flight at once.
+    Failed jobs are reported and skipped; the batch keeps going.
+
+    Returns {"succeeded": [filenames], "failed": [(filename, traceback)]}.
+    """
+    jobs = list(jobs)
+    total = len(jobs)
+    max_workers = max_workers or os.cpu_count() or 1
+    results = {"succeeded": [], "failed": []}
+
+    # Worker recycling needs the spawn start method rather than fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             max_tasks_per_child=max_tasks_per_child) as pool:
+        pending = {}
+        queue = iter(jobs)
+        done = 0
+
+        def submit_next():
+            job = next(queue, None)
+            if job is not None:
+                pending[pool.submit(_build_one, job)] = job
+
+        for _ in range(max_workers * 2):
+            submit_next()
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job = pending.pop(future)
+                done += 1
+                try:
+                    results["succeeded"].append(future.result())
+                    error = None
+                except Exception as exc:
+                    error = "".join(traceback.format_exception(exc))
+                    results["failed"].append((job.get("filename"), error))
+                if progress:
+                    progress(done, total, job.get("filename"), error)
+                submit_next()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build one financial model workbook per company.")
+    parser.add_argument("jobs", nargs="?",
+                        help='JSON file with a list of {"filename": ..., "assumptions": {...}} entries')
+    parser.add_argument("--inputs", nargs="+", default=[], metavar="FILE",
+                        help="company input files (JSON, YAML or CSV); adds one workbook per input set")
+    parser.add_argument("--output-dir", default=".", help="directory for the workbooks built from --inputs")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--max-tasks-per-child", type=int, default=25,
+                        help="workbooks a worker builds before it is replaced")
+    parser.add_argument("--cache", metavar="DIR",
+                        help="build cache directory, so unchanged sheets are reused across workbooks and runs")
+    parser.add_argument("--cached-values", action="store_true",
+                        help="save each formula's computed value with it (not with --cache)")
+    args = parser.parse_args()
+
+    if not args.jobs and not args.inputs:
+        parser.error("give a jobs file, --inputs or both")
+    jobs = []
+    if args.jobs:
+        with open(args.jobs) as f:
+            jobs = json.load(f)
+    if args.inputs:
+        from Model_Inputs import load_many
+        
+        # Validate every input file up front so bad ones are reported before any building
+        start = time.perf_counter()
+        inputs, failures = load_many(args.inputs, errors="collect")
+        print(f"Loaded {len(inputs)} input sets in {time.perf_counter() - start:.2f}s")
+        for path, error in failures:
+            print(f"Skipping {path}: {error}")
+        os.makedirs(args.output_dir, exist_ok=True)
+        for i, company in enumerate(inputs):
+            name = company.company_id or f"company_{i + 1}"
+            jobs.append({"filename": os.path.join(args.output_dir, f"{name}.xlsx"), "inputs": company})
+    if args.cache:
+        for job in jobs:
+            job.setdefault("cache", args.cache)
+    if args.cached_values:
+        for job in jobs:
+            job.setdefault("cached_values", True)
+
+    start = time.perf_counter()
+    results = build_many(jobs, max_workers=args.workers, max_tasks_per_child=args.max_tasks_per_child)
+    elapsed = time.perf_counter() - start
+    print(f"Built {len(results['succeeded'])} workbooks, {len(results['failed'])} failed, in {elapsed:.1f}s")
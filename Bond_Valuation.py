@@ -1,29 +1,195 @@
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, numbers
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
+import numpy as np
+from Model_Inputs import DEFAULT_INPUTS, bond_terms, payment_periods
+from Styles import TITLE_FONT, BOLD_FONT, NUMBER, PERCENT, CURRENCY, apply
 
-def create_bond_valuation(wb):
-    """Create and format the Bond_Valuation sheet."""
+# Maturity buckets (years) for the portfolio summary
+MATURITY_BUCKETS = [(0, 2), (2, 5), (5, 10), (10, 20), (20, None)]
+
+# Terms of the bond on the Bond_Valuation sheet (price is the market price
+# used for the YTM calculation)
+DEFAULT_BOND = dict(DEFAULT_INPUTS.bond)
+
+def price_bonds(par, coupon_rate, years, frequency, yield_rate):
+    """Price arrays of fixed-coupon bonds in one NumPy pass.
+
+    All arguments broadcast against each other. Each bond pays
+    par * coupon_rate / frequency per period for years * frequency periods
+    plus par at maturity, discounted at yield_rate / frequency per period.
+    """
+    par = np.asarray(par, dtype=float)
+    frequency = np.asarray(frequency, dtype=float)
+    periods = np.asarray(years, dtype=float) * frequency
+    coupon = par * np.asarray(coupon_rate, dtype=float) / frequency
+    rate = np.asarray(yield_rate, dtype=float) / frequency
+    
+    discount = (1 + rate) ** -periods
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(rate == 0, periods, (1 - discount) / rate)
+    return coupon * annuity + par * discount
+
+def _price_and_slope(rate, par, coupon, periods):
+    """Bond price and its derivative with respect to the periodic yield."""
+    v = 1 / (1 + rate)
+    vn = v ** periods
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(rate == 0, periods, (1 - vn) / rate)
+        d_annuity = np.where(rate == 0, -periods * (periods + 1) / 2,
+                             periods * vn * v / rate - (1 - vn) / rate ** 2)
+    price = coupon * annuity + par * vn
+    slope = coupon * d_annuity - periods * par * vn * v
+    return price, slope
+
+def solve_ytm(price, par, coupon_rate, years, frequency, tolerance=1e-12, max_iterations=200):
+    """Exact yield to maturity for arrays of bonds and market prices.
+
+    Uses Newton steps on the periodic yield, safeguarded by a bracket that
+    is narrowed every iteration; whenever a Newton step would leave the
+    bracket a bisection step is taken instead, so every bond converges.
+    Returns (annual yields, iterations per bond). Bonds whose price is not
+    positive get a NaN yield.
+    """
+    price, par, coupon_rate, years, frequency = np.broadcast_arrays(
+        *[np.asarray(a, dtype=float) for a in (price, par, coupon_rate, years, frequency)])
+    periods = years * frequency
+    coupon = par * coupon_rate / frequency
+    
+    # Price falls as the yield rises, so bracket the root between a periodic
+    # yield just above -100% and an upper bound doubled until it prices below
+    low = np.full(price.shape, -0.99)
+    high = np.full(price.shape, 1.0)
+    for _ in range(60):
+        too_low = _price_and_slope(high, par, coupon, periods)[0] > price
+        if not too_low.any():
+            break
+        high = np.where(too_low, high * 2, high)
+    
+    # Start from the textbook approximation, clipped into the bracket
+    approx = ((coupon + (par - price) / np.maximum(periods, 1)) / ((par + price) / 2))
+    rate = np.clip(np.nan_to_num(approx), low, high)
+    iterations = np.zeros(price.shape, dtype=int)
+    active = price > 0
+    
+    for _ in range(max_iterations):
+        if not active.any():
+            break
+        value, slope = _price_and_slope(rate, par, coupon, periods)
+        error = value - price
+        iterations += active
+        
+        # Narrow the bracket: a positive error means the yield is too low
+        low = np.where(active & (error > 0), rate, low)
+        high = np.where(active & (error <= 0), rate, high)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = rate - error / slope
+        inside = np.isfinite(newton) & (newton > low) & (newton < high)
+        step = np.where(inside, newton, (low + high) / 2)
+        
+        done = (np.abs(error) <= tolerance * np.maximum(price, 1)) | (high - low <= tolerance)
+        rate = np.where(active & ~done, step, rate)
+        active &= ~done
+    
+    yields = np.where(price > 0, rate * frequency, np.nan)
+    return yields, iterations
+
+def create_bond_portfolio(wb, par, coupon_rate, years, frequency, yield_rate, sheet_name="Bond_Portfolio"):
+    """Price a portfolio of bonds and write one summary sheet for all of them."""
+    print(f"Creating {sheet_name} sheet...")
+    
+    par, coupon_rate, years, frequency, yield_rate = np.broadcast_arrays(
+        *[np.asarray(a, dtype=float) for a in (par, coupon_rate, years, frequency, yield_rate)])
+    prices = price_bonds(par, coupon_rate, years, frequency, yield_rate)
+    
+    ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.create_sheet(sheet_name)
+    
+    # Set the title
+    ws['A1'] = "BOND PORTFOLIO SUMMARY"
+    ws['A1'].font = TITLE_FONT
+    
+    # Portfolio totals and value-weighted averages
+    total_value = prices.sum()
+    weights = prices / total_value if total_value else np.zeros_like(prices)
+    summary = [
+        ("Number of Bonds", prices.size, '#,##0'),
+        ("Total Par Value", par.sum(), '$#,##0'),
+        ("Total Market Value", total_value, '$#,##0'),
+        ("Market Value / Par", total_value / par.sum() if par.sum() else 0, '0.00%'),
+        ("Weighted Avg Coupon Rate", (weights * coupon_rate).sum(), '0.00%'),
+        ("Weighted Avg Yield", (weights * yield_rate).sum(), '0.00%'),
+        ("Weighted Avg Maturity (Years)", (weights * years).sum(), '0.00')
+    ]
+    
+    for i, (label, value, format) in enumerate(summary, 3):
+        ws[f'A{i}'] = label
+        ws[f'B{i}'] = value if isinstance(value, int) else float(value)
+        apply(ws[f'B{i}'], number_format=format)
+    
+    # Breakdown by maturity bucket
+    ws['A11'] = "Maturity Bucket"
+    ws['B11'] = "Bonds"
+    ws['C11'] = "Par Value"
+    ws['D11'] = "Market Value"
+    ws['E11'] = "% of Portfolio"
+    for col in ['A', 'B', 'C', 'D', 'E']:
+        apply(ws[f'{col}11'], font=BOLD_FONT)
+    
+    for i, (low, high) in enumerate(MATURITY_BUCKETS, 12):
+        row = i
+        in_bucket = (years >= low) if high is None else (years >= low) & (years < high)
+        bucket_value = prices[in_bucket].sum()
+        ws[f'A{row}'] = f"{low}+ years" if high is None else f"{low}-{high} years"
+        ws[f'B{row}'] = int(in_bucket.sum())
+        ws[f'C{row}'] = float(par[in_bucket].sum())
+        ws[f'D{row}'] = float(bucket_value)
+        ws[f'E{row}'] = float(bucket_value / total_value) if total_value else 0.0
+        apply(ws[f'B{row}'], number_format=NUMBER)
+        apply(ws[f'C{row}'], number_format='$#,##0')
+        apply(ws[f'D{row}'], number_format='$#,##0')
+        apply(ws[f'E{row}'], number_format=PERCENT)
+    
+    # Set column widths
+    ws.column_dimensions['A'].width = 30
+    for col in ['B', 'C', 'D', 'E']:
+        ws.column_dimensions[col].width = 18
+    
+    print(f"{sheet_name} sheet created successfully")
+    return prices
+
+def create_bond_valuation(wb, bond=None, compact=False):
+    """Create and format the Bond_Valuation sheet.
+
+    bond overrides any of the DEFAULT_BOND terms. The cash flow schedule
+    has one row per period (Years to Maturity x Payments per Year); with
+    compact=True the schedule is skipped and the bond is priced with the
+    closed-form annuity plus the present value of par instead, so long
+    bonds stay a handful of rows.
+    """
     print("Creating Bond_Valuation sheet...")
     
+    terms = bond_terms(bond)
+    # One schedule row per period; B10 (=B6*B7) must count the same periods
+    periods = payment_periods(terms["years"], terms["frequency"])
+    
     # Get the Bond_Valuation sheet
     ws = wb["Bond_Valuation"]
     
     # Set the title
     ws['A1'] = "BOND VALUATION MODEL"
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].font = TITLE_FONT
     
     # Bond Parameters section
     ws['A3'] = "Bond Parameters"
-    ws['A3'].font = Font(bold=True)
+    ws['A3'].font = BOLD_FONT
     
     # Bond parameters
     params = [
-        ("Par Value", 1000),
-        ("Coupon Rate", 0.05),
-        ("Years to Maturity", 10),
-        ("Payments per Year", 2),
-        ("Required Yield", 0.06)
+        ("Par Value", terms["par"]),
+        ("Coupon Rate", terms["coupon_rate"]),
+        ("Years to Maturity", terms["years"]),
+        ("Payments per Year", terms["frequency"]),
+        ("Required Yield", terms["yield_rate"])
     ]
     
     # Add data validation
@@ -45,10 +211,10 @@ def create_bond_valuation(wb):
         
         # Format percentages and currency
         if "Rate" in param or "Yield" in param:
-            ws[f'B{row}'].number_format = '0.00%'
+            apply(ws[f'B{row}'], number_format=PERCENT)
             dv_rate.add(f'B{row}')
         elif "Value" in param:
-            ws[f'B{row}'].number_format = '$#,##0'
+            apply(ws[f'B{row}'], number_format='$#,##0')
             dv_positive.add(f'B{row}')
         else:
             dv_positive.add(f'B{row}')
@@ -65,62 +231,86 @@ def create_bond_valuation(wb):
     ws['B12'] = "=B8/B7"
     ws['B12'].number_format = '0.00%'
     
-    # Bond Cash Flow Table
-    ws['A14'] = "Period"
-    ws['B14'] = "Cash Flow"
-    ws['C14'] = "Present Value"
-    ws['A14'].font = Font(bold=True)
-    ws['B14'].font = Font(bold=True)
-    ws['C14'].font = Font(bold=True)
-    
-    # Create full cash flow table
-    for i in range(1, 21):  # Assuming max 10 years with semi-annual payments
-        row = i + 14
-        ws[f'A{row}'] = i
+    if compact:
+        # Closed form: coupon annuity plus par discounted over all periods
+        ws['A14'] = "PV of Coupons"
+        ws['B14'] = "=IF(B12=0,B11*B10,B11*(1-(1+B12)^-B10)/B12)"
+        ws['B14'].number_format = '$#,##0.00'
         
-        # Cash flow formula
-        if i == 20:  # Last period
-            ws[f'B{row}'] = "=B11+B4"  # Final coupon + par value
-        else:
-            ws[f'B{row}'] = "=B11"  # Regular coupon payment
+        ws['A15'] = "PV of Par Value"
+        ws['B15'] = "=B4/(1+B12)^B10"
+        ws['B15'].number_format = '$#,##0.00'
         
-        # Present value formula
-        ws[f'C{row}'] = f"=B{row}/(1+B12)^A{row}"
+        value_row = 16
+        value_formula = "=B14+B15"
+    else:
+        # Bond Cash Flow Table
+        ws['A14'] = "Period"
+        ws['B14'] = "Cash Flow"
+        ws['C14'] = "Present Value"
+        ws['A14'].font = BOLD_FONT
+        ws['B14'].font = BOLD_FONT
+        ws['C14'].font = BOLD_FONT
         
-        # Format with currency
-        ws[f'B{row}'].number_format = '$#,##0.00'
-        ws[f'C{row}'].number_format = '$#,##0.00'
+        # Create full cash flow table, one row per payment period
+        for i in range(1, periods + 1):
+            row = i + 14
+            ws[f'A{row}'] = i
+            
+            # Cash flow formula
+            if i == periods:  # Last period
+                ws[f'B{row}'] = "=B11+B4"  # Final coupon + par value
+            else:
+                ws[f'B{row}'] = "=B11"  # Regular coupon payment
+            
+            # Present value formula
+            ws[f'C{row}'] = f"=B{row}/(1+B12)^A{row}"
+            
+            # Format with currency
+            apply(ws[f'B{row}'], number_format=CURRENCY)
+            apply(ws[f'C{row}'], number_format=CURRENCY)
+        
+        value_row = periods + 15
+        value_formula = f"=SUM(C15:C{value_row - 1})"  # Sum of all PV cash flows
     
     # Bond Value
-    ws['A35'] = "Bond Value"
-    ws['A35'].font = Font(bold=True)
-    ws['B35'] = "=SUM(C15:C34)"  # Sum of all PV cash flows
-    ws['B35'].number_format = '$#,##0.00'
-    ws['B35'].font = Font(bold=True)
+    ws[f'A{value_row}'] = "Bond Value"
+    ws[f'A{value_row}'].font = BOLD_FONT
+    ws[f'B{value_row}'] = value_formula
+    ws[f'B{value_row}'].number_format = '$#,##0.00'
+    ws[f'B{value_row}'].font = BOLD_FONT
+    
+    # YTM Calculation (rows follow the bond value)
+    r = value_row + 2
+    ws[f'A{r}'] = "Bond YTM Calculation"
+    ws[f'A{r}'].font = BOLD_FONT
     
-    # YTM Calculation
-    ws['A37'] = "Bond YTM Calculation"
-    ws['A37'].font = Font(bold=True)
+    ws[f'A{r + 1}'] = "Current Bond Price"
+    ws[f'B{r + 1}'] = terms["price"]
+    ws[f'B{r + 1}'].number_format = '$#,##0.00'
+    dv_positive.add(f'B{r + 1}')
     
-    ws['A38'] = "Current Bond Price"
-    ws['B38'] = 950
-    ws['B38'].number_format = '$#,##0.00'
-    dv_positive.add('B38')
+    ws[f'A{r + 2}'] = "Approximate YTM"
+    ws[f'B{r + 2}'] = f"=((B11*B7)+((B4-B{r + 1})/B6))/((B4+B{r + 1})/2)"
+    ws[f'B{r + 2}'].number_format = '0.00%'
     
-    ws['A39'] = "Approximate YTM"
-    ws['B39'] = "=((B11*B7)+((B4-B38)/B6))/((B4+B38)/2)"
-    ws['B39'].number_format = '0.00%'
+    # Exact YTM from the native solver, next to the approximation
+    exact_ytm, _ = solve_ytm(terms["price"], terms["par"], terms["coupon_rate"],
+                             terms["years"], terms["frequency"])
+    ws[f'A{r + 3}'] = "Exact YTM (Solver)"
+    ws[f'B{r + 3}'] = float(exact_ytm)
+    ws[f'B{r + 3}'].number_format = '0.00%'
     
     # Add error checking
-    ws['A41'] = "Validation Checks"
-    ws['A41'].font = Font(bold=True)
+    ws[f'A{r + 4}'] = "Validation Checks"
+    ws[f'A{r + 4}'].font = BOLD_FONT
     
-    ws['A42'] = "Price/Par Value Ratio"
-    ws['B42'] = "=B35/B4"
-    ws['B42'].number_format = '0.00%'
+    ws[f'A{r + 5}'] = "Price/Par Value Ratio"
+    ws[f'B{r + 5}'] = f"=B{value_row}/B4"
+    ws[f'B{r + 5}'].number_format = '0.00%'
     
-    ws['A43'] = "Status"
-    ws['B43'] = '=IF(AND(B35>0,B39>0),"Valid","Check Inputs")'
+    ws[f'A{r + 6}'] = "Status"
+    ws[f'B{r + 6}'] = f'=IF(AND(B{value_row}>0,B{r + 2}>0),"Valid","Check Inputs")'
     
     # Set column widths
     ws.column_dimensions['A'].width = 25
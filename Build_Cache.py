@@ -0,0 +1,170 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+from copy import copy
+from functools import lru_cache
+
+import openpyxl
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE
+from Workbook_Output import ModelWorkbook, MemoryExcelWriter, memory_writer
+
+# Bump when the layout of cache entries changes
+CACHE_VERSION = 1
+
+# Workbook-wide indices inside a serialized sheet: cell, row and column
+# style ids (cellXfs) and conditional format styles (dxfs). Shared strings
+# need no remapping because openpyxl writes strings inline.
+_STYLE_REFS = re.compile(rb'(<c r="[A-Z]+[0-9]+" s="|<row [^>]*?\bs="|<col [^>]*?\bstyle="|\bdxfId=")([0-9]+)')
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """Hash of the model's source files and the openpyxl version.
+
+    Part of every cache key, so editing any module invalidates the cache.
+    """
+    digest = hashlib.sha256(openpyxl.__version__.encode())
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py"))):
+        with open(path, "rb") as f:
+            digest.update(os.path.basename(path).encode() + b"\0" + f.read())
+    return digest.hexdigest()
+
+
+def _cacheable(ws):
+    # Parts that live outside the sheet XML and its drawing are not cached
+    return not (ws._images or ws._comments or ws._tables or ws._pivots or ws._hyperlinks
+                or ws.legacy_drawing or ws.print_title_rows or ws.print_title_cols
+                or ws.print_area or ws.auto_filter.ref)
+
+
+class SheetCache:
+    """Directory of serialized sheets keyed on a hash of their builder inputs.
+
+    Each entry holds a sheet's XML part as written by openpyxl together
+    with the style objects behind the workbook-wide style indices it uses,
+    its relationships and its charts, so it can be spliced into any other
+    workbook. Entries are written atomically, so several batch workers can
+    share one cache directory.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, sheet, position, inputs):
+        """Cache key of a sheet from its name, position and builder inputs."""
+        text = json.dumps({"version": CACHE_VERSION, "code": code_version(), "sheet": sheet,
+                           "position": position, "inputs": inputs}, sort_keys=True, default=repr)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    def load(self, key):
+        """The cached entry for key, or None."""
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def store(self, key, entry):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+
+
+class _SplicingWriter(MemoryExcelWriter):
+
+    def write_worksheet(self, ws):
+        wb = self.workbook
+        entry = wb.cached.get(ws.title)
+        if entry is not None:
+            ws._charts = entry["charts"]
+        ws._drawing = SpreadsheetDrawing()
+        ws._drawing.charts = ws._charts
+        ws._drawing.images = ws._images
+
+        if entry is not None:
+            xml = self._remap(entry)
+            ws._rels = copy(entry["rels"])
+        else:
+            writer = memory_writer(ws)
+            writer.write()
+            ws._rels = writer._rels
+            xml = writer.read()
+            if ws.title in wb.keys and _cacheable(ws):
+                wb.cache.store(wb.keys[ws.title], self._entry(ws, xml))
+
+        self._archive.writestr(ws.path[1:], xml)
+        self.manifest.append(ws)
+
+    def _entry(self, ws, xml):
+        """Cache entry for a freshly written sheet."""
+        wb = self.workbook
+        styles, dxfs = {}, {}
+        for prefix, index in _STYLE_REFS.findall(xml):
+            index = int(index)
+            if prefix.endswith(b'dxfId="'):
+                dxfs[index] = wb._differential_styles.dxf[index]
+            elif index not in styles:
+                style = wb._cell_styles[index]
+                number_format = (style.numFmtId if style.numFmtId < BUILTIN_FORMATS_MAX_SIZE
+                                 else wb._number_formats[style.numFmtId - BUILTIN_FORMATS_MAX_SIZE])
+                styles[index] = (wb._fonts[style.fontId], wb._fills[style.fillId],
+                                 wb._borders[style.borderId], number_format,
+                                 wb._protections[style.protectionId], wb._alignments[style.alignmentId],
+                                 style.pivotButton, style.quotePrefix, style.xfId)
+        return {"xml": xml, "styles": styles, "dxfs": dxfs, "rels": ws._rels, "charts": ws._charts}
+
+    def _remap(self, entry):
+        """Cached sheet XML with its style indices registered in this workbook."""
+        wb = self.workbook
+        styles = {}
+        for old, (font, fill, border, number_format, protection, alignment,
+                  pivot_button, quote_prefix, xf_id) in entry["styles"].items():
+            if not isinstance(number_format, int):
+                number_format = wb._number_formats.add(number_format) + BUILTIN_FORMATS_MAX_SIZE
+            style = StyleArray([wb._fonts.add(font), wb._fills.add(fill), wb._borders.add(border),
+                                number_format, wb._protections.add(protection),
+                                wb._alignments.add(alignment), pivot_button, quote_prefix, xf_id])
+            styles[old] = b"%d" % wb._cell_styles.add(style)
+        dxfs = {old: b"%d" % wb._differential_styles.add(dxf) for old, dxf in entry["dxfs"].items()}
+
+        def replace(match):
+            prefix, index = match.groups()
+            table = dxfs if prefix.endswith(b'dxfId="') else styles
+            return prefix + table[int(index)]
+
+        return _STYLE_REFS.sub(replace, entry["xml"])
+
+
+class CachedWorkbook(ModelWorkbook):
+    """Workbook whose save splices cached sheet parts in place of empty sheets.
+
+    build_workbook leaves the sheets found in the cache empty and records
+    their entries in cached; save writes the cached XML for those and
+    stores every sheet listed in keys that had to be serialized afresh.
+    Cached sheets hold no cells in memory, so evaluate the model from a
+    build without a cache.
+    """
+
+    xlsx_writer = _SplicingWriter
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+        self.cached = {}   # sheet title -> cache entry to splice
+        self.keys = {}     # sheet title -> cache key
+
+    def save(self, filename=None, compresslevel=None, cached_values=False):
+        if cached_values:
+            raise ValueError("Cached sheets hold no cells to calculate; save cached values from a build without a cache")
+        return super().save(filename, compresslevel)
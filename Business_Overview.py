@@ -1,5 +1,5 @@
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
+from Styles import TITLE_FONT, BOLD_FONT, HEADER_FILL, GRAY_FILL, WRAP, apply
 
 def create_business_overview(wb):
     """Create and format the Business_Overview sheet."""
@@ -10,7 +10,7 @@ def create_business_overview(wb):
     
     # Set the title
     ws['A1'] = "COMPANY OVERVIEW"
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].font = TITLE_FONT
     
     # Company information
     ws['A3'] = "Company Name:"
@@ -24,12 +24,12 @@ def create_business_overview(wb):
     
     # Company Description
     ws['A7'] = "Company Description"
-    ws['A7'].font = Font(bold=True)
+    ws['A7'].font = BOLD_FONT
     ws['A8'] = "TechVision Solutions Inc. is a leading provider of enterprise software solutions, specializing in cloud-based business intelligence, data analytics, and process automation tools. Founded in 2020, the company has rapidly grown to serve over 500 enterprise clients across multiple industries."
     
     # Products and Services section
     ws['A10'] = "Products and Services"
-    ws['A10'].font = Font(bold=True)
+    ws['A10'].font = BOLD_FONT
     
     products = [
         ("DataInsight Pro", "Advanced business intelligence and analytics platform", 40),
@@ -43,11 +43,11 @@ def create_business_overview(wb):
         ws[f'A{row}'] = product
         ws[f'B{row}'] = desc
         ws[f'C{row}'] = f"{revenue}%"
-        ws[f'A{row}'].font = Font(bold=True)
+        apply(ws[f'A{row}'], font=BOLD_FONT)
     
     # Market Analysis
     ws['A17'] = "Market Analysis"
-    ws['A17'].font = Font(bold=True)
+    ws['A17'].font = BOLD_FONT
     
     market_points = [
         "Total Addressable Market (TAM): $50 billion",
@@ -62,7 +62,7 @@ def create_business_overview(wb):
     
     # Competitive Advantages
     ws['A26'] = "Competitive Advantages"
-    ws['A26'].font = Font(bold=True)
+    ws['A26'].font = BOLD_FONT
     
     advantages = [
         "Proprietary AI/ML technology",
@@ -77,7 +77,7 @@ def create_business_overview(wb):
     
     # Growth Strategy
     ws['A35'] = "Growth Strategy"
-    ws['A35'].font = Font(bold=True)
+    ws['A35'].font = BOLD_FONT
     
     strategies = [
         "Geographic expansion into APAC region",
@@ -92,7 +92,7 @@ def create_business_overview(wb):
     
     # Financial Highlights
     ws['A44'] = "Financial Highlights (2024)"
-    ws['A44'].font = Font(bold=True)
+    ws['A44'].font = BOLD_FONT
     
     highlights = [
         ("Annual Revenue", "$100 million"),
@@ -111,20 +111,16 @@ def create_business_overview(wb):
     for row in range(8, 50):
         for col in ['A', 'B']:
             cell = ws[f'{col}{row}']
-            cell.alignment = Alignment(wrap_text=True)
+            apply(cell, alignment=WRAP)
     
     # Set column widths
     ws.column_dimensions['A'].width = 30
     ws.column_dimensions['B'].width = 60
     ws.column_dimensions['C'].width = 15
     
-    # Add background colors
-    header_fill = PatternFill(start_color='DCE6F1', end_color='DCE6F1', fill_type='solid')
-    section_fill = PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid')
-    
     # Apply fills to main header and section headers
-    ws['A1'].fill = header_fill
+    ws['A1'].fill = HEADER_FILL
     for row in [7, 10, 17, 26, 35, 44]:
-        ws[f'A{row}'].fill = section_fill
+        apply(ws[f'A{row}'], fill=GRAY_FILL)
     
     print("Business_Overview sheet created successfully")
\ No newline at end of file
@@ -1,10 +1,155 @@
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, numbers
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.chart import LineChart, Reference
+import numpy as np
+from Model_Inputs import DEFAULT_INPUTS
+from Styles import TITLE_FONT, BOLD_FONT, NUMBER, PERCENT, apply
 
-def create_capital_budgeting(wb):
-    """Create and format the Capital_Budgeting sheet."""
+# Default project terms shared by the sheet and the numeric risk/sensitivity engines
+INITIAL_INVESTMENT = DEFAULT_INPUTS.initial_investment
+SALVAGE_VALUE = DEFAULT_INPUTS.salvage_value
+ANNUAL_CASH_FLOWS = list(DEFAULT_INPUTS.project_cash_flows)
+PROJECT_LIFE = len(ANNUAL_CASH_FLOWS)
+
+# Rates scanned to bracket IRR roots: dense around typical project returns,
+# geometric out to 10,000%. Roots outside this range are not reported.
+IRR_SCAN_RATES = np.unique(np.concatenate([
+    np.linspace(-0.99, -0.5, 50, endpoint=False),
+    np.linspace(-0.5, 1.0, 301),
+    np.geomspace(1.0, 100.0, 60),
+]))
+
+def _pad_cash_flows(cash_flows):
+    """Turn a 2-D array or a ragged list of cash flows into a zero-padded array
+    plus the number of periods of each project (trailing NaNs are padding)."""
+    if isinstance(cash_flows, np.ndarray):
+        flows = np.atleast_2d(cash_flows).astype(float)
+    else:
+        rows = [np.asarray(row, dtype=float) for row in cash_flows]
+        flows = np.full((len(rows), max(len(row) for row in rows)), np.nan)
+        for i, row in enumerate(rows):
+            flows[i, :len(row)] = row
+    present = ~np.isnan(flows)
+    lengths = np.where(present.any(axis=1), flows.shape[1] - np.argmax(present[:, ::-1], axis=1), 0)
+    return np.nan_to_num(flows), lengths
+
+def _npv_at(flows, rates):
+    """NPV of each project (rows of flows) at its own rate (one rate per row)."""
+    inverse = 1 / (1 + rates)
+    value = np.zeros(flows.shape[0])
+    # Horner's rule over the periods, from the last to the first
+    for t in range(flows.shape[1] - 1, -1, -1):
+        value = value * inverse + flows[:, t]
+    return value
+
+def _payback(flows):
+    """Periods until cumulative cash flow turns non-negative, interpolated within
+    the period; NaN if it never does."""
+    cumulative = np.cumsum(flows, axis=1)
+    # Allow for rounding: discounted flows that exactly repay the investment
+    # can sum to a hair below zero
+    reached = cumulative >= -1e-9 * np.abs(flows[:, :1])
+    first = np.argmax(reached, axis=1)
+    rows = np.arange(flows.shape[0])
+    previous = cumulative[rows, np.maximum(first - 1, 0)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payback = (first - 1) + -previous / flows[rows, first]
+    payback = np.where(first == 0, 0.0, payback)
+    return np.where(reached.any(axis=1), payback, np.nan)
+
+def analyze_projects(cash_flows, discount_rate=0.10, finance_rate=None, reinvest_rate=None,
+                     chunk_size=10_000, iterations=50):
+    """IRR, MIRR, NPV, profitability index and paybacks for many projects at once.
+
+    cash_flows is a projects x periods array (period 0 first, NaN-padded)
+    or a list of per-project sequences of different lengths. The finance
+    and reinvestment rates for MIRR default to discount_rate.
+
+    IRR roots are found by scanning NPV over IRR_SCAN_RATES for sign changes
+    and refining every bracket by bisection. "irr_count" is the number of
+    roots found, "irr" is the root when it is unique (NaN when there is no
+    root or several), and "irr_roots" lists all roots per project,
+    NaN-padded.
+    """
+    flows, lengths = _pad_cash_flows(cash_flows)
+    projects, periods = flows.shape
+    discount_rate = np.broadcast_to(np.asarray(discount_rate, dtype=float), (projects,))
+    finance_rate = discount_rate if finance_rate is None else np.broadcast_to(np.asarray(finance_rate, dtype=float), (projects,))
+    reinvest_rate = discount_rate if reinvest_rate is None else np.broadcast_to(np.asarray(reinvest_rate, dtype=float), (projects,))
+    
+    # NPV, profitability index and paybacks
+    t = np.arange(periods)
+    discounted = flows / (1 + discount_rate)[:, None] ** t
+    npv = discounted.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profitability_index = np.where(flows[:, 0] < 0, discounted[:, 1:].sum(axis=1) / -flows[:, 0], np.nan)
+    payback = _payback(flows)
+    discounted_payback = _payback(discounted)
+    
+    # MIRR: future value of inflows at the reinvestment rate against the
+    # present value of outflows at the finance rate, over each project's life
+    horizon = np.maximum(lengths - 1, 1)
+    inflows = np.where(flows > 0, flows, 0)
+    outflows = np.where(flows < 0, flows, 0)
+    future_inflows = (inflows * (1 + reinvest_rate)[:, None] ** (horizon[:, None] - t)).sum(axis=1)
+    present_outflows = (outflows / (1 + finance_rate)[:, None] ** t).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mirr = (future_inflows / -present_outflows) ** (1 / horizon) - 1
+    mirr = np.where((future_inflows > 0) & (present_outflows < 0), mirr, np.nan)
+    
+    # IRR: bracket sign changes of NPV on the rate grid, chunked over projects
+    # so the projects x rates grid stays small
+    with np.errstate(over='ignore', invalid='ignore'):
+        scan_discount = (1 + IRR_SCAN_RATES)[None, :] ** -t[:, None]
+    exact_owners, exact_roots = [], []
+    owners, positions = [], []
+    for start in range(0, projects, chunk_size):
+        with np.errstate(invalid='ignore'):
+            signs = np.sign(flows[start:start + chunk_size] @ scan_discount)
+        # A rate where NPV is exactly zero is a root itself
+        project, position = np.nonzero(signs == 0)
+        exact_owners.append(project + start)
+        exact_roots.append(IRR_SCAN_RATES[position])
+        project, position = np.nonzero(signs[:, :-1] * signs[:, 1:] < 0)
+        owners.append(project + start)
+        positions.append(position)
+    owner = np.concatenate(owners)
+    position = np.concatenate(positions)
+    
+    # Bisection on every bracket at once
+    low = IRR_SCAN_RATES[position]
+    high = IRR_SCAN_RATES[position + 1]
+    bracket_flows = flows[owner]
+    low_sign = np.sign(_npv_at(bracket_flows, low))
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        same = np.sign(_npv_at(bracket_flows, mid)) == low_sign
+        low = np.where(same, mid, low)
+        high = np.where(same, high, mid)
+    
+    owner = np.concatenate([owner] + exact_owners)
+    roots = np.concatenate([(low + high) / 2] + exact_roots)
+    
+    irr_count = np.bincount(owner, minlength=projects)
+    irr_roots = np.full((projects, max(irr_count.max(initial=0), 1)), np.nan)
+    order = np.lexsort((roots, owner))
+    slot = np.arange(len(owner)) - np.repeat(np.cumsum(irr_count) - irr_count, irr_count)
+    irr_roots[owner[order], slot] = roots[order]
+    irr = np.where(irr_count == 1, irr_roots[:, 0], np.nan)
+    
+    return {
+        "npv": npv,
+        "irr": irr,
+        "irr_count": irr_count,
+        "irr_roots": irr_roots,
+        "mirr": mirr,
+        "profitability_index": profitability_index,
+        "payback": payback,
+        "discounted_payback": discounted_payback,
+    }
+
+def create_capital_budgeting(wb, inputs=DEFAULT_INPUTS):
+    """Create and format the Capital_Budgeting sheet for the project in inputs."""
     print("Creating Capital_Budgeting sheet...")
     
     # Get the Capital_Budgeting sheet
@@ -12,18 +157,18 @@ def create_capital_budgeting(wb):
     
     # Set the title
     ws['A1'] = "CAPITAL BUDGETING MODEL"
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].font = TITLE_FONT
     
     # Project Parameters section
     ws['A3'] = "Project Parameters"
-    ws['A3'].font = Font(bold=True)
+    ws['A3'].font = BOLD_FONT
     
     # Project parameters
     params = [
-        ("Initial Investment", 500000),
-        ("Project Life (Years)", 5),
+        ("Initial Investment", inputs.initial_investment),
+        ("Project Life (Years)", len(inputs.project_cash_flows)),
         ("Discount Rate", "=Assumptions!B22"),
-        ("Salvage Value", 50000)
+        ("Salvage Value", inputs.salvage_value)
     ]
     
     # Add data validation
@@ -45,10 +190,10 @@ def create_capital_budgeting(wb):
         
         # Format percentages and currency
         if param == "Discount Rate":
-            ws[f'B{row}'].number_format = '0.00%'
+            apply(ws[f'B{row}'], number_format=PERCENT)
             dv_rate.add(f'B{row}')
         elif "Value" in param or "Investment" in param:
-            ws[f'B{row}'].number_format = '#,##0'
+            apply(ws[f'B{row}'], number_format=NUMBER)
             dv_positive.add(f'B{row}')
         else:
             dv_positive.add(f'B{row}')
@@ -61,28 +206,22 @@ def create_capital_budgeting(wb):
     ws['E9'] = "Cumulative Discounted Cash Flow"
     
     for col in ['A', 'B', 'C', 'D', 'E']:
-        ws[f'{col}9'].font = Font(bold=True)
+        apply(ws[f'{col}9'], font=BOLD_FONT)
     
     # Cash flow by year
-    cash_flows = [
-        (0, "=-B4"),  # Initial investment (negative)
-        (1, 120000),
-        (2, 150000),
-        (3, 180000),
-        (4, 200000),
-        (5, "=220000+B7")  # Final year cash flow + salvage value
-    ]
+    cash_flows = [(0, "=-B4")]  # Initial investment (negative)
+    annual_cash_flows = inputs.project_cash_flows
+    cash_flows += [(year, cf) for year, cf in enumerate(annual_cash_flows[:-1], 1)]
+    cash_flows.append((len(annual_cash_flows), f"={annual_cash_flows[-1]}+B7"))  # Final year cash flow + salvage value
     
     for i, (year, cf) in enumerate(cash_flows, 10):
         row = i
         ws[f'A{row}'] = year
         ws[f'B{row}'] = cf
         
-        # Discounted cash flow
-        if isinstance(cf, str):
-            ws[f'C{row}'] = f"={cf}/(1+$B$6)^A{row}"
-        else:
-            ws[f'C{row}'] = f"=B{row}/(1+$B$6)^A{row}"
+        # Discounted cash flow (always discount the cash flow cell itself so
+        # formula cash flows such as "=-B4" are discounted as a whole)
+        ws[f'C{row}'] = f"=B{row}/(1+$B$6)^A{row}"
         
         # Cumulative cash flow
         if year == 0:
@@ -94,11 +233,11 @@ def create_capital_budgeting(wb):
         
         # Format numbers
         for col in ['B', 'C', 'D', 'E']:
-            ws[f'{col}{row}'].number_format = '#,##0'
+            apply(ws[f'{col}{row}'], number_format=NUMBER)
     
     # NPV Calculation section
     ws['A17'] = "NPV Calculation"
-    ws['A17'].font = Font(bold=True)
+    ws['A17'].font = BOLD_FONT
     
     ws['A18'] = "Present Value of Cash Flows"
     ws['B18'] = "=E15"  # Sum of all discounted cash flows
@@ -106,11 +245,11 @@ def create_capital_budgeting(wb):
     
     ws['A19'] = "NPV Decision"
     ws['B19'] = '=IF(B18>0,"Accept Project","Reject Project")'
-    ws['B19'].font = Font(bold=True)
+    ws['B19'].font = BOLD_FONT
     
     # IRR Calculation section
     ws['A21'] = "IRR Calculation"
-    ws['A21'].font = Font(bold=True)
+    ws['A21'].font = BOLD_FONT
     
     ws['A22'] = "Internal Rate of Return (IRR)"
     ws['B22'] = "=IRR(B10:B15)"
@@ -118,11 +257,11 @@ def create_capital_budgeting(wb):
     
     ws['A23'] = "IRR Decision"
     ws['B23'] = '=IF(B22>B6,"Accept Project","Reject Project")'
-    ws['B23'].font = Font(bold=True)
+    ws['B23'].font = BOLD_FONT
     
     # Payback Period Calculation section
     ws['A25'] = "Payback Period Calculation"
-    ws['A25'].font = Font(bold=True)
+    ws['A25'].font = BOLD_FONT
     
     ws['A26'] = "Payback Period (Years)"
     ws['B26'] = '=MATCH(0,D10:D15,1)-1+ABS(INDEX(D10:D15,MATCH(0,D10:D15,1)-1))/INDEX(B10:B15,MATCH(0,D10:D15,1))'
@@ -0,0 +1,118 @@
+import os
+import numpy as np
+from Formula_Engine import evaluate_workbook
+from Scenario_Engine import base_inputs, run_scenarios, template_engine
+
+# Scenario_Engine statements written by default: the computed statements and
+# the DCF valuation summary
+EXPORT_STATEMENTS = ("Revenue", "Income_Statement", "Balance_Sheet", "Cash_Flow", "Valuation")
+
+# Scenarios evaluated and written per batch by export_scenarios
+BATCH_SIZE = 10_000
+
+
+def _pyarrow():
+    import pyarrow   # Optional dependency, only needed for columnar export
+    return pyarrow
+
+
+def _labels(labels):
+    """Dictionary-encode a list of labels: (unique labels, index of each)."""
+    unique = list(dict.fromkeys(labels))
+    position = {label: i for i, label in enumerate(unique)}
+    return unique, np.array([position[label] for label in labels], dtype=np.int32)
+
+
+def to_arrow(results, scenario_ids=None, company_id="", statements=EXPORT_STATEMENTS):
+    """Flatten Scenario_Engine.run_scenarios results into one Arrow table.
+
+    One row per scenario, statement, line item and period, with columns
+    scenario_id, company_id, statement, line_item, period and value. The
+    text columns are dictionary encoded, so a large batch costs little more
+    than its values. scenario_ids defaults to 0..N-1.
+    """
+    pa = _pyarrow()
+
+    # Row keys of one scenario: every (statement, line item, period) cell
+    names, items, periods, blocks = [], [], [], []
+    for name in statements:
+        statement = results[name]
+        for item in statement.line_items:
+            for period in statement.periods:
+                names.append(name)
+                items.append(str(item).strip())
+                periods.append(str(period))
+        blocks.append(statement.values.reshape(len(statement.values), -1))
+    values = np.concatenate(blocks, axis=1)            # (scenarios, cells)
+    count, cells = values.shape
+
+    scenario_ids = np.arange(count) if scenario_ids is None else np.asarray(scenario_ids)
+    if len(scenario_ids) != count:
+        raise ValueError(f"Expected {count} scenario ids, got {len(scenario_ids)}")
+
+    def dictionary(labels):
+        unique, indices = _labels(labels)
+        return pa.DictionaryArray.from_arrays(np.tile(indices, count), pa.array(unique, pa.string()))
+
+    return pa.table({
+        "scenario_id": np.repeat(scenario_ids.astype(np.int64), cells),
+        "company_id": dictionary([company_id] * cells),
+        "statement": dictionary(names),
+        "line_item": dictionary(items),
+        "period": dictionary(periods),
+        "value": values.ravel(),
+    })
+
+
+def model_table(wb, scenario_id=0, company_id="", statements=EXPORT_STATEMENTS):
+    """Arrow table of a built workbook's computed statements as one scenario."""
+    engine = evaluate_workbook(wb)
+    return to_arrow(run_scenarios(base_inputs(engine), engine), [scenario_id], company_id, statements)
+
+
+def _writer(path, schema, compression):
+    """Parquet writer for .parquet paths, Arrow IPC file writer otherwise."""
+    pa = _pyarrow()
+    if os.path.splitext(path)[1].lower() == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema, compression=compression)
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+    return pa.ipc.new_file(path, schema, options=options)
+
+
+def write_table(table, path, compression="zstd"):
+    """Write an Arrow table to path as Parquet (.parquet) or an Arrow IPC file (.arrow, .feather)."""
+    with _writer(path, table.schema, compression) as writer:
+        writer.write_table(table)
+
+
+def export_scenarios(inputs, path, engine=None, company_id="", first_scenario_id=0,
+                     batch_size=BATCH_SIZE, statements=EXPORT_STATEMENTS, compression="zstd"):
+    """Evaluate an N x K array of scenario inputs and write the statements to one file.
+
+    inputs are as for Scenario_Engine.run_scenarios. Scenarios are run and
+    written batch_size at a time (one Parquet row group or Arrow record
+    batch each), so memory stays bounded however many are exported.
+    Scenario ids run from first_scenario_id. Returns the number of rows
+    written.
+    """
+    engine = engine or template_engine()
+    inputs = np.asarray(inputs, dtype=float)
+    if inputs.ndim == 1:
+        inputs = inputs[None, :]
+
+    writer = None
+    rows = 0
+    try:
+        for start in range(0, len(inputs), batch_size):
+            batch = inputs[start:start + batch_size]
+            ids = np.arange(first_scenario_id + start, first_scenario_id + start + len(batch))
+            table = to_arrow(run_scenarios(batch, engine), ids, company_id, statements)
+            if writer is None:
+                writer = _writer(path, table.schema, compression)
+            writer.write_table(table)
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
@@ -1,5 +1,5 @@
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, numbers
 from openpyxl.utils import get_column_letter
+from Styles import TITLE_FONT, BOLD_FONT, BLUE_FILL, GREEN_FILL, GRAY_FILL, THIN_BORDER, apply
 
 def create_contributions(wb):
     """Create and format the Contributions sheet."""
@@ -10,7 +10,7 @@ def create_contributions(wb):
     
     # Set the title
     ws['A1'] = "TEAM MEMBER CONTRIBUTIONS"
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].font = TITLE_FONT
     
     # Column headers
     headers = ["Team Member Name", "Student ID", "Contribution Description", "Contribution %"]
@@ -18,7 +18,7 @@ def create_contributions(wb):
     for i, header in enumerate(headers, 1):
         col = get_column_letter(i)
         ws[f'{col}3'] = header
-        ws[f'{col}3'].font = Font(bold=True)
+        apply(ws[f'{col}3'], font=BOLD_FONT)
     
     # Example team members and contributions
     team_members = [
@@ -40,14 +40,14 @@ def create_contributions(wb):
         ws[f'B{row}'] = id
         ws[f'C{row}'] = desc
         ws[f'D{row}'] = contrib
-        ws[f'D{row}'].number_format = '0%'
+        apply(ws[f'D{row}'], number_format='0%')
     
     # Total contribution
     ws['A15'] = "Total"
-    ws['A15'].font = Font(bold=True)
+    ws['A15'].font = BOLD_FONT
     ws['D15'] = "=SUM(D4:D13)"
     ws['D15'].number_format = '0%'
-    ws['D15'].font = Font(bold=True)
+    ws['D15'].font = BOLD_FONT
     
     # Set column widths
     ws.column_dimensions['A'].width = 20
@@ -55,32 +55,22 @@ def create_contributions(wb):
     ws.column_dimensions['C'].width = 40
     ws.column_dimensions['D'].width = 15
     
-    # Add background colors
-    header_fill = PatternFill(start_color='DDEBF7', end_color='DDEBF7', fill_type='solid')  # Light blue
-    total_fill = PatternFill(start_color='E2EFDA', end_color='E2EFDA', fill_type='solid')   # Light green
-    
-    # Apply fills
+    # Add background colors: light blue header, light green total
     for col in ['A', 'B', 'C', 'D']:
-        ws[f'{col}3'].fill = header_fill
+        apply(ws[f'{col}3'], fill=BLUE_FILL)
     
-    ws['A15'].fill = total_fill
-    ws['D15'].fill = total_fill
+    ws['A15'].fill = GREEN_FILL
+    ws['D15'].fill = GREEN_FILL
     
     # Add alternating row colors for better readability
     for row in range(4, 14):
         if row % 2 == 0:  # Even rows
-            fill = PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid')  # Light gray
             for col in ['A', 'B', 'C', 'D']:
-                ws[f'{col}{row}'].fill = fill
+                apply(ws[f'{col}{row}'], fill=GRAY_FILL)  # Light gray
     
     # Add borders
-    thin_border = Border(left=Side(style='thin'), 
-                         right=Side(style='thin'), 
-                         top=Side(style='thin'), 
-                         bottom=Side(style='thin'))
-    
     for row in range(3, 16):
         for col in ['A', 'B', 'C', 'D']:
-            ws[f'{col}{row}'].border = thin_border
+            apply(ws[f'{col}{row}'], border=THIN_BORDER)
     
     print("Contributions sheet created successfully")
\ No newline at end of file
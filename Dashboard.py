@@ -1,22 +1,31 @@
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.chart import BarChart, LineChart, PieChart, ScatterChart, Reference, Series
 from openpyxl.utils import get_column_letter
 from openpyxl.formatting.rule import ColorScaleRule
+from Horizon import DEFAULT_HORIZON
+from Styles import TITLE_FONT, BOLD_FONT, NUMBER, PERCENT, apply
 
-def create_dashboard(wb):
+def create_dashboard(wb, horizon=DEFAULT_HORIZON):
     """Create and format the Dashboard sheet."""
     print("Creating Dashboard sheet...")
     
     # Get the Dashboard sheet
     ws = wb["Dashboard"]
     
+    # Set column widths
+    for col in ['A', 'D']:
+        ws.column_dimensions[col].width = 25
+    for col in ['B', 'C', 'E', 'F', 'G', 'H']:
+        ws.column_dimensions[col].width = 15
+    
     # Set the title
     ws['A1'] = "FINANCIAL MODEL DASHBOARD"
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].font = TITLE_FONT
     
-    # Key Financial Metrics section
+    # Key Financial Metrics and Financial Ratios sections, side by side
     ws['A3'] = "Key Financial Metrics"
-    ws['A3'].font = Font(bold=True)
+    ws['A3'].font = BOLD_FONT
+    ws['D3'] = "Financial Ratios"
+    ws['D3'].font = BOLD_FONT
     
     # Metrics labels and formulas
     metrics = [
@@ -30,23 +39,6 @@ def create_dashboard(wb):
         ("Payback Period (Years)", "=Capital_Budgeting!B26")
     ]
     
-    for i, (metric, formula) in enumerate(metrics, 5):
-        row = i
-        ws[f'A{row}'] = metric
-        ws[f'B{row}'] = formula
-        
-        # Format numbers
-        if "IRR" in metric:
-            ws[f'B{row}'].number_format = '0.00%'
-        elif "Period" in metric:
-            ws[f'B{row}'].number_format = '0.00'
-        else:
-            ws[f'B{row}'].number_format = '#,##0'
-    
-    # Financial Ratios section
-    ws['D3'] = "Financial Ratios"
-    ws['D3'].font = Font(bold=True)
-    
     ratios = [
         ("Gross Margin", "=Income_Statement!B7/Income_Statement!B5"),
         ("EBITDA Margin", "=Income_Statement!B10/Income_Statement!B5"),
@@ -55,36 +47,50 @@ def create_dashboard(wb):
         ("Current Ratio", "=Balance_Sheet!B8/Balance_Sheet!B15")
     ]
     
-    for i, (ratio, formula) in enumerate(ratios, 5):
+    for i, (metric, formula) in enumerate(metrics, 5):
         row = i
-        ws[f'D{row}'] = ratio
-        ws[f'E{row}'] = formula
-        ws[f'E{row}'].number_format = '0.00%' if ratio != "Current Ratio" else '0.00'
+        ws[f'A{row}'] = metric
+        ws[f'B{row}'] = formula
+        
+        # Format numbers
+        if "IRR" in metric:
+            apply(ws[f'B{row}'], number_format=PERCENT)
+        elif "Period" in metric:
+            apply(ws[f'B{row}'], number_format='0.00')
+        else:
+            apply(ws[f'B{row}'], number_format=NUMBER)
+        
+        # Ratio on the same row, if any
+        if i - 5 < len(ratios):
+            ratio, formula = ratios[i - 5]
+            ws[f'D{row}'] = ratio
+            ws[f'E{row}'] = formula
+            apply(ws[f'E{row}'], number_format=PERCENT if ratio != "Current Ratio" else '0.00')
     
     # Revenue Forecast Chart
     ws['A15'] = "Revenue Forecast"
-    ws['A15'].font = Font(bold=True)
+    ws['A15'].font = BOLD_FONT
     
-    # Years for the chart
-    years = ["2025", "2026", "2027", "2028", "2029"]
+    # Periods for the chart
+    years = horizon.labels
     for i, year in enumerate(years):
         col = get_column_letter(i + 2)
         ws[f'{col}15'] = year
     
     # Revenue values
-    for i in range(5):
+    for i in range(horizon.periods):
         col = get_column_letter(i + 2)
         ws[f'{col}16'] = f"=Revenue_Forecast!{col}9"
-        ws[f'{col}16'].number_format = '#,##0'
+        apply(ws[f'{col}16'], number_format=NUMBER)
     
     chart1 = BarChart()
-    chart1.title = "Revenue Forecast 2025-2029"
+    chart1.title = f"Revenue Forecast {years[0]}-{years[-1]}"
     chart1.style = 10
-    chart1.x_axis.title = "Year"
+    chart1.x_axis.title = horizon.period_name
     chart1.y_axis.title = "Revenue"
     
-    data = Reference(ws, min_col=2, min_row=16, max_col=6, max_row=16)
-    cats = Reference(ws, min_col=2, min_row=15, max_col=6, max_row=15)
+    data = Reference(ws, min_col=2, min_row=16, max_col=horizon.last_col, max_row=16)
+    cats = Reference(ws, min_col=2, min_row=15, max_col=horizon.last_col, max_row=15)
     chart1.add_data(data)
     chart1.set_categories(cats)
     
@@ -92,42 +98,42 @@ def create_dashboard(wb):
     
     # Income Statement Trends
     ws['A40'] = "Income Statement Trends"
-    ws['A40'].font = Font(bold=True)
-    
-    # Copy data for visualization
-    metrics = ["Revenue", "Gross Profit", "EBITDA", "Net Income"]
-    for i, metric in enumerate(metrics):
-        ws[f'A{41+i}'] = metric
-    
+    ws['A40'].font = BOLD_FONT
     for j, year in enumerate(years):
-        col = get_column_letter(j + 2)
-        ws[f'{col}40'] = year
-        
-        # Get values from Income Statement
-        ws[f'{col}41'] = f"=Revenue_Forecast!{col}9"  # Revenue
-        ws[f'{col}42'] = f"=Income_Statement!{col}7"  # Gross Profit
-        ws[f'{col}43'] = f"=Income_Statement!{col}10"  # EBITDA
-        ws[f'{col}44'] = f"=Income_Statement!{col}14"  # Net Income
-        
-        for row in range(41, 45):
-            ws[f'{col}{row}'].number_format = '#,##0'
+        ws[f'{get_column_letter(j + 2)}40'] = year
+    
+    # Copy data for visualization: values from the Income Statement
+    metrics = [
+        ("Revenue", "=Revenue_Forecast!{col}9"),
+        ("Gross Profit", "=Income_Statement!{col}7"),
+        ("EBITDA", "=Income_Statement!{col}10"),
+        ("Net Income", "=Income_Statement!{col}14"),
+    ]
+    for row, (metric, formula) in enumerate(metrics, 41):
+        ws[f'A{row}'] = metric
+        for col in horizon.letters:
+            ws[f'{col}{row}'] = formula.format(col=col)
+            apply(ws[f'{col}{row}'], number_format=NUMBER)
     
     chart2 = LineChart()
     chart2.title = "Income Statement Trends"
     chart2.style = 10
-    chart2.x_axis.title = "Year"
+    chart2.x_axis.title = horizon.period_name
     chart2.y_axis.title = "Amount"
     
-    data = Reference(ws, min_col=2, min_row=41, max_col=6, max_row=44)
-    cats = Reference(ws, min_col=2, min_row=40, max_col=6, max_row=40)
+    data = Reference(ws, min_col=2, min_row=41, max_col=horizon.last_col, max_row=44)
+    cats = Reference(ws, min_col=2, min_row=40, max_col=horizon.last_col, max_row=40)
     chart2.add_data(data, titles_from_data=True)
     chart2.set_categories(cats)
     
     ws.add_chart(chart2, "G20")
     
-    # Cost Structure (Pie Chart)
+    # Cost Structure (Pie Chart) and NPV Sensitivity (from Sensitivity
+    # Analysis), side by side
     ws['A50'] = "Cost Structure (Latest Year)"
-    ws['A50'].font = Font(bold=True)
+    ws['A50'].font = BOLD_FONT
+    ws['G50'] = "NPV Sensitivity"
+    ws['G50'].font = BOLD_FONT
     
     cost_items = [
         ("COGS", "=Income_Statement!B6"),
@@ -140,7 +146,14 @@ def create_dashboard(wb):
     for i, (item, formula) in enumerate(cost_items):
         ws[f'A{51+i}'] = item
         ws[f'B{51+i}'] = formula
-        ws[f'B{51+i}'].number_format = '#,##0'
+        apply(ws[f'B{51+i}'], number_format=NUMBER)
+        
+        # Copy sensitivity data
+        row = i + 51
+        ws[f'G{row}'] = f"=Sensitivity_Analysis!A{i+9}"  # Discount rates
+        ws[f'H{row}'] = f"=Sensitivity_Analysis!B{i+9}"  # NPV values
+        apply(ws[f'G{row}'], number_format=PERCENT)
+        apply(ws[f'H{row}'], number_format=NUMBER)
     
     chart3 = PieChart()
     chart3.title = "Cost Structure"
@@ -152,18 +165,6 @@ def create_dashboard(wb):
     
     ws.add_chart(chart3, "A65")
     
-    # NPV Sensitivity (from Sensitivity Analysis)
-    ws['G50'] = "NPV Sensitivity"
-    ws['G50'].font = Font(bold=True)
-    
-    # Copy sensitivity data
-    for i in range(5):
-        row = i + 51
-        ws[f'G{row}'] = f"=Sensitivity_Analysis!A{i+9}"  # Discount rates
-        ws[f'H{row}'] = f"=Sensitivity_Analysis!B{i+9}"  # NPV values
-        ws[f'G{row}'].number_format = '0.00%'
-        ws[f'H{row}'].number_format = '#,##0'
-    
     chart4 = ScatterChart()
     chart4.title = "NPV Sensitivity to Discount Rate"
     chart4.style = 10
@@ -185,10 +186,4 @@ def create_dashboard(wb):
     ws.conditional_formatting.add('B5:B12', green_to_red)  # Key metrics
     ws.conditional_formatting.add('E5:E9', green_to_red)   # Financial ratios
     
-    # Set column widths
-    for col in ['A', 'D']:
-        ws.column_dimensions[col].width = 25
-    for col in ['B', 'C', 'E', 'F', 'G', 'H']:
-        ws.column_dimensions[col].width = 15
-    
     print("Dashboard sheet created successfully")
\ No newline at end of file
@@ -0,0 +1,145 @@
+import re
+from functools import lru_cache
+import numpy as np
+from Formula_Engine import BINARY_OPS, FUNCTIONS, FormulaError, _divide, _number, parse_formula
+
+# Helpers visible to compiled code. Excel functions are bound as fn_<NAME>
+# (with dots replaced, e.g. fn_NORM_S_DIST) so they cannot clash with Python.
+NAMESPACE = {
+    "N": _number,
+    "DIV": _divide,
+    "POW": BINARY_OPS["^"],
+    "CONCAT": BINARY_OPS["&"],
+    **{f"fn_{name.replace('.', '_')}": function for name, function in FUNCTIONS.items()},
+}
+
+# Operators written inline; their operands go through N() as in BINARY_OPS
+INLINE_OPS = {"+": "+", "-": "-", "*": "*", "<": "<", ">": ">", "<=": "<=", ">=": ">="}
+
+
+def _numeric(tree):
+    """True for nodes that always produce a number, so N() can be skipped around them."""
+    if tree[0] == "const":
+        return isinstance(tree[1], (int, float))
+    return tree[0] in ("neg", "pct") or (tree[0] == "bin" and tree[1] in ("+", "-", "*"))
+
+
+def _slot(references, reference):
+    references.append(reference)
+    return "v[{%d}]" % (len(references) - 1)
+
+
+def _expression(tree, references):
+    """Source template for a parsed formula tree.
+
+    Every cell reference becomes a numbered slot, v[{0}], v[{1}], ..., and is
+    appended to references as (sheet, row, col); filling the slots with node
+    ids gives the Python expression. The expression computes exactly what
+    the operators and functions of Formula_Engine compute, so it works on
+    scalars and on NumPy arrays of scenarios alike.
+    """
+    def operand(node):
+        source = _expression(node, references)
+        return source if _numeric(node) else f"N({source})"
+
+    kind = tree[0]
+    if kind == "ref":
+        return _slot(references, tree[1:])
+    if kind == "const":
+        value = tree[1]
+        if isinstance(value, float) and not np.isfinite(value):
+            return f"float('{value}')"
+        return repr(value).replace("{", "{{").replace("}", "}}")
+    if kind == "range":
+        sheet, min_row, min_col, max_row, max_col = tree[1:]
+        slots = [_slot(references, (sheet, row, col))
+                 for row in range(min_row, max_row + 1)
+                 for col in range(min_col, max_col + 1)]
+        return f"[{', '.join(slots)}]"
+    if kind == "neg":
+        return f"(-{operand(tree[1])})"
+    if kind == "pct":
+        return f"({operand(tree[1])} / 100)"
+    if kind == "bin":
+        op, left, right = tree[1:]
+        if op in INLINE_OPS:
+            return f"({operand(left)} {INLINE_OPS[op]} {operand(right)})"
+        if op == "/":
+            return f"DIV({operand(left)}, {operand(right)})"
+        left, right = _expression(left, references), _expression(right, references)
+        if op == "^":
+            return f"POW({left}, {right})"
+        if op == "&":
+            return f"CONCAT({left}, {right})"
+        if op in ("=", "<>"):
+            return f"({left} {'==' if op == '=' else '!='} {right})"
+        raise FormulaError(f"Unsupported operator {op}")
+    if kind == "call":
+        if tree[1] not in FUNCTIONS:
+            raise FormulaError(f"Unsupported function {tree[1]}")
+        args = ", ".join(_expression(arg, references) for arg in tree[2])
+        return f"fn_{tree[1].replace('.', '_')}({args})"
+    raise FormulaError(f"Unknown node {kind}")
+
+
+@lru_cache(maxsize=1 << 16)
+def compile_formula(formula, sheet):
+    """Compile a cell formula written on sheet into (template, references).
+
+    references lists the (sheet, row, col) cells the formula reads, in slot
+    order; template.format(*node_ids) is the Python expression. Cached by
+    formula text, so every workbook built from the same template parses
+    each formula only once per process.
+    """
+    references = []
+    template = _expression(parse_formula(formula, sheet), references)
+    return template, tuple(references)
+
+
+def _define(source):
+    """Compile generated source defining one function and return the function."""
+    scope = {}
+    exec(compile(source, "<formulas>", "exec"), dict(NAMESPACE), scope)
+    return scope.popitem()[1]
+
+
+# Compiled once per distinct source (cached by its hash)
+_function = lru_cache(maxsize=512)(_define)
+
+
+def sheet_function(title, assignments, cache=True):
+    """One function evaluating a sheet's formulas in order.
+
+    assignments is a list of (node, expression). The function takes the
+    engine's value list, stores each formula's result in place and returns
+    it. Input cells may hold NumPy arrays, so one call evaluates the sheet
+    for every scenario at once. cache=False compiles it without keeping it.
+    """
+    name = re.sub(r"\W", "_", title)
+    lines = [f"def {name}(v):"]
+    lines += [f"    v[{node}] = {source}" for node, source in assignments]
+    lines.append("    return v")
+    return (_function if cache else _define)("\n".join(lines))
+
+
+def compile_program(engine, nodes, cache=True):
+    """Compile formula nodes (in evaluation order) into [(sheet title, function)].
+
+    Consecutive nodes of the same sheet share one function, so a model whose
+    sheets only refer to earlier sheets compiles to one function per sheet.
+    Identical sheets of other engines, e.g. every workbook built from the
+    same template, reuse the compiled function unless cache is False.
+    """
+    program = []
+    run, run_title = [], None
+    for node in nodes:
+        title = engine._keys[node][0]
+        if run and title != run_title:
+            program.append((run_title, sheet_function(run_title, run, cache)))
+            run = []
+        run_title = title
+        template, precedents = engine._compiled[node]
+        run.append((node, template.format(*precedents)))
+    if run:
+        program.append((run_title, sheet_function(run_title, run, cache)))
+    return program
@@ -0,0 +1,781 @@
+import re
+from array import array
+from graphlib import CycleError, TopologicalSorter
+import numpy as np
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+
+class FormulaError(Exception):
+    """Raised when a formula cannot be parsed or the model cannot be ordered."""
+
+
+# Tokens of the Excel formula subset emitted by the create_* functions
+TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<func>[A-Za-z][A-Za-z0-9.]*(?=\s*\())
+  | (?P<bool>TRUE|FALSE)
+  | (?P<ref>(?:(?:'[^']+'|[A-Za-z_][A-Za-z0-9_.]*)!)?\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<op><=|>=|<>|[-+*/^&%=<>(),])
+""", re.VERBOSE)
+
+CELL_PATTERN = re.compile(r"\$?([A-Za-z]{1,3})\$?(\d+)")
+
+COMPARISON_OPS = ("=", "<>", "<", ">", "<=", ">=")
+
+
+def tokenize(formula):
+    """Split a formula body (without the leading '=') into (kind, text) tokens."""
+    tokens = []
+    pos = 0
+    while pos < len(formula):
+        match = TOKEN_PATTERN.match(formula, pos)
+        if match is None:
+            raise FormulaError(f"Unexpected character {formula[pos]!r} in {formula!r}")
+        pos = match.end()
+        if match.lastgroup != "space":
+            tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+
+def split_reference(text, default_sheet):
+    """Split 'Sheet!B6' or 'B10:B15' into (sheet, (row, col), (row, col))."""
+    sheet = default_sheet
+    if "!" in text:
+        sheet, text = text.rsplit("!", 1)
+        sheet = sheet.strip("'")
+    corners = []
+    for part in text.split(":"):
+        col, row = CELL_PATTERN.fullmatch(part).groups()
+        corners.append((int(row), column_index_from_string(col.upper())))
+    return sheet, corners[0], corners[-1]
+
+
+class Parser:
+    """Recursive-descent parser producing a small tuple-based syntax tree.
+
+    Node shapes:
+        ("const", value)
+        ("ref", sheet, row, col)
+        ("range", sheet, min_row, min_col, max_row, max_col)
+        ("neg", node) / ("pct", node)
+        ("bin", op, left, right)
+        ("call", NAME, [args])
+    """
+
+    def __init__(self, formula, sheet):
+        self.formula = formula
+        self.sheet = sheet
+        self.tokens = tokenize(formula)
+        self.pos = 0
+
+    def parse(self):
+        node = self.comparison()
+        if self.pos != len(self.tokens):
+            raise FormulaError(f"Unexpected token {self.tokens[self.pos][1]!r} in {self.formula!r}")
+        return node
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, expected=None):
+        kind, text = self.peek()
+        if kind is None or (expected is not None and text != expected):
+            raise FormulaError(f"Expected {expected or 'a value'} in {self.formula!r}")
+        self.pos += 1
+        return kind, text
+
+    def binary(self, operand, operators):
+        node = operand()
+        while self.peek()[0] == "op" and self.peek()[1] in operators:
+            op = self.take()[1]
+            node = ("bin", op, node, operand())
+        return node
+
+    def comparison(self):
+        return self.binary(self.concat, COMPARISON_OPS)
+
+    def concat(self):
+        return self.binary(self.additive, ("&",))
+
+    def additive(self):
+        return self.binary(self.term, ("+", "-"))
+
+    def term(self):
+        return self.binary(self.power, ("*", "/"))
+
+    def power(self):
+        # Excel binds unary minus tighter than exponentiation (-2^2 = 4)
+        return self.binary(self.unary, ("^",))
+
+    def unary(self):
+        kind, text = self.peek()
+        if kind == "op" and text in ("-", "+"):
+            self.take()
+            operand = self.unary()
+            return ("neg", operand) if text == "-" else operand
+        node = self.primary()
+        while self.peek() == ("op", "%"):
+            self.take()
+            node = ("pct", node)
+        return node
+
+    def primary(self):
+        kind, text = self.take()
+        if kind == "number":
+            return ("const", float(text))
+        if kind == "string":
+            return ("const", text[1:-1].replace('""', '"'))
+        if kind == "bool":
+            return ("const", text == "TRUE")
+        if kind == "ref":
+            sheet, (r1, c1), (r2, c2) = split_reference(text, self.sheet)
+            if ":" in text:
+                return ("range", sheet, min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
+            return ("ref", sheet, r1, c1)
+        if kind == "func":
+            self.take("(")
+            args = []
+            if self.peek() != ("op", ")"):
+                args.append(self.comparison())
+                while self.peek() == ("op", ","):
+                    self.take()
+                    args.append(self.comparison())
+            self.take(")")
+            return ("call", text.upper(), args)
+        if (kind, text) == ("op", "("):
+            node = self.comparison()
+            self.take(")")
+            return node
+        raise FormulaError(f"Unexpected token {text!r} in {self.formula!r}")
+
+
+def parse_formula(formula, sheet):
+    """Parse a cell formula such as '=SUM(B5:B7)' written on the given sheet."""
+    return Parser(formula[1:] if formula.startswith("=") else formula, sheet).parse()
+
+
+# Value helpers shared by the operators and functions. Values are Python
+# scalars for a single model run or NumPy arrays (one entry per scenario).
+
+def _number(value):
+    if value is None or isinstance(value, str):
+        return 0.0 if value is None else np.nan
+    return value
+
+
+def _stack(values):
+    """Stack range values along a trailing axis, broadcasting scenario arrays."""
+    numbers = [_number(v) for v in values]
+    return np.stack(np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in numbers]), axis=-1)
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, np.ndarray) and value.ndim == 0 else value
+
+
+def _divide(numerator, denominator):
+    # Division by zero yields NaN, the engine's stand-in for #DIV/0!, for
+    # scalars and scenario arrays alike
+    if isinstance(numerator, np.ndarray) or isinstance(denominator, np.ndarray):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _scalar(np.where(np.asarray(denominator) == 0, np.nan, np.divide(numerator, denominator)))
+    return numerator / denominator if denominator != 0 else np.nan
+
+
+def _select(condition, when_true, when_false):
+    if isinstance(condition, np.ndarray) and condition.ndim > 0:
+        return np.where(condition, when_true, when_false)
+    return when_true if condition else when_false
+
+
+def irr(cash_flows, guess=0.1, max_iterations=100, tolerance=1e-10):
+    """IRR of cash flows along the last axis using a vectorized Newton iteration."""
+    flows = np.asarray(cash_flows, dtype=float)
+    periods = np.arange(flows.shape[-1])
+    rate = np.full(flows.shape[:-1], guess, dtype=float)
+    with np.errstate(all="ignore"):
+        for _ in range(max_iterations):
+            discount = (1 + rate)[..., None] ** -periods
+            npv = (flows * discount).sum(axis=-1)
+            slope = (-periods * flows * discount / (1 + rate)[..., None]).sum(axis=-1)
+            step = npv / slope
+            rate = rate - step
+            if np.all(np.abs(step) < tolerance):
+                break
+        converged = np.abs(step) < 1e-6
+    return _scalar(np.where(converged, rate, np.nan))
+
+
+def _gather(args):
+    """Concatenate scalar and range arguments into one array along the last axis."""
+    return np.concatenate([_stack(a if isinstance(a, list) else [a]) for a in args], axis=-1)
+
+
+def _fn_sum(*args):
+    return _scalar(_gather(args).sum(axis=-1))
+
+
+def _fn_min(*args):
+    return _scalar(_gather(args).min(axis=-1))
+
+
+def _fn_max(*args):
+    return _scalar(_gather(args).max(axis=-1))
+
+
+def _fn_npv(rate, *args):
+    flows = _gather(args)
+    periods = np.arange(1, flows.shape[-1] + 1)
+    return _scalar((flows / (1 + np.asarray(_number(rate), dtype=float))[..., None] ** periods).sum(axis=-1))
+
+
+def _fn_irr(values, guess=0.1):
+    return irr(_stack(values), guess=_number(guess))
+
+
+def _fn_match(lookup, values, match_type=1):
+    array = _stack(values)
+    lookup = np.asarray(_number(lookup), dtype=float)[..., None]
+    if match_type == 0:
+        hits = array == lookup
+        position = np.where(hits.any(axis=-1), hits.argmax(axis=-1) + 1, np.nan)
+    else:
+        # Approximate match over sorted data: position of the last qualifying value
+        hits = (array <= lookup) if match_type > 0 else (array >= lookup)
+        count = hits.sum(axis=-1)
+        position = np.where(count > 0, count, np.nan)
+    return _scalar(position)
+
+
+def _fn_index(values, row, column=None):
+    array = _stack(values)
+    position = np.asarray(_number(row), dtype=float)
+    valid = (position >= 1) & (position <= array.shape[-1])
+    take = np.where(valid, position, 1).astype(int) - 1
+    picked = np.take_along_axis(array, take[..., None], axis=-1)[..., 0] if array.ndim > 1 else array[take]
+    return _scalar(np.where(valid, picked, np.nan))
+
+
+def _fn_and(*args):
+    flat = [v for a in args for v in (a if isinstance(a, list) else [a])]
+    if any(isinstance(v, np.ndarray) for v in flat):
+        return np.logical_and.reduce(np.broadcast_arrays(*flat))
+    return all(flat)
+
+
+def _fn_or(*args):
+    flat = [v for a in args for v in (a if isinstance(a, list) else [a])]
+    if any(isinstance(v, np.ndarray) for v in flat):
+        return np.logical_or.reduce(np.broadcast_arrays(*flat))
+    return any(flat)
+
+
+FUNCTIONS = {
+    "SUM": _fn_sum,
+    "MIN": _fn_min,
+    "MAX": _fn_max,
+    "NPV": _fn_npv,
+    "IRR": _fn_irr,
+    "MATCH": _fn_match,
+    "INDEX": _fn_index,
+    "AND": _fn_and,
+    "OR": _fn_or,
+    "ABS": lambda value: np.abs(_number(value)),
+    "IF": lambda condition, when_true, when_false=False: _select(condition, when_true, when_false),
+}
+
+BINARY_OPS = {
+    "+": lambda a, b: _number(a) + _number(b),
+    "-": lambda a, b: _number(a) - _number(b),
+    "*": lambda a, b: _number(a) * _number(b),
+    "/": lambda a, b: _divide(_number(a), _number(b)),
+    "^": lambda a, b: _scalar(np.power(np.asarray(_number(a), dtype=float), _number(b))),
+    "&": lambda a, b: f"{'' if a is None else a}{'' if b is None else b}",
+    "=": lambda a, b: a == b,
+    "<>": lambda a, b: a != b,
+    "<": lambda a, b: _number(a) < _number(b),
+    ">": lambda a, b: _number(a) > _number(b),
+    "<=": lambda a, b: _number(a) <= _number(b),
+    ">=": lambda a, b: _number(a) >= _number(b),
+}
+
+
+class FormulaEngine:
+    """Evaluate a generated workbook natively, without a spreadsheet application.
+
+    Every non-empty cell becomes a node in a cross-sheet dependency graph.
+    Formula cells are compiled into Python expressions (Formula_Compiler)
+    and evaluated in topological order, one generated function per sheet,
+    so a full calculation is a single pass over the model. Input cells may
+    hold NumPy arrays, in which case every dependent cell is computed for
+    all scenarios at once.
+    """
+
+    def __init__(self, cells, cache=True):
+        """Build the engine from {sheet_title: {(row, col): value}}.
+
+        cache=False compiles the formulas without the process-wide caches
+        of Formula_Compiler, for one-off calculations that should not grow
+        them.
+        """
+        self._cache = cache
+        self.sheets = {title.upper(): title for title in cells}
+        self._index = {}
+        self._keys = []
+        self._values = []
+        self._formulas = {}
+
+        for title, sheet_cells in cells.items():
+            for (row, col), value in sheet_cells.items():
+                node = self._node(title, row, col)
+                if isinstance(value, str) and value.startswith("="):
+                    self._formulas[node] = value
+                else:
+                    self._values[node] = value
+
+        # Compile each formula and resolve its references to node ids
+        from Formula_Compiler import compile_formula
+        compile_formula = compile_formula if cache else compile_formula.__wrapped__
+        self._compiled = {}
+        self._precedents = {}
+        for node, formula in list(self._formulas.items()):
+            template, references = compile_formula(formula, self._keys[node][0])
+            precedents = [self._node(*reference) for reference in references]
+            self._compiled[node] = (template, precedents)
+            self._precedents[node] = set(precedents)
+
+        self._dependents = {}
+        for node, precedents in self._precedents.items():
+            for precedent in precedents:
+                self._dependents.setdefault(precedent, []).append(node)
+
+        self._order = self._topological_order()
+        self._position = {node: i for i, node in enumerate(self._order)}
+
+        # Incremental recalculation state: edited input cells, and the cached
+        # downstream evaluation plan and compiled program for each set of
+        # edited inputs (None for the whole model)
+        self._dirty = set()
+        self._plans = {}
+        self._programs = {}
+        self._calculated = False
+
+    @classmethod
+    def from_workbook(cls, wb):
+        """Collect every cell value of an openpyxl workbook into a new engine."""
+        cells = {}
+        for ws in wb.worksheets:
+            sheet_cells = cells.setdefault(ws.title, {})
+            if hasattr(ws, "cell_values"):
+                # Streaming sheets: calculated values of the rows written out
+                items = ws.cell_values()
+            elif hasattr(ws, "_cells"):
+                # Regular worksheets: read the cell store directly so that no
+                # empty cells are created while scanning
+                items = ((key, cell.value) for key, cell in ws._cells.items())
+            else:
+                items = (((cell.row, cell.column), cell.value)
+                         for row in ws.iter_rows() for cell in row if hasattr(cell, "column"))
+            for key, value in items:
+                if value is not None:
+                    sheet_cells[key] = value
+        return cls(cells)
+
+    def _node(self, sheet, row, col):
+        title = self.sheets.get(sheet.upper())
+        if title is None:
+            raise FormulaError(f"Reference to unknown sheet {sheet!r}")
+        key = (title, row, col)
+        node = self._index.get(key)
+        if node is None:
+            node = len(self._keys)
+            self._index[key] = node
+            self._keys.append(key)
+            self._values.append(None)
+        return node
+
+    def _topological_order(self):
+        """Order formula nodes so that every cell follows its precedents."""
+        remaining = {node: len([p for p in precedents if p in self._formulas])
+                     for node, precedents in self._precedents.items()}
+        dependents = self._dependents
+
+        ready = [node for node, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for dependent in dependents.get(node, ()):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(self._formulas):
+            cycle = sorted(self.address(n) for n, count in remaining.items() if count > 0)
+            raise FormulaError(f"Circular references between {', '.join(cycle[:10])}")
+        return self._group_by_sheet(order)
+
+    def _group_by_sheet(self, order):
+        """Reorder formula nodes sheet by sheet, so each sheet compiles to one function.
+
+        Possible when sheets only refer to sheets before them; with mutually
+        dependent sheets the cell order is kept.
+        """
+        nodes = {}
+        for node in order:
+            nodes.setdefault(self._keys[node][0], []).append(node)
+        graph = {title: set() for title in nodes}
+        for node, precedents in self._precedents.items():
+            title = self._keys[node][0]
+            graph[title].update(self._keys[p][0] for p in precedents
+                                if p in self._formulas and self._keys[p][0] != title)
+        try:
+            titles = list(TopologicalSorter(graph).static_order())
+        except CycleError:
+            return order
+        return [node for title in titles for node in nodes[title]]
+
+    def _program(self, inputs=None):
+        """Compiled functions evaluating the plan for inputs (None: every formula)."""
+        program = self._programs.get(inputs)
+        if program is None:
+            from Formula_Compiler import compile_program
+            program = compile_program(self, self._order if inputs is None else self._plan(inputs), self._cache)
+            self._programs[inputs] = program
+        return program
+
+    def calculate(self):
+        """Evaluate every formula cell of the model in dependency order."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for _, function in self._program():
+                function(self._values)
+        self._dirty.clear()
+        self._calculated = True
+        return self
+
+    def set_value(self, reference, value):
+        """Change an input cell and mark its downstream cells for recalculation."""
+        node = self._lookup(reference)
+        if node in self._formulas:
+            raise FormulaError(f"{reference} holds a formula; only input cells can be edited")
+        self._values[node] = value
+        self._dirty.add(node)
+
+    def set_values(self, changes):
+        """Change several input cells at once, e.g. {'Assumptions!B22': 0.09}."""
+        for reference, value in changes.items():
+            self.set_value(reference, value)
+
+    def _plan(self, inputs):
+        """Formula nodes downstream of the given inputs, in evaluation order."""
+        plan = self._plans.get(inputs)
+        if plan is None:
+            affected = set()
+            stack = list(inputs)
+            while stack:
+                for dependent in self._dependents.get(stack.pop(), ()):
+                    if dependent not in affected:
+                        affected.add(dependent)
+                        stack.append(dependent)
+            plan = sorted(affected, key=self._position.__getitem__)
+            self._plans[inputs] = plan
+        return plan
+
+    def downstream(self, *references):
+        """Addresses of the formula cells that depend on the given input cells."""
+        plan = self._plan(frozenset(self._lookup(r) for r in references))
+        return [self.address(node) for node in plan]
+
+    def recalculate(self):
+        """Re-evaluate only the cells downstream of inputs edited since the last pass.
+
+        Returns the number of formula cells that were evaluated.
+        """
+        if not self._dirty:
+            return 0
+        inputs = frozenset(self._dirty)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for _, function in self._program(inputs):
+                function(self._values)
+        self._dirty.clear()
+        return len(self._plan(inputs))
+
+    def calculate_scenarios(self, inputs):
+        """Evaluate the model for arrays of input values, one entry per scenario.
+
+        inputs maps input cells to 1-D arrays of equal length. Only cells
+        downstream of those inputs are recomputed; the engine's own values are
+        left untouched. Returns a read-only view {address: value} where
+        downstream cells hold arrays and all other cells their base values.
+        """
+        if self._dirty or not self._calculated:
+            self.calculate()
+        nodes = {}
+        for reference, values in inputs.items():
+            node = self._lookup(reference)
+            if node in self._formulas:
+                raise FormulaError(f"{reference} holds a formula; only input cells can be varied")
+            nodes[node] = np.asarray(values, dtype=float)
+
+        base = self._values
+        self._values = list(base)
+        try:
+            for node, values in nodes.items():
+                self._values[node] = values
+            with np.errstate(all="ignore"):
+                for _, function in self._program(frozenset(nodes)):
+                    function(self._values)
+            return ScenarioValues(self, self._values)
+        finally:
+            self._values = base
+
+    def address(self, node):
+        sheet, row, col = self._keys[node]
+        return f"{sheet}!{get_column_letter(col)}{row}"
+
+    def _lookup(self, reference):
+        sheet, (row, col), _ = split_reference(reference, None)
+        if sheet is None:
+            raise FormulaError(f"Reference {reference!r} must include a sheet name")
+        title = self.sheets.get(sheet.upper(), sheet)
+        node = self._index.get((title, row, col))
+        if node is None:
+            raise KeyError(reference)
+        return node
+
+    def value(self, reference):
+        """Return the current value of a cell such as 'Stock_Valuation!B28'."""
+        return self._values[self._lookup(reference)]
+
+    __getitem__ = value
+
+    def formula(self, reference):
+        """Return the formula text of a cell, or None for input cells."""
+        return self._formulas.get(self._lookup(reference))
+
+    def values(self):
+        """Return {'Sheet!A1': value} for every cell in the model."""
+        return {self.address(node): value for node, value in enumerate(self._values)}
+
+    def formula_values(self):
+        """Return {sheet_title: {(row, col): value}} for every formula cell."""
+        sheets = {}
+        for node in self._formulas:
+            title, row, col = self._keys[node]
+            sheets.setdefault(title, {})[row, col] = self._values[node]
+        return sheets
+
+
+class ScenarioValues:
+    """Cell values produced by FormulaEngine.calculate_scenarios()."""
+
+    def __init__(self, engine, values):
+        self._engine = engine
+        self._values = values
+
+    def __getitem__(self, reference):
+        return self._values[self._engine._lookup(reference)]
+
+    def get(self, reference, default=None):
+        try:
+            return self[reference]
+        except KeyError:
+            return default
+
+
+def evaluate_workbook(wb):
+    """Build a FormulaEngine for a workbook and calculate every formula."""
+    return FormulaEngine.from_workbook(wb).calculate()
+
+
+def _cell_lookup(ws):
+    """Function (row, col) -> value of a worksheet that creates no empty cells."""
+    if hasattr(ws, "cell_value"):
+        # Streaming sheets
+        return ws.cell_value
+    if hasattr(ws, "_cells"):
+        cells = ws._cells
+        return lambda row, col: getattr(cells.get((row, col)), "value", None)
+    values = {(cell.row, cell.column): cell.value
+              for row in ws.iter_rows() for cell in row if hasattr(cell, "column")}
+    return lambda row, col: values.get((row, col))
+
+
+def evaluate_cells(wb, references):
+    """Calculate only the given cells of a workbook and the cells they depend on.
+
+    references are addresses such as 'Stock_Valuation!B28'. Their formulas
+    are followed cell by cell, so the returned FormulaEngine holds just that
+    part of the model; far cheaper than evaluate_workbook when a few results
+    are needed.
+    """
+    from Formula_Compiler import compile_formula
+    sheets = {ws.title.upper(): (ws.title, _cell_lookup(ws)) for ws in wb.worksheets}
+    cells = {}
+    pending = []
+    for reference in references:
+        sheet, (row, col), _ = split_reference(reference, None)
+        pending.append((sheet, row, col))
+    while pending:
+        sheet, row, col = pending.pop()
+        if sheet.upper() not in sheets:
+            raise FormulaError(f"Reference to unknown sheet {sheet!r}")
+        title, lookup = sheets[sheet.upper()]
+        sheet_cells = cells.setdefault(title, {})
+        if (row, col) in sheet_cells:
+            continue
+        value = sheet_cells[row, col] = lookup(row, col)
+        if isinstance(value, str) and value.startswith("="):
+            pending.extend(compile_formula(value, title)[1])
+    return FormulaEngine(cells).calculate()
+
+
+# Formulas a StreamCalculator evaluates with one engine
+CALCULATION_BATCH = 64
+
+
+class StreamCalculator:
+    """Calculate a workbook whose cells arrive a few rows at a time, keeping only values.
+
+    Streaming builds write each sheet out row by row. add() takes the
+    cells of rows just written, calculates every formula whose precedents
+    are all known by then and keeps only the results: numbers packed in
+    one float array per row (8 bytes a cell), other values by cell.
+    Formulas referring to rows not written yet wait until those arrive.
+    Ready formulas are calculated CALCULATION_BATCH at a time, so memory
+    does not grow with the width of a row.
+    """
+
+    def __init__(self):
+        self.sheets = {}
+        self._written = {}      # title -> last row written so far
+        self._numbers = {}      # title -> {row: array of floats by column, NaN where empty}
+        self._other = {}        # title -> {(row, col): text, booleans, integers and errors}
+        # (title, row, col) -> compiled formula waiting for its precedents:
+        # (template, cells it reads), see Formula_Compiler.compile_formula
+        self._pending = {}
+        self._blockers = {}     # (title, row, col) -> an unwritten cell its formula waits for
+
+    def add_sheet(self, title):
+        self.sheets[title.upper()] = title
+        self._written[title] = 0
+        self._numbers[title] = {}
+        self._other[title] = {}
+
+    def add(self, title, cells, written):
+        """Take ((row, col), value) pairs of a sheet, complete up to row written."""
+        from Formula_Compiler import compile_formula
+        for (row, col), value in cells:
+            if isinstance(value, str) and value.startswith("="):
+                # Compiled without the formula cache, which would grow with the horizon
+                template, references = compile_formula.__wrapped__(value, title)
+                self._pending[title, row, col] = (template, [(self.sheets.get(sheet.upper(), sheet), r, c)
+                                                             for sheet, r, c in references])
+            else:
+                self._store(title, row, col, value)
+        self._written[title] = written
+        self._calculate()
+
+    def _store(self, title, row, col, value):
+        if isinstance(value, float) and value == value:
+            numbers = self._numbers[title].get(row)
+            if numbers is None:
+                numbers = self._numbers[title][row] = array("d")
+            if len(numbers) < col:
+                numbers.extend([np.nan] * (col - len(numbers)))
+            numbers[col - 1] = value
+        elif value is not None:
+            self._other[title][row, col] = value
+
+    def _known(self, reference):
+        title, row, _ = reference
+        return row <= self._written.get(title, 0)
+
+    def _calculate(self):
+        """Calculate the pending formulas whose precedents are all written."""
+        pending = self._pending
+        blockers = self._blockers
+        blocked = []
+        dependents = {}
+        for key, (_, references) in pending.items():
+            # Most waiting formulas still wait for the cell they waited for last time
+            blocker = blockers.get(key)
+            if blocker is not None and not self._known(blocker):
+                blocked.append(key)
+                continue
+            blocker = next((reference for reference in references
+                            if reference not in pending and not self._known(reference)), None)
+            if blocker is not None:
+                blockers[key] = blocker
+                blocked.append(key)
+                continue
+            for reference in references:
+                if reference in pending:
+                    dependents.setdefault(reference, []).append(key)
+        waiting = set(blocked)
+        while blocked:
+            for dependent in dependents.get(blocked.pop(), ()):
+                if dependent not in waiting:
+                    waiting.add(dependent)
+                    blocked.append(dependent)
+        ready = {key for key in pending if key not in waiting}
+        if not ready:
+            return
+
+        # Ready formulas in dependency order, calculated a batch at a time
+        # so that the engine stays small however wide the rows are
+        graph = {key: [reference for reference in pending[key][1] if reference in ready]
+                 for key in ready}
+        try:
+            order = list(TopologicalSorter(graph).static_order())
+        except CycleError as error:
+            cycle = sorted(f"{title}!{get_column_letter(col)}{row}" for title, row, col in error.args[1])
+            raise FormulaError(f"Circular references between {', '.join(cycle[:10])}") from None
+        for start in range(0, len(order), CALCULATION_BATCH):
+            self._calculate_batch(order[start:start + CALCULATION_BATCH])
+
+    def _calculate_batch(self, keys):
+        """Calculate formulas whose precedents are known or earlier in keys.
+
+        The formulas are compiled into one function (as FormulaEngine does)
+        over a value list holding just the batch and the cells it reads.
+        """
+        from Formula_Compiler import sheet_function
+        slots = {key: i for i, key in enumerate(keys)}
+        values = [None] * len(keys)
+        assignments = []
+        for key in keys:
+            template, references = self._pending.pop(key)
+            self._blockers.pop(key, None)
+            ids = []
+            for reference in references:
+                slot = slots.get(reference)
+                if slot is None:
+                    slot = slots[reference] = len(values)
+                    values.append(self.value(*reference))
+                ids.append(slot)
+            assignments.append((slots[key], template.format(*ids)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sheet_function(keys[0][0], assignments, cache=False)(values)
+        for key in keys:
+            self._store(*key, values[slots[key]])
+
+    def value(self, title, row, col):
+        """Calculated value of a written cell (None if empty or still waiting)."""
+        value = self._other[title].get((row, col))
+        if value is not None:
+            return value
+        numbers = self._numbers[title].get(row)
+        if numbers is not None and col <= len(numbers) and numbers[col - 1] == numbers[col - 1]:
+            return numbers[col - 1]
+        return None
+
+    def values(self, title):
+        """(row, col), value pairs of a sheet's written, non-empty cells."""
+        for row, numbers in self._numbers[title].items():
+            for col, value in enumerate(numbers, 1):
+                if value == value:
+                    yield (row, col), value
+        yield from self._other[title].items()
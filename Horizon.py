@@ -0,0 +1,125 @@
+from math import ceil
+from openpyxl.utils import get_column_letter
+
+PERIODS_PER_YEAR = {"annual": 1, "quarterly": 4, "monthly": 12}
+PERIOD_NAMES = {"annual": "Year", "quarterly": "Quarter", "monthly": "Month"}
+
+# Statements start in column B; Excel allows columns up to XFD (16384)
+FIRST_COLUMN = 2
+MAX_PERIODS = 16384 - FIRST_COLUMN
+
+
+def extend_series(values, count):
+    """Extend a yearly schedule to count values.
+
+    Years past the end of the list continue at the list's last
+    year-on-year growth rate (a single value is held flat). Extended
+    values are rounded to whole units like the hand-entered schedules.
+    """
+    values = list(values[:count])
+    ratio = values[-1] / values[-2] if len(values) > 1 and values[-2] else 1
+    while len(values) < count:
+        values.append(round(values[-1] * ratio))
+    return values
+
+
+class Horizon:
+    """Forecast horizon shared by every statement sheet.
+
+    start is the first forecast year, periods the number of statement
+    columns and granularity one of "annual", "quarterly" or "monthly".
+    Period i (0-based) lives in column FIRST_COLUMN + i.
+    """
+
+    def __init__(self, start=2025, periods=5, granularity="annual"):
+        if granularity not in PERIODS_PER_YEAR:
+            raise ValueError(f"granularity must be one of {', '.join(PERIODS_PER_YEAR)}, got {granularity!r}")
+        if not 1 <= periods <= MAX_PERIODS:
+            raise ValueError(f"periods must be between 1 and {MAX_PERIODS}, got {periods}")
+        self.start = int(start)
+        self.periods = int(periods)
+        self.granularity = granularity
+        self.per_year = PERIODS_PER_YEAR[granularity]
+        self.period_name = PERIOD_NAMES[granularity]
+        self.letters = [get_column_letter(FIRST_COLUMN + i) for i in range(self.periods)]
+
+    def __repr__(self):
+        return f"Horizon(start={self.start}, periods={self.periods}, granularity={self.granularity!r})"
+
+    @property
+    def years(self):
+        """Length of the horizon in years (fractional for partial years)."""
+        years = self.periods / self.per_year
+        return int(years) if years == int(years) else years
+
+    @property
+    def labels(self):
+        """Column headers: "2025", "2025-Q1" or "2025-01" style."""
+        labels = []
+        for i in range(self.periods):
+            year, part = divmod(i, self.per_year)
+            year += self.start
+            if self.granularity == "annual":
+                labels.append(str(year))
+            elif self.granularity == "quarterly":
+                labels.append(f"{year}-Q{part + 1}")
+            else:
+                labels.append(f"{year}-{part + 1:02d}")
+        return labels
+
+    @property
+    def first_col(self):
+        return FIRST_COLUMN
+
+    @property
+    def last_col(self):
+        return FIRST_COLUMN + self.periods - 1
+
+    @property
+    def columns(self):
+        """Column numbers of the statement periods."""
+        return range(FIRST_COLUMN, FIRST_COLUMN + self.periods)
+
+    @property
+    def first_letter(self):
+        return self.letters[0]
+
+    @property
+    def last_letter(self):
+        return self.letters[-1]
+
+    def last_year_total(self, sheet, row):
+        """Formula text for the final year's total of a statement row."""
+        if self.per_year == 1:
+            return f"{sheet}!{self.last_letter}{row}"
+        first = self.letters[max(self.periods - self.per_year, 0)]
+        return f"SUM({sheet}!{first}{row}:{self.last_letter}{row})"
+
+    def per_period(self, annual_values, first_year=0):
+        """Spread a yearly schedule over the periods.
+
+        annual_values[k] is the full-year amount for forecast year
+        first_year + k; earlier periods use the first value and later
+        years are extended with extend_series. Returns one value per
+        period, each year's amount split evenly across its periods.
+        """
+        years = max(ceil(self.periods / self.per_year) - first_year, 1)
+        values = extend_series(annual_values, years)
+        if self.per_year == 1:
+            return [values[max(i - first_year, 0)] for i in range(self.periods)]
+        return [values[max(i // self.per_year - first_year, 0)] / self.per_year for i in range(self.periods)]
+
+    def growth_factor(self, ref):
+        """Formula text for one period's growth at the annual rate in ref."""
+        if self.per_year == 1:
+            return f"(1+{ref})"
+        return f"(1+{ref})^(1/{self.per_year})"
+
+    def exponent(self, period):
+        """Formula text for the year fraction of the end of period 1, 2, ..."""
+        if self.per_year == 1:
+            return f"{period}"
+        return f"({period}/{self.per_year})"
+
+
+DEFAULT_HORIZON = Horizon()
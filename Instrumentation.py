@@ -0,0 +1,67 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+def cell_count(ws):
+    """Number of cells written to a sheet (buffered or streamed out)."""
+    if hasattr(ws, "cell_count"):
+        # Streaming sheets count the rows already written out as well
+        return ws.cell_count
+    return len(getattr(ws, "_cells", ()))
+
+
+def style_count(wb):
+    """Number of distinct fonts, fills, borders, alignments and number formats in the workbook."""
+    # StreamingWorkbook wraps the write-only openpyxl workbook
+    wb = getattr(wb, "_wb", wb)
+    return (len(wb._fonts) + len(wb._fills) + len(wb._borders) + len(wb._alignments)
+            + len(wb._number_formats))
+
+
+@contextmanager
+def instrument(step, wb, on_record, sheet=None, trace_memory=True):
+    """Measure one build step and pass the record to on_record.
+
+    The record is a dict with the step name, wall and CPU time in
+    seconds, the cells written to sheet (every sheet's total if no sheet
+    is given), the number of new fonts, fills, borders, alignments and
+    number formats the step added to the workbook and, with
+    trace_memory, the tracemalloc peak in bytes above the memory in use
+    when the step started. Tracing memory slows the step down, so the
+    times are only comparable between runs with the same setting.
+    """
+    started = trace_memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+    styles_before = style_count(wb)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    try:
+        yield
+        record = {
+            "step": step,
+            "wall_s": time.perf_counter() - wall_start,
+            "cpu_s": time.process_time() - cpu_start,
+            "cells": cell_count(wb[sheet]) if sheet else sum(cell_count(ws) for ws in wb.worksheets),
+            "styles_created": style_count(wb) - styles_before,
+            "peak_bytes": tracemalloc.get_traced_memory()[1] - memory_before if trace_memory else None,
+        }
+    finally:
+        if started:
+            tracemalloc.stop()
+    on_record(record)
+
+
+def json_lines(file=sys.stderr):
+    """Callback for instrument() writing one JSON record per line to file."""
+    def write(record):
+        file.write(json.dumps(record) + "\n")
+        file.flush()
+    return write
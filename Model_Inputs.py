@@ -0,0 +1,242 @@
+import csv
+import json
+import math
+import os
+
+# Company figures the sheet builders used to hard-code. Yearly schedules
+# (lists) start in the first forecast year unless noted and are extended
+# past their end with Horizon.extend_series; amounts are positive and the
+# statements apply the sign.
+DEFAULTS = {
+    "company_id": "",
+    "base_revenues": [1000000, 750000, 500000],         # First-year revenue of product lines 1-3
+    "depreciation": [100000, 105000, 110250, 115763, 121551],
+    "interest_expense": [2000000, 1800000, 1500000, 1200000, 1000000],
+    "capex": [200000, 210000, 220500, 231525, 243101],
+    "dividends": [50000, 55000, 60500, 66550, 73205],
+    "working_capital_changes": [-20000, -25000, -30000, -35000],  # From the second year; negative uses cash
+    "debt_repayment": 100000,                           # Per year
+    "opening_cash": 500000,
+    "opening_ppe": 2000000,
+    "opening_debt": 1000000,
+    "common_stock": 1000000,
+    "opening_retained_earnings": 500000,
+    "shares_outstanding": 1000000,
+    "bond": {"par": 1000, "coupon_rate": 0.05, "years": 10, "frequency": 2, "yield_rate": 0.06, "price": 950},
+    "initial_investment": 500000,
+    "salvage_value": 50000,
+    "project_cash_flows": [120000, 150000, 180000, 200000, 220000],
+    "assumptions": {},                                  # Assumptions sheet overrides by label
+}
+
+
+def _number(value, name, minimum=None, positive=False):
+    if isinstance(value, str):
+        # CSV cells; whole numbers stay ints like the hand-entered figures
+        text = value.strip()
+        try:
+            value = float(text)
+        except ValueError:
+            raise ValueError(f"{name} must be a number, got {text!r}") from None
+        if value.is_integer() and text.lstrip("+-").isdigit():
+            value = int(text)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number, got {value!r}")
+    if positive and value <= 0:
+        raise ValueError(f"{name} must be greater than 0, got {value!r}")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}, got {value!r}")
+    return value
+
+
+def _text(value, name):
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string, got {value!r}")
+    return value
+
+
+def _amount(value, name):
+    return _number(value, name, minimum=0)
+
+
+def _series(value, name, length=None):
+    if isinstance(value, str):
+        # CSV cells hold schedules as "100000;105000;110250"
+        value = value.split(";")
+    if not isinstance(value, (list, tuple)) or not value:
+        raise ValueError(f"{name} must be a non-empty list of numbers, got {value!r}")
+    if length is not None and len(value) != length:
+        raise ValueError(f"{name} must have {length} values, got {len(value)}")
+    return tuple(_number(item, f"{name}[{i}]") for i, item in enumerate(value))
+
+
+def _amounts(value, name):
+    values = _series(value, name)
+    for i, item in enumerate(values):
+        _amount(item, f"{name}[{i}]")
+    return values
+
+
+def payment_periods(years, frequency):
+    """Number of coupon periods of a bond; years x frequency must be a whole number of at least 1."""
+    periods = years * frequency
+    if abs(periods - round(periods)) > 1e-9 or round(periods) < 1:
+        raise ValueError(f"bond must have a whole number of payment periods (at least 1), "
+                         f"got {years!r} years x {frequency!r} per year = {periods:g}")
+    return int(round(periods))
+
+
+def _bond(value, name):
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, dict):
+        raise ValueError(f"{name} must be a mapping of bond terms, got {value!r}")
+    unknown = set(value) - set(DEFAULTS["bond"])
+    if unknown:
+        raise ValueError(f"{name} has unknown terms: {', '.join(sorted(unknown))}")
+    terms = dict(DEFAULTS["bond"], **value)
+    for term in ("par", "years", "frequency", "price"):
+        _number(terms[term], f"{name}.{term}", positive=True)
+    for term in ("coupon_rate", "yield_rate"):
+        _number(terms[term], f"{name}.{term}", minimum=0)
+    payment_periods(terms["years"], terms["frequency"])
+    return terms
+
+
+def bond_terms(bond=None):
+    """Complete bond terms: the default bond updated with bond, validated.
+
+    Raises ValueError for unknown or invalid terms, so a mistyped key fails
+    instead of silently leaving the default in place.
+    """
+    return _bond(dict(bond or {}), "bond")
+
+
+def _assumptions(value, name):
+    if isinstance(value, str):
+        value = json.loads(value) if value else {}
+    if not isinstance(value, dict):
+        raise ValueError(f"{name} must be a mapping of Assumptions labels to values, got {value!r}")
+    return {_text(label, f"{name} label"): _number(item, f"{name}[{label!r}]") for label, item in value.items()}
+
+
+# Field name -> validator returning the cleaned value
+SCHEMA = {
+    "company_id": _text,
+    "base_revenues": lambda value, name: _series(value, name, length=3),
+    "depreciation": _amounts,
+    "interest_expense": _amounts,
+    "capex": _amounts,
+    "dividends": _amounts,
+    "working_capital_changes": _series,
+    "debt_repayment": _amount,
+    "opening_cash": _number,
+    "opening_ppe": _amount,
+    "opening_debt": _amount,
+    "common_stock": _amount,
+    "opening_retained_earnings": _number,
+    "shares_outstanding": lambda value, name: _number(value, name, positive=True),
+    "bond": _bond,
+    "initial_investment": lambda value, name: _number(value, name, positive=True),
+    "salvage_value": _amount,
+    # The Capital_Budgeting and Sensitivity_Analysis layouts are five years long
+    "project_cash_flows": lambda value, name: _series(value, name, length=5),
+    "assumptions": _assumptions,
+}
+
+
+class ModelInputs:
+    """One company's validated input set for the model.
+
+    Fields are the keys of DEFAULTS; any that are not given keep their
+    default. Schedules are stored as tuples. Unknown fields and invalid
+    values raise ValueError naming every problem found.
+    """
+
+    __slots__ = tuple(SCHEMA) + ("source",)
+
+    def __init__(self, source=None, **fields):
+        errors = [f"unknown field {name!r}" for name in fields if name not in SCHEMA]
+        for name, validate in SCHEMA.items():
+            value = fields.get(name, DEFAULTS[name])
+            try:
+                setattr(self, name, validate(value, name))
+            except (ValueError, TypeError) as exc:
+                errors.append(str(exc))
+        if errors:
+            where = f" in {source}" if source else ""
+            raise ValueError(f"Invalid model inputs{where}: " + "; ".join(errors))
+        self.source = source
+
+    def __repr__(self):
+        label = f" {self.company_id!r}" if self.company_id else ""
+        return f"<ModelInputs{label}>"
+
+    def __eq__(self, other):
+        return isinstance(other, ModelInputs) and self.as_dict() == other.as_dict()
+
+    def as_dict(self):
+        """Plain dict of every field (schedules as lists), e.g. for JSON."""
+        return {name: list(value) if isinstance(value, tuple) else value
+                for name, value in ((name, getattr(self, name)) for name in SCHEMA)}
+
+    def replace(self, **fields):
+        """Copy with some fields changed."""
+        return ModelInputs(source=self.source, **dict(self.as_dict(), **fields))
+
+
+DEFAULT_INPUTS = ModelInputs()
+
+
+def _load_yaml(f):
+    import yaml   # Optional dependency, only needed for YAML inputs
+    return yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def load_inputs(path):
+    """Load the input sets in a .json, .yaml/.yml or .csv file.
+
+    JSON and YAML files hold one mapping of fields or a list of them. CSV
+    files hold one company per row with a header of field names; empty
+    cells keep the default, schedules are written "v1;v2;..." and the
+    bond and assumptions columns hold JSON. Returns a list of ModelInputs.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="" if extension == ".csv" else None) as f:
+        if extension == ".json":
+            data = json.load(f)
+        elif extension in (".yaml", ".yml"):
+            data = _load_yaml(f)
+        elif extension == ".csv":
+            data = [{name: value for name, value in row.items() if value not in ("", None)}
+                    for row in csv.DictReader(f)]
+        else:
+            raise ValueError(f"Unsupported input file type {extension!r} for {path}")
+
+    records = data if isinstance(data, list) else [data]
+    if not records:
+        raise ValueError(f"No model inputs in {path}")
+    inputs = []
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f"Invalid model inputs in {path}: entry {i} is not a mapping")
+        source = path if len(records) == 1 else f"{path}[{i}]"
+        inputs.append(ModelInputs(source=source, **record))
+    return inputs
+
+
+def load_many(paths, errors="raise"):
+    """Load every input set in paths (see load_inputs) into one list.
+
+    With errors="collect" invalid files are skipped and returned as
+    (path, message) pairs: the result is then (inputs, failures).
+    """
+    inputs, failures = [], []
+    for path in paths:
+        try:
+            inputs.extend(load_inputs(path))
+        except (OSError, ValueError) as exc:
+            if errors == "raise":
+                raise
+            failures.append((path, str(exc)))
+    return (inputs, failures) if errors == "collect" else inputs
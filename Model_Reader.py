@@ -0,0 +1,138 @@
+import numbers
+import re
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+from Formula_Engine import FormulaEngine
+
+# Known statement layouts: sheet -> (period header row, first line item row,
+# last line item row). Line item labels are in column A and the periods run
+# from column B for as many columns as the header row has labels.
+STATEMENTS = {
+    "Revenue_Forecast": (3, 5, 9),
+    "COGS_Budget": (3, 5, 9),
+    "OPEX_Budget": (3, 5, 9),
+    "Income_Statement": (3, 5, 25),
+    "Balance_Sheet": (3, 5, 23),
+    "Cash_Flow": (3, 5, 22),
+    "Stock_Valuation": (9, 10, 16),   # Free cash flow build-up
+}
+
+# Sheet names in formula references, e.g. Assumptions!B6 or 'My Sheet'!A1
+SHEET_REFERENCE = re.compile(r"(?:'([^']+)'|([A-Za-z_][A-Za-z0-9_.]*))!")
+
+
+def _sheet_cells(ws):
+    """{(row, col): value} of a read-only sheet's non-empty cells."""
+    cells = {}
+    for row, values in enumerate(ws.iter_rows(values_only=True), 1):
+        for col, value in enumerate(values, 1):
+            if value is not None:
+                cells[row, col] = value
+    return cells
+
+
+def _calculated_cells(wb, sheets):
+    """Cell values of sheets, calculated natively with the FormulaEngine.
+
+    Only the statement sheets and the sheets their formulas refer to (and so
+    on) are read, so large sheets such as DCF_Surface are skipped.
+    """
+    titles = {title.upper(): title for title in wb.sheetnames}
+    cells = {}
+    pending = list(sheets)
+    while pending:
+        title = pending.pop()
+        if title in cells:
+            continue
+        cells[title] = _sheet_cells(wb[title])
+        for value in cells[title].values():
+            if isinstance(value, str) and value.startswith("="):
+                for quoted, plain in SHEET_REFERENCE.findall(value):
+                    referenced = titles.get((quoted or plain).upper())
+                    if referenced and referenced not in cells:
+                        pending.append(referenced)
+
+    engine = FormulaEngine(cells).calculate()
+    return {title: {(row, col): engine.value(f"{title}!{get_column_letter(col)}{row}")
+                    for (row, col) in cells[title]}
+            for title in sheets}
+
+
+def _statement(cells, header_row, first_row, last_row):
+    """One statement as a line item x period DataFrame, and whether its last row has values."""
+    periods = []
+    col = 2
+    while (header_row, col) in cells:
+        periods.append(str(cells[header_row, col]))
+        col += 1
+
+    items, rows = [], []
+    for row in range(first_row, last_row + 1):
+        label = cells.get((row, 1))
+        values = [cells.get((row, col)) for col in range(2, len(periods) + 2)]
+        if label is None or all(value is None for value in values):
+            # Blank rows and section headings
+            continue
+        items.append(str(label).strip())
+        # Text such as cached Excel errors (#DIV/0!, #VALUE!) reads as missing
+        rows.append([value if isinstance(value, numbers.Real) else np.nan for value in values])
+    complete = any(cells.get((last_row, col)) is not None for col in range(2, len(periods) + 2))
+
+    frame = pd.DataFrame(rows, index=pd.Index(items, name="line_item"),
+                         columns=pd.Index(periods, name="period"), dtype=float)
+    return frame, complete
+
+
+def read_statements(path, calculate=None, sheets=tuple(STATEMENTS)):
+    """Read the financial statements of a generated workbook into DataFrames.
+
+    Returns {sheet: DataFrame} with one row per line item and one column per
+    period, for each sheet in sheets (keys of STATEMENTS). The workbook is
+    opened in openpyxl read-only mode and only the sheets needed are
+    streamed, so memory stays bounded by the statements, not the file.
+
+    Files saved by a spreadsheet application, or by create_financial_model
+    with cached_values, carry cached formula values; other files written by
+    openpyxl do not, and their formulas are calculated natively instead. calculate=None picks automatically, True always
+    calculates and False only uses cached values (formulas without one read
+    as NaN).
+    """
+    wb = load_workbook(path, read_only=True, data_only=not calculate)
+    try:
+        statements = {}
+        if not calculate:
+            for title in sheets:
+                statements[title] = _statement(_sheet_cells(wb[title]), *STATEMENTS[title])
+                if calculate is None and not statements[title][1]:
+                    # The last line item is always a formula, so the file has no cached values
+                    statements = None
+                    break
+        if statements is None or calculate:
+            if calculate is None:
+                # No cached values: reopen with the formulas
+                wb.close()
+                wb = load_workbook(path, read_only=True)
+            cells = _calculated_cells(wb, sheets)
+            statements = {title: _statement(cells[title], *STATEMENTS[title]) for title in sheets}
+    finally:
+        wb.close()
+    return {title: frame for title, (frame, _) in statements.items()}
+
+
+def read_many(paths, calculate=None, sheets=tuple(STATEMENTS)):
+    """Yield (path, statements) for each workbook in paths, one file at a time."""
+    for path in paths:
+        yield path, read_statements(path, calculate, sheets)
+
+
+def long_format(statements):
+    """Stack {sheet: DataFrame} into one tidy frame.
+
+    Columns are statement, line_item, period and value; line items without
+    a value for a period are dropped.
+    """
+    frames = [frame.stack().rename("value").reset_index().assign(statement=title)
+              for title, frame in statements.items()]
+    return pd.concat(frames, ignore_index=True)[["statement", "line_item", "period", "value"]]
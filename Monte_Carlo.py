@@ -0,0 +1,91 @@
+import numpy as np
+from Capital_Budgeting import INITIAL_INVESTMENT, SALVAGE_VALUE, ANNUAL_CASH_FLOWS
+
+# Distributions for the uncertain project inputs. Each entry is the name of a
+# numpy.random.Generator method and its keyword arguments. Cash flows are
+# drawn as a multiplier applied independently to each year's base cash flow;
+# the discount rate and salvage value are drawn directly.
+DEFAULT_DISTRIBUTIONS = {
+    "cash_flows": ("normal", {"loc": 1.0, "scale": 0.15}),
+    "discount_rate": ("triangular", {"left": 0.08, "mode": 0.10, "right": 0.12}),
+    "salvage_value": ("uniform", {"low": 0.5 * SALVAGE_VALUE, "high": 1.5 * SALVAGE_VALUE}),
+}
+
+
+def _draw(rng, spec, size):
+    kind, params = spec
+    return getattr(rng, kind)(size=size, **params)
+
+
+def _npv_paths(rng, distributions, size, investment, cash_flows):
+    """NPV of one chunk of simulated project paths."""
+    years = np.arange(1, len(cash_flows) + 1)
+    flows = cash_flows * _draw(rng, distributions["cash_flows"], (size, len(cash_flows)))
+    rate = _draw(rng, distributions["discount_rate"], size)
+    salvage = _draw(rng, distributions["salvage_value"], size)
+    discount = (1 + rate)[:, None] ** -years
+    flows[:, -1] += salvage
+    return (flows * discount).sum(axis=1) - investment
+
+
+def simulate_npv(paths=1_000_000, seed=None, distributions=None, chunk_size=250_000, bins=20,
+                 investment=INITIAL_INVESTMENT, cash_flows=ANNUAL_CASH_FLOWS):
+    """Monte Carlo NPV statistics for the Capital_Budgeting project.
+
+    Paths are simulated in chunks of chunk_size so memory stays bounded no
+    matter how many paths are requested. Results are reproducible for a
+    given seed and chunk size. Returns a dict of summary statistics plus
+    the histogram bin edges and counts; the first and last bins are
+    open-ended and collect any paths outside the edges.
+    """
+    dist = dict(DEFAULT_DISTRIBUTIONS)
+    dist.update(distributions or {})
+    rng = np.random.default_rng(seed)
+    cash_flows = np.asarray(cash_flows, dtype=float)
+
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    negative = 0
+    low = np.inf
+    high = -np.inf
+    edges = None
+    counts = np.zeros(bins, dtype=np.int64)
+
+    while count < paths:
+        size = min(chunk_size, paths - count)
+        npv = _npv_paths(rng, dist, size, investment, cash_flows)
+
+        if edges is None:
+            # Fix the histogram range from the first chunk
+            lo, hi = np.quantile(npv, [0.001, 0.999])
+            edges = np.linspace(lo, hi, bins + 1)
+        counts += np.bincount(np.clip(np.searchsorted(edges, npv, side="right") - 1, 0, bins - 1),
+                              minlength=bins)
+
+        # Merge the chunk's mean and variance into the running totals
+        chunk_mean = npv.mean()
+        chunk_m2 = ((npv - chunk_mean) ** 2).sum()
+        total = count + size
+        delta = chunk_mean - mean
+        mean += delta * size / total
+        m2 += chunk_m2 + delta ** 2 * count * size / total
+        count = total
+
+        negative += int((npv < 0).sum())
+        low = min(low, npv.min())
+        high = max(high, npv.max())
+
+    std = np.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+    return {
+        "paths": count,
+        "mean": float(mean),
+        "std": float(std),
+        "coefficient_of_variation": float(std / abs(mean)) if mean else float("nan"),
+        "min": float(low),
+        "max": float(high),
+        "range": float(high - low),
+        "probability_negative": negative / count,
+        "bin_edges": edges,
+        "counts": counts,
+    }
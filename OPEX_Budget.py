@@ -1,29 +1,36 @@
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, numbers
 from openpyxl.utils import get_column_letter
+from Horizon import DEFAULT_HORIZON
+from Model_Inputs import DEFAULT_INPUTS
+from Styles import TITLE_FONT, BOLD_FONT, ORANGE_FILL, NUMBER, apply, number_row
 
-def create_opex_budget(wb):
-    """Create and format the OPEX_Budget sheet."""
+def create_opex_budget(wb, horizon=DEFAULT_HORIZON, inputs=DEFAULT_INPUTS):
+    """Create and format the OPEX_Budget sheet over the forecast horizon."""
     print("Creating OPEX_Budget sheet...")
     
     # Get the OPEX_Budget sheet
     ws = wb["OPEX_Budget"]
     
+    # Set column widths
+    ws.column_dimensions['A'].width = 25
+    for col in horizon.columns:
+        ws.column_dimensions[get_column_letter(col)].width = 15
+    
     # Set the title
     ws['A1'] = "OPERATING EXPENSES BUDGET"
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].font = TITLE_FONT
     
     # Column headers
     ws['A3'] = "Category"
     
-    # Year headers
-    years = ["2025", "2026", "2027", "2028", "2029"]
+    # Make header row bold
+    ws['A3'].font = BOLD_FONT
+    
+    # Period headers
+    years = horizon.labels
     for i, year in enumerate(years):
         col = get_column_letter(i + 2)  # Start from column B
         ws[f'{col}3'] = year
-        ws[f'{col}3'].font = Font(bold=True)
-    
-    # Make header row bold
-    ws['A3'].font = Font(bold=True)
+        apply(ws[f'{col}3'], font=BOLD_FONT)
     
     # Operating expenses
     expenses = ["SG&A Expenses", "R&D Expenses", "Depreciation & Amortization"]
@@ -33,44 +40,34 @@ def create_opex_budget(wb):
     for j, year in enumerate(years, 2):  # Start from column B
         col = get_column_letter(j)
         ws[f'{col}5'] = f"=Revenue_Forecast!{col}9*Assumptions!B18"
+        apply(ws[f'{col}5'], number_format=NUMBER)
     
     # R&D Expenses
     ws['A6'] = expenses[1]
     for j, year in enumerate(years, 2):  # Start from column B
         col = get_column_letter(j)
         ws[f'{col}6'] = f"=Revenue_Forecast!{col}9*Assumptions!B19"
+        apply(ws[f'{col}6'], number_format=NUMBER)
     
-    # Depreciation & Amortization (fixed values)
+    # Depreciation & Amortization (fixed yearly schedule)
     ws['A7'] = expenses[2]
-    depreciation_values = [100000, 105000, 110250, 115763, 121551]
+    depreciation_values = horizon.per_period(inputs.depreciation)
     for j, (year, value) in enumerate(zip(years, depreciation_values), 2):
         col = get_column_letter(j)
         ws[f'{col}7'] = value
+        apply(ws[f'{col}7'], number_format=NUMBER)
     
-    # Total Operating Expenses row
+    # Blank row above the total, formatted like the rest of the table
+    number_row(ws, 8, horizon.letters)
+    
+    # Total Operating Expenses row, with a light orange background
     ws['A9'] = "Total Operating Expenses"
-    ws['A9'].font = Font(bold=True)
+    apply(ws['A9'], font=BOLD_FONT, fill=ORANGE_FILL)
     
     # Sum formulas for total operating expenses
     for i, year in enumerate(years, 2):  # Start from column B
         col = get_column_letter(i)
         ws[f'{col}9'] = f"=SUM({col}5:{col}7)"
-        ws[f'{col}9'].font = Font(bold=True)
-    
-    # Format all expense values with thousands separator
-    for row in range(5, 10):
-        for col in range(2, 7):  # Columns B to F
-            cell = ws[f'{get_column_letter(col)}{row}']
-            cell.number_format = '#,##0'
-    
-    # Set column widths
-    ws.column_dimensions['A'].width = 25
-    for col in range(2, 7):  # Columns B to F
-        ws.column_dimensions[get_column_letter(col)].width = 15
-    
-    # Add a light orange background to the total row
-    total_fill = PatternFill(start_color='FCE4D6', end_color='FCE4D6', fill_type='solid')
-    for col in range(1, 7):  # Columns A to F
-        ws[f'{get_column_letter(col)}9'].fill = total_fill
+        apply(ws[f'{col}9'], font=BOLD_FONT, fill=ORANGE_FILL, number_format=NUMBER)
     
     print("OPEX_Budget sheet created successfully")
\ No newline at end of file
@@ -1,38 +1,46 @@
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, numbers
 from openpyxl.utils import get_column_letter
+from Horizon import DEFAULT_HORIZON
+from Model_Inputs import DEFAULT_INPUTS
+from Styles import TITLE_FONT, BOLD_FONT, GREEN_FILL, NUMBER, apply, number_row
 
-def create_revenue_forecast(wb):
-    """Create and format the Revenue_Forecast sheet."""
+def create_revenue_forecast(wb, horizon=DEFAULT_HORIZON, inputs=DEFAULT_INPUTS):
+    """Create and format the Revenue_Forecast sheet over the forecast horizon."""
     print("Creating Revenue_Forecast sheet...")
     
     # Get the Revenue_Forecast sheet
     ws = wb["Revenue_Forecast"]
     
+    # Set column widths
+    ws.column_dimensions['A'].width = 20
+    for col in horizon.columns:
+        ws.column_dimensions[get_column_letter(col)].width = 15
+    
     # Set the title
     ws['A1'] = "REVENUE FORECAST"
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].font = TITLE_FONT
     
     # Column headers
     ws['A3'] = "Category"
     
-    # Year headers
-    years = ["2025", "2026", "2027", "2028", "2029"]
+    # Make header row bold
+    ws['A3'].font = BOLD_FONT
+    
+    # Period headers
+    years = horizon.labels
     for i, year in enumerate(years):
         col = get_column_letter(i + 2)  # Start from column B
         ws[f'{col}3'] = year
-        ws[f'{col}3'].font = Font(bold=True)
-    
-    # Make header row bold
-    ws['A3'].font = Font(bold=True)
+        apply(ws[f'{col}3'], font=BOLD_FONT)
     
     # Product lines
     product_lines = ["Product Line 1", "Product Line 2", "Product Line 3"]
-    base_revenues = [1000000, 750000, 500000]
+    base_revenues = inputs.base_revenues  # First-year revenue
     
     for i, (product, base_rev) in enumerate(zip(product_lines, base_revenues), 5):
         row = i
         ws[f'A{row}'] = product
-        ws[f'B{row}'] = base_rev
+        ws[f'B{row}'] = base_rev if horizon.per_year == 1 else base_rev / horizon.per_year
+        apply(ws[f'B{row}'], number_format=NUMBER)
         
         # Growth formulas for subsequent years
         growth_refs = {
@@ -41,36 +49,24 @@ def create_revenue_forecast(wb):
             "Product Line 3": "Assumptions!B13"
         }
         
-        for j, year in enumerate(years[1:], 3):  # Start from 2026 (column C)
+        for j, year in enumerate(years[1:], 3):  # Start from the second period (column C)
             col = get_column_letter(j)
             prev_col = get_column_letter(j-1)
             growth_ref = growth_refs[product]
-            ws[f'{col}{row}'] = f"={prev_col}{row}*(1+{growth_ref})"
+            ws[f'{col}{row}'] = f"={prev_col}{row}*{horizon.growth_factor(growth_ref)}"
+            apply(ws[f'{col}{row}'], number_format=NUMBER)
     
-    # Total Revenue row
+    # Blank row above the total, formatted like the rest of the table
+    number_row(ws, 8, horizon.letters)
+    
+    # Total Revenue row, with a light green background
     ws['A9'] = "Total Revenue"
-    ws['A9'].font = Font(bold=True)
+    apply(ws['A9'], font=BOLD_FONT, fill=GREEN_FILL)
     
     # Sum formulas for total revenue
     for i, year in enumerate(years, 2):  # Start from column B
         col = get_column_letter(i)
         ws[f'{col}9'] = f"=SUM({col}5:{col}7)"
-        ws[f'{col}9'].font = Font(bold=True)
-    
-    # Format all revenue values with thousands separator
-    for row in range(5, 10):
-        for col in range(2, 7):  # Columns B to F
-            cell = ws[f'{get_column_letter(col)}{row}']
-            cell.number_format = '#,##0'
-    
-    # Set column widths
-    ws.column_dimensions['A'].width = 20
-    for col in range(2, 7):  # Columns B to F
-        ws.column_dimensions[get_column_letter(col)].width = 15
-    
-    # Add a light green background to the total row
-    total_fill = PatternFill(start_color='E2EFDA', end_color='E2EFDA', fill_type='solid')
-    for col in range(1, 7):  # Columns A to F
-        ws[f'{get_column_letter(col)}9'].fill = total_fill
+        apply(ws[f'{col}9'], font=BOLD_FONT, fill=GREEN_FILL, number_format=NUMBER)
     
     print("Revenue_Forecast sheet created successfully")
\ No newline at end of file
@@ -0,0 +1,105 @@
+from collections import namedtuple
+import numpy as np
+from openpyxl.utils import get_column_letter
+
+# Assumptions that can vary per scenario, in input-column order
+SCENARIO_INPUTS = [
+    ("Tax Rate", "Assumptions!B6"),
+    ("Inflation Rate", "Assumptions!B7"),
+    ("Product Line 1 Growth", "Assumptions!B11"),
+    ("Product Line 2 Growth", "Assumptions!B12"),
+    ("Product Line 3 Growth", "Assumptions!B13"),
+    ("COGS as % of Revenue", "Assumptions!B17"),
+    ("SG&A as % of Revenue", "Assumptions!B18"),
+    ("R&D as % of Revenue", "Assumptions!B19"),
+    ("Discount Rate (WACC)", "Assumptions!B22"),
+]
+
+# Statement layouts: name -> (sheet, period header row, line item rows)
+STATEMENTS = {
+    "Revenue": ("Revenue_Forecast", 3, [5, 6, 7, 9]),
+    "COGS": ("COGS_Budget", 3, [5, 6, 7, 9]),
+    "OPEX": ("OPEX_Budget", 3, [5, 6, 7, 9]),
+    "Income_Statement": ("Income_Statement", 3, [5, 6, 7, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20]),
+    "Balance_Sheet": ("Balance_Sheet", 3, [6, 7, 8, 9, 10, 13, 14, 15, 18, 19, 20, 21, 23]),
+    "Cash_Flow": ("Cash_Flow", 3, [6, 7, 8, 9, 12, 13, 16, 17, 18, 20, 21, 22]),
+    "DCF": ("Stock_Valuation", 9, [10, 11, 12, 13, 14, 15, 16, 19, 20]),
+}
+
+# DCF valuation summary rows in Stock_Valuation column B
+VALUATION_ROWS = [18, 22, 23, 24, 26, 27, 28]
+
+Statement = namedtuple("Statement", ["line_items", "periods", "values"])
+
+_template_engine = None
+
+
+def template_engine():
+    """Return the FormulaEngine for the standard model, building it on first use."""
+    global _template_engine
+    if _template_engine is None:
+        from main import build_workbook
+        from Formula_Engine import FormulaEngine
+        _template_engine = FormulaEngine.from_workbook(build_workbook(quiet=True)).calculate()
+    return _template_engine
+
+
+def base_inputs(engine=None):
+    """Return the base-case values of SCENARIO_INPUTS as a 1-D array."""
+    engine = engine or template_engine()
+    return np.array([engine[cell] for _, cell in SCENARIO_INPUTS], dtype=float)
+
+
+def _as_array(value, n):
+    if value is None or isinstance(value, str):
+        return np.full(n, np.nan)
+    return np.broadcast_to(np.asarray(value, dtype=float), (n,))
+
+
+def _periods(values, sheet, header_row):
+    periods = []
+    col = 2
+    while True:
+        label = values.get(f"{sheet}!{get_column_letter(col)}{header_row}")
+        if label is None:
+            return periods
+        periods.append(str(label))
+        col += 1
+
+
+def run_scenarios(inputs, engine=None):
+    """Evaluate the model for an N x K array of assumption sets.
+
+    Columns follow SCENARIO_INPUTS. Returns {name: Statement} where each
+    Statement.values array has shape (N, line items, periods). All N
+    scenarios are computed together with NumPy broadcasting.
+    """
+    engine = engine or template_engine()
+    inputs = np.asarray(inputs, dtype=float)
+    if inputs.ndim == 1:
+        inputs = inputs[None, :]
+    if inputs.ndim != 2 or inputs.shape[1] != len(SCENARIO_INPUTS):
+        raise ValueError(f"Expected an N x {len(SCENARIO_INPUTS)} array of inputs, got shape {inputs.shape}")
+    n = inputs.shape[0]
+
+    values = engine.calculate_scenarios(
+        {cell: inputs[:, k] for k, (_, cell) in enumerate(SCENARIO_INPUTS)})
+
+    results = {}
+    for name, (sheet, header_row, rows) in STATEMENTS.items():
+        periods = _periods(values, sheet, header_row)
+        data = np.empty((n, len(rows), len(periods)))
+        for i, row in enumerate(rows):
+            for j in range(len(periods)):
+                data[:, i, j] = _as_array(values.get(f"{sheet}!{get_column_letter(j + 2)}{row}"), n)
+        line_items = [values.get(f"{sheet}!A{row}") for row in rows]
+        results[name] = Statement(line_items, periods, data)
+
+    # Single-value DCF outputs (enterprise value, share price, ...)
+    data = np.empty((n, len(VALUATION_ROWS), 1))
+    for i, row in enumerate(VALUATION_ROWS):
+        data[:, i, 0] = _as_array(values.get(f"Stock_Valuation!B{row}"), n)
+    line_items = [values.get(f"Stock_Valuation!A{row}") for row in VALUATION_ROWS]
+    results["Valuation"] = Statement(line_items, ["Value"], data)
+
+    return results
@@ -1,11 +1,97 @@
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, numbers
 from openpyxl.utils import get_column_letter
 from openpyxl.formatting.rule import ColorScaleRule
-from openpyxl.chart import ScatterChart, Reference, Series
+from openpyxl.chart import BarChart, ScatterChart, Reference, Series
 import numpy as np
+from Monte_Carlo import DEFAULT_DISTRIBUTIONS, simulate_npv
+from Capital_Budgeting import INITIAL_INVESTMENT, SALVAGE_VALUE, ANNUAL_CASH_FLOWS, analyze_projects
+from Model_Inputs import DEFAULT_INPUTS
+from Styles import TITLE_FONT, BOLD_FONT, HEADER_FILL, THIN_BORDER, CENTER, RIGHT, NUMBER, PERCENT, apply
 
-def create_sensitivity_analysis(wb):
-    """Create and format the Sensitivity_Analysis sheet."""
+# Project inputs that can be varied on a sensitivity grid. "cash_flows" is a
+# multiplier on the base annual cash flows; the others are absolute values.
+GRID_INPUTS = ("initial_investment", "cash_flows", "discount_rate", "salvage_value")
+
+def npv_grid(row_input, row_values, col_input, col_values, discount_rate=0.10,
+             investment=INITIAL_INVESTMENT, cash_flows=ANNUAL_CASH_FLOWS, salvage_value=SALVAGE_VALUE):
+    """Exact project NPV for every combination of two Capital_Budgeting inputs.
+
+    Returns an array of shape (len(row_values), len(col_values)) computed in
+    one broadcasted pass.
+    """
+    if row_input not in GRID_INPUTS or col_input not in GRID_INPUTS or row_input == col_input:
+        raise ValueError(f"Grid inputs must be two different names from {GRID_INPUTS}")
+    
+    inputs = {
+        "initial_investment": np.asarray(investment, dtype=float),
+        "cash_flows": np.asarray(1.0),
+        "discount_rate": np.asarray(discount_rate, dtype=float),
+        "salvage_value": np.asarray(salvage_value, dtype=float),
+    }
+    inputs[row_input] = np.asarray(row_values, dtype=float)[:, None]
+    inputs[col_input] = np.asarray(col_values, dtype=float)[None, :]
+    
+    flows = np.asarray(cash_flows, dtype=float)
+    years = np.arange(1, len(flows) + 1)
+    rate = inputs["discount_rate"]
+    discount = (1 + rate)[..., None] ** -years
+    pv_flows = (discount * flows).sum(axis=-1)
+    pv_salvage = inputs["salvage_value"] * discount[..., -1]
+    npv = inputs["cash_flows"] * pv_flows + pv_salvage - inputs["initial_investment"]
+    return np.broadcast_to(npv, (len(row_values), len(col_values)))
+
+def write_npv_grid(ws, grid, row_headers, col_headers, header_row, first_row=None, left_col=1,
+                   row_format='0%', col_format='0%', value_format='#,##0'):
+    """Write an NPV grid with its headers and the green-to-red color scale.
+
+    Column headers go on header_row and the values start on first_row
+    (by default the row below the headers), with row headers in left_col.
+    """
+    first_row = first_row or header_row + 1
+    
+    for j, header in enumerate(col_headers, left_col + 1):
+        cell = ws.cell(row=header_row, column=j, value=float(header))
+        apply(cell, font=BOLD_FONT, number_format=col_format, alignment=CENTER)
+    
+    # apply() reuses the style array after the first cell, which keeps
+    # dense grids (40k+ cells) fast to build
+    for i, (header, values) in enumerate(zip(row_headers, grid.tolist()), first_row):
+        cell = ws.cell(row=i, column=left_col, value=float(header))
+        apply(cell, number_format=row_format, alignment=RIGHT)
+        for j, value in enumerate(values, left_col + 1):
+            apply(ws.cell(row=i, column=j, value=value), number_format=value_format, alignment=CENTER)
+    
+    # Color scale over the NPV values, as used on the Dashboard
+    green_to_red = ColorScaleRule(start_type='max', start_color='63BE7B',
+                                  mid_type='percentile', mid_value=50, mid_color='FFEB84',
+                                  end_type='min', end_color='F8696B')
+    first = f"{get_column_letter(left_col + 1)}{first_row}"
+    last = f"{get_column_letter(left_col + len(col_headers))}{first_row + len(row_headers) - 1}"
+    ws.conditional_formatting.add(f"{first}:{last}", green_to_red)
+
+def create_npv_heatmap(wb, row_input, row_values, col_input, col_values,
+                       sheet_name="NPV_Heatmap", discount_rate=0.10, inputs=DEFAULT_INPUTS):
+    """Write a dense two-variable NPV grid (e.g. 200x200) for the project in inputs to its own sheet."""
+    print(f"Creating {sheet_name} sheet...")
+    
+    ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.create_sheet(sheet_name)
+    
+    ws['A1'] = f"NPV SENSITIVITY: {row_input} (rows) x {col_input} (columns)"
+    ws['A1'].font = TITLE_FONT
+    
+    grid = npv_grid(row_input, row_values, col_input, col_values, discount_rate=discount_rate,
+                    investment=inputs.initial_investment, cash_flows=inputs.project_cash_flows,
+                    salvage_value=inputs.salvage_value)
+    formats = {"discount_rate": '0.00%', "cash_flows": '0.00', "initial_investment": '#,##0', "salvage_value": '#,##0'}
+    write_npv_grid(ws, grid, row_values, col_values, header_row=3,
+                   row_format=formats[row_input], col_format=formats[col_input])
+    
+    ws.column_dimensions['A'].width = 15
+    
+    print(f"{sheet_name} sheet created successfully")
+    return grid
+
+def create_sensitivity_analysis(wb, simulation_paths=100_000, seed=2025, inputs=DEFAULT_INPUTS):
+    """Create and format the Sensitivity_Analysis sheet for the project in inputs."""
     print("Creating Sensitivity_Analysis sheet...")
     
     # Get the Sensitivity_Analysis sheet
@@ -13,28 +99,34 @@ def create_sensitivity_analysis(wb):
     
     # Set the title
     ws['A1'] = "SENSITIVITY ANALYSIS"
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].font = TITLE_FONT
     
     # Base Case Results section
     ws['A3'] = "Base Case Results"
-    ws['A3'].font = Font(bold=True)
+    ws['A3'].font = BOLD_FONT
+    
+    # Base case metrics from the native project solver
+    base_rate = wb["Assumptions"]["B22"].value
+    investment, cash_flows, salvage_value = inputs.initial_investment, inputs.project_cash_flows, inputs.salvage_value
+    project = [-investment, *cash_flows[:-1], cash_flows[-1] + salvage_value]
+    base = analyze_projects([project], discount_rate=base_rate)
     
     base_metrics = [
-        ("NPV", 250000, "#,##0"),
-        ("IRR", 0.15, "0.00%"),
-        ("Payback Period", 3.5, "0.00"),
-        ("Profitability Index", 1.25, "0.00")
+        ("NPV", float(base["npv"][0]), "#,##0"),
+        ("IRR", float(base["irr"][0]), "0.00%"),
+        ("Payback Period", float(base["payback"][0]), "0.00"),
+        ("Profitability Index", float(base["profitability_index"][0]), "0.00")
     ]
     
     for i, (metric, value, format) in enumerate(base_metrics):
         row = i + 4
         ws[f'A{row}'] = metric
         ws[f'B{row}'] = value
-        ws[f'B{row}'].number_format = format
+        apply(ws[f'B{row}'], number_format=format)
     
     # One-Variable Sensitivity (Discount Rate) section
     ws['A8'] = "Discount Rate Sensitivity"
-    ws['A8'].font = Font(bold=True)
+    ws['A8'].font = BOLD_FONT
     
     ws['A9'] = "Discount Rate"
     ws['B9'] = "NPV"
@@ -42,7 +134,7 @@ def create_sensitivity_analysis(wb):
     
     # Make headers bold
     for col in ['A', 'B', 'C']:
-        ws[f'{col}9'].font = Font(bold=True)
+        apply(ws[f'{col}9'], font=BOLD_FONT)
     
     # Discount rate sensitivity analysis
     discount_rates = [0.06, 0.08, 0.1, 0.12, 0.14]
@@ -50,13 +142,13 @@ def create_sensitivity_analysis(wb):
     for i, rate in enumerate(discount_rates, 10):
         row = i
         ws[f'A{row}'] = rate
-        ws[f'A{row}'].number_format = '0.00%'
+        apply(ws[f'A{row}'], number_format=PERCENT)
         # NPV calculation
         ws[f'B{row}'] = f"=NPV(A{row},CAPITAL_BUDGETING!B11:B15)+CAPITAL_BUDGETING!B10"
-        ws[f'B{row}'].number_format = '#,##0'
+        apply(ws[f'B{row}'], number_format=NUMBER)
         # IRR impact (percentage change from base IRR)
         ws[f'C{row}'] = f"=(IRR(CAPITAL_BUDGETING!B10:B15)-CAPITAL_BUDGETING!B22)/CAPITAL_BUDGETING!B22"
-        ws[f'C{row}'].number_format = '0.00%'
+        apply(ws[f'C{row}'], number_format=PERCENT)
     
     # Create scatter chart for discount rate sensitivity
     chart1 = ScatterChart()
@@ -75,57 +167,33 @@ def create_sensitivity_analysis(wb):
     
     # Two-Variable Sensitivity Analysis (NPV) section
     ws['A16'] = "Two-Variable Sensitivity Analysis (NPV)"
-    ws['A16'].font = Font(bold=True)
+    ws['A16'].font = BOLD_FONT
     
     # Column headers for sensitivity matrix
     ws['A17'] = "Annual Cash Flow % Change"
-    ws['A17'].font = Font(bold=True)
+    ws['A17'].font = BOLD_FONT
     
-    cf_changes = ["-20%", "-10%", "0%", "+10%", "+20%"]
-    for j, change in enumerate(cf_changes, 2):
-        col = get_column_letter(j)
-        ws[f'{col}17'] = float(change.replace("%", "")) / 100  # Convert percentage string to decimal
-        ws[f'{col}17'].font = Font(bold=True)
-        ws[f'{col}17'].number_format = '0%'  # Format as percentage
-        ws[f'{col}17'].alignment = Alignment(horizontal='center')
+    cf_changes = [-0.2, -0.1, 0, 0.1, 0.2]
     
     # Row headers
     ws['A18'] = "Initial Investment % Change"
-    ws['A18'].font = Font(bold=True)
+    ws['A18'].font = BOLD_FONT
     
-    inv_changes = ["-20%", "-10%", "0%", "+10%", "+20%"]
+    inv_changes = [-0.2, -0.1, 0, 0.1, 0.2]
     
-    # Create the sensitivity matrix with actual values
-    for i, inv_change in enumerate(inv_changes, 19):
-        row = i
-        # Convert percentage string to decimal for the row headers
-        ws[f'A{row}'] = float(inv_change.replace("%", "")) / 100
-        ws[f'A{row}'].number_format = '0%'  # Format as percentage
-        ws[f'A{row}'].alignment = Alignment(horizontal='right')
-        
-        inv_multipliers = {"-20%": 0.8, "-10%": 0.9, "0%": 1, "+10%": 1.1, "+20%": 1.2}
-        inv_multiplier = inv_multipliers[inv_change]
-        
-        for j, cf_change in enumerate(cf_changes, 2):
-            col = get_column_letter(j)
-            cf_multipliers = {"-20%": 0.8, "-10%": 0.9, "0%": 1, "+10%": 1.1, "+20%": 1.2}
-            cf_multiplier = cf_multipliers[cf_change]
-            
-            # Calculate NPV with actual values instead of formulas
-            base_npv = 250000  # Base NPV value
-            npv_value = base_npv * cf_multiplier * (2 - inv_multiplier)  # Adjusted calculation
-            ws[f'{col}{row}'] = npv_value
-            ws[f'{col}{row}'].number_format = '#,##0'
-            ws[f'{col}{row}'].alignment = Alignment(horizontal='center')
-    
-    # Add borders to the sensitivity matrix
-    thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                        top=Side(style='thin'), bottom=Side(style='thin'))
-    
-    # Apply borders to the entire matrix including headers
+    # Exact NPVs for each investment / cash flow combination
+    grid = npv_grid("initial_investment", [investment * (1 + c) for c in inv_changes],
+                    "cash_flows", [1 + c for c in cf_changes], discount_rate=base_rate,
+                    investment=investment, cash_flows=cash_flows, salvage_value=salvage_value)
+    
+    # Column headers share row 17 with the axis label; values start on row 19
+    # below the row-axis label
+    write_npv_grid(ws, grid, inv_changes, cf_changes, header_row=17, first_row=19)
+    
+    # Add borders to the entire sensitivity matrix including headers
     for row in range(17, 24):  # From header row to last data row
         for col in range(1, 7):  # From first column to last column
-            ws.cell(row=row, column=col).border = thin_border
+            apply(ws.cell(row=row, column=col), border=THIN_BORDER)
     
     # Break-even Analysis section with actual values
     breakeven_metrics = [
@@ -138,21 +206,31 @@ def create_sensitivity_analysis(wb):
         row = i + 26
         ws[f'A{row}'] = metric
         ws[f'B{row}'] = value
-        ws[f'B{row}'].number_format = format
+        apply(ws[f'B{row}'], number_format=format)
     
-    # Risk Analysis section with actual values
+    # Risk Analysis section from a Monte Carlo simulation of the project NPV
+    # Salvage value varies +/-50% around the project's own estimate, and the
+    # default discount rate distribution is moved to center on the base rate
+    kind, rate = DEFAULT_DISTRIBUTIONS["discount_rate"]
+    shift = base_rate - rate["mode"]
+    distributions = {
+        "discount_rate": (kind, {name: value + shift for name, value in rate.items()}),
+        "salvage_value": ("uniform", {"low": 0.5 * salvage_value, "high": 1.5 * salvage_value}),
+    }
+    simulation = simulate_npv(paths=simulation_paths, seed=seed, distributions=distributions,
+                              investment=investment, cash_flows=cash_flows)
     risk_metrics = [
-        ("NPV Standard Deviation", 75000, "#,##0"),
-        ("Coefficient of Variation", 0.35, "0.00"),
-        ("NPV Range", 300000, "#,##0"),
-        ("Probability of Negative NPV", 0.15, "0.00%")
+        ("NPV Standard Deviation", simulation["std"], "#,##0"),
+        ("Coefficient of Variation", simulation["coefficient_of_variation"], "0.00"),
+        ("NPV Range", simulation["range"], "#,##0"),
+        ("Probability of Negative NPV", simulation["probability_negative"], "0.00%")
     ]
     
     for i, (metric, value, format) in enumerate(risk_metrics):
         row = i + 31
         ws[f'A{row}'] = metric
         ws[f'B{row}'] = value
-        ws[f'B{row}'].number_format = format
+        apply(ws[f'B{row}'], number_format=format)
     
     # Scenario Analysis section with actual values
     scenarios = [
@@ -167,16 +245,43 @@ def create_sensitivity_analysis(wb):
         row = i + 37
         ws[f'A{row}'] = scenario
         ws[f'B{row}'] = value
-        ws[f'B{row}'].number_format = '#,##0'
+        apply(ws[f'B{row}'], number_format=NUMBER)
     
-    # Formatting
-    # Add background colors
-    header_fill = PatternFill(start_color='DCE6F1', end_color='DCE6F1', fill_type='solid')
-    section_fill = PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid')
+    # Monte Carlo NPV distribution (histogram)
+    ws['A44'] = f"Monte Carlo NPV Distribution ({simulation['paths']:,} paths)"
+    ws['A44'].font = BOLD_FONT
+    ws['A45'] = "NPV Bin (Upper Edge)"
+    ws['B45'] = "Paths"
+    ws['A45'].font = BOLD_FONT
+    ws['B45'].font = BOLD_FONT
     
+    for i, (edge, count) in enumerate(zip(simulation["bin_edges"][1:], simulation["counts"]), 46):
+        row = i
+        ws[f'A{row}'] = float(edge)
+        apply(ws[f'A{row}'], number_format=NUMBER)
+        ws[f'B{row}'] = int(count)
+        apply(ws[f'B{row}'], number_format=NUMBER)
+    
+    last_row = 45 + len(simulation["counts"])
+    histogram = BarChart()
+    histogram.title = "Simulated NPV Distribution"
+    histogram.style = 10
+    histogram.x_axis.title = "NPV"
+    histogram.y_axis.title = "Paths"
+    histogram.gapWidth = 0
+    histogram.legend = None
+    
+    data = Reference(ws, min_col=2, min_row=45, max_row=last_row)
+    cats = Reference(ws, min_col=1, min_row=46, max_row=last_row)
+    histogram.add_data(data, titles_from_data=True)
+    histogram.set_categories(cats)
+    
+    ws.add_chart(histogram, "D44")
+    
+    # Formatting
     # Apply fills to section headers
-    for row in [3, 8, 16, 25, 30, 36]:
-        ws[f'A{row}'].fill = header_fill
+    for row in [3, 8, 16, 25, 30, 36, 44]:
+        apply(ws[f'A{row}'], fill=HEADER_FILL)
     
     # Set column widths
     ws.column_dimensions['A'].width = 35
@@ -1,20 +1,157 @@
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, numbers
 from openpyxl.utils import get_column_letter
+from openpyxl.formatting.rule import ColorScaleRule
+from openpyxl.chart import LineChart, Reference
+import numpy as np
+from Formula_Engine import evaluate_cells
+from Horizon import DEFAULT_HORIZON
+from Model_Inputs import DEFAULT_INPUTS
+from Styles import TITLE_FONT, SECTION_FONT, BOLD_FONT, BLUE_FILL, GREEN_FILL, ORANGE_FILL, YELLOW_FILL, NUMBER, PERCENT, apply, number_row
 
-def create_stock_valuation(wb):
-    """Create and format the Stock_Valuation sheet."""
+# Default valuation surface axes: WACC 6%-16% and long-term growth 0%-4%
+SURFACE_WACC = np.linspace(0.06, 0.16, 21)
+SURFACE_GROWTH = np.linspace(0.0, 0.04, 17)
+
+# Stock_Valuation rows of the FCF build-up read by dcf_inputs
+DCF_ROWS = (10, 11, 13, 14, 15)
+
+def dcf_references(horizon=DEFAULT_HORIZON):
+    """Addresses of the Stock_Valuation cells dcf_inputs reads."""
+    return ([f"Stock_Valuation!{col}{r}" for r in DCF_ROWS for col in horizon.letters]
+            + ["Stock_Valuation!B26", "Stock_Valuation!B7"])
+
+def dcf_inputs(engine, horizon=DEFAULT_HORIZON):
+    """Read the DCF build-up for each forecast period from a calculated FormulaEngine."""
+    def row(r):
+        return np.array([engine[f"Stock_Valuation!{col}{r}"] for col in horizon.letters], dtype=float)
+    return {
+        "periods_per_year": horizon.per_year,
+        "ebit": row(10),
+        "tax_rate": row(11),
+        "depreciation": row(13),
+        "capex": row(14),
+        "working_capital": row(15),
+        "net_debt": float(engine["Stock_Valuation!B26"]),
+        "shares": float(engine["Stock_Valuation!B7"]),
+    }
+
+def dcf_valuation_surface(inputs, wacc_values, growth_values):
+    """Share price, enterprise value and terminal-value share over WACC x growth.
+
+    Uses the same free cash flow build-up as the Stock_Valuation sheet:
+    FCF = EBIT*(1-tax) + D&A + CapEx + change in working capital, with the
+    terminal year grown at g, annualized, and CapEx set equal to terminal
+    D&A. Period k is discounted over k / periods_per_year years. Returns a
+    dict of arrays shaped (len(wacc_values), len(growth_values)); cells
+    where WACC <= growth are NaN.
+    """
+    wacc = np.asarray(wacc_values, dtype=float)[:, None]
+    growth = np.asarray(growth_values, dtype=float)[None, :]
+    
+    fcf = inputs["ebit"] * (1 - inputs["tax_rate"]) + inputs["depreciation"] + inputs["capex"] + inputs["working_capital"]
+    per_year = inputs.get("periods_per_year", 1)
+    terminal_base = (inputs["ebit"][-1] * (1 - inputs["tax_rate"][-1]) + 2 * inputs["depreciation"][-1]
+                     + inputs["working_capital"][-1]) * per_year
+    
+    years = np.arange(1, len(fcf) + 1) / per_year
+    discount = (1 + wacc)[..., None] ** -years            # (W, 1, periods)
+    pv_fcf = (fcf * discount).sum(axis=-1)                 # (W, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terminal_value = np.where(wacc > growth, terminal_base * (1 + growth) / (wacc - growth), np.nan)
+    pv_terminal = terminal_value * discount[..., -1]
+    
+    enterprise_value = pv_fcf + pv_terminal
+    share_price = (enterprise_value - inputs["net_debt"]) / inputs["shares"]
+    return {
+        "share_price": share_price,
+        "enterprise_value": enterprise_value,
+        "terminal_share": pv_terminal / enterprise_value,
+    }
+
+def _write_surface_table(ws, title, values, wacc, growth, top_row, value_format, color_scale=False):
+    """Write one WACC (rows) x growth (columns) table and return its last row."""
+    ws[f'A{top_row}'] = title
+    ws[f'A{top_row}'].font = BOLD_FONT
+    ws[f'A{top_row + 1}'] = "WACC \\ Growth"
+    ws[f'A{top_row + 1}'].font = BOLD_FONT
+    
+    for j, g in enumerate(growth, 2):
+        apply(ws.cell(row=top_row + 1, column=j, value=float(g)), font=BOLD_FONT, number_format=PERCENT)
+    
+    for i, (w, row_values) in enumerate(zip(wacc, values.tolist()), top_row + 2):
+        apply(ws.cell(row=i, column=1, value=float(w)), number_format=PERCENT)
+        for j, value in enumerate(row_values, 2):
+            apply(ws.cell(row=i, column=j, value=None if value != value else value), number_format=value_format)
+    
+    last_row = top_row + 1 + len(wacc)
+    if color_scale:
+        green_to_red = ColorScaleRule(start_type='max', start_color='63BE7B',
+                                      mid_type='percentile', mid_value=50, mid_color='FFEB84',
+                                      end_type='min', end_color='F8696B')
+        ws.conditional_formatting.add(f"B{top_row + 2}:{get_column_letter(1 + len(growth))}{last_row}", green_to_red)
+    return last_row
+
+def create_valuation_surface(wb, wacc_values=SURFACE_WACC, growth_values=SURFACE_GROWTH, sheet_name="DCF_Surface",
+                             horizon=DEFAULT_HORIZON):
+    """Create the DCF valuation surface sheet (WACC x long-term growth)."""
+    print(f"Creating {sheet_name} sheet...")
+    
+    ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.create_sheet(sheet_name)
+    
+    # FCF build-up from the Stock_Valuation sheet, calculating only the cells it depends on
+    engine = evaluate_cells(wb, dcf_references(horizon))
+    surface = dcf_valuation_surface(dcf_inputs(engine, horizon), wacc_values, growth_values)
+    
+    ws['A1'] = "DCF VALUATION SURFACE"
+    ws['A1'].font = TITLE_FONT
+    
+    row = _write_surface_table(ws, "Share Price", surface["share_price"], wacc_values, growth_values,
+                               3, '$#,##0.00', color_scale=True)
+    row = _write_surface_table(ws, "Enterprise Value", surface["enterprise_value"], wacc_values, growth_values,
+                               row + 2, '#,##0')
+    _write_surface_table(ws, "Terminal Value % of Enterprise Value", surface["terminal_share"],
+                         wacc_values, growth_values, row + 2, '0.0%')
+    
+    # Chart share price against WACC for up to five growth rates
+    chart = LineChart()
+    chart.title = "Share Price vs WACC"
+    chart.style = 10
+    chart.x_axis.title = "WACC"
+    chart.y_axis.title = "Share Price"
+    
+    last_row = 4 + len(wacc_values)
+    for col in sorted({int(c) for c in np.linspace(2, 1 + len(growth_values), min(5, len(growth_values)))}):
+        data = Reference(ws, min_col=col, min_row=4, max_row=last_row)
+        chart.add_data(data, titles_from_data=True)
+    chart.set_categories(Reference(ws, min_col=1, min_row=5, max_row=last_row))
+    ws.add_chart(chart, f"{get_column_letter(len(growth_values) + 3)}3")
+    
+    # Set column widths
+    ws.column_dimensions['A'].width = 18
+    for col in range(2, len(growth_values) + 2):
+        ws.column_dimensions[get_column_letter(col)].width = 12
+    
+    print(f"{sheet_name} sheet created successfully")
+    return surface
+
+def create_stock_valuation(wb, horizon=DEFAULT_HORIZON, inputs=DEFAULT_INPUTS):
+    """Create and format the Stock_Valuation sheet over the forecast horizon."""
     print("Creating Stock_Valuation sheet...")
     
     # Get the Stock_Valuation sheet
     ws = wb["Stock_Valuation"]
     
+    # Set column widths
+    ws.column_dimensions['A'].width = 30
+    for col in range(2, horizon.last_col + 2):  # Forecast and terminal columns
+        ws.column_dimensions[get_column_letter(col)].width = 15
+    
     # Set the title
     ws['A1'] = "STOCK VALUATION MODEL"
-    ws['A1'].font = Font(bold=True, size=14)
+    ws['A1'].font = TITLE_FONT
     
     # DCF Valuation section
     ws['A3'] = "Discounted Cash Flow (DCF) Valuation"
-    ws['A3'].font = Font(bold=True, size=12)
+    ws['A3'].font = SECTION_FONT
     
     # Basic inputs
     ws['A5'] = "WACC (Discount Rate)"
@@ -26,148 +163,120 @@ def create_stock_valuation(wb):
     ws['B6'].number_format = '0.00%'
     
     ws['A7'] = "Shares Outstanding"
-    ws['B7'] = 1000000
+    ws['B7'] = inputs.shares_outstanding
     ws['B7'].number_format = '#,##0'
     
     # Free Cash Flow section
     ws['A9'] = "Free Cash Flow"
-    ws['A9'].font = Font(bold=True)
-    
-    # Column headers for years and terminal value
-    years = ["2025", "2026", "2027", "2028", "2029", "Terminal"]
+    ws['A9'].font = BOLD_FONT
+    
+    # Column headers for the forecast periods and terminal value
+    years = horizon.labels + ["Terminal"]
+    letters = horizon.letters                          # Forecast periods
+    last = horizon.last_letter                         # Final forecast period
+    terminal = get_column_letter(horizon.last_col + 1)  # Terminal value column
+    # Terminal flows are annualized when the periods are shorter than a year
+    annualize = "" if horizon.per_year == 1 else f"*{horizon.per_year}"
     for i, year in enumerate(years):
         col = get_column_letter(i + 2)  # Start from column B
         ws[f'{col}9'] = year
-        ws[f'{col}9'].font = Font(bold=True)
-    
-    # Free Cash Flow line items
-    fcf_items = [
-        "EBIT",
-        "Tax Rate",
-        "EBIT*(1-Tax Rate)",
-        "Plus: Depreciation & Amortization",
-        "Less: Capital Expenditures",
-        "Less: Change in Working Capital",
-        "Free Cash Flow"
-    ]
-    
-    for i, item in enumerate(fcf_items, 10):
-        row = i
-        ws[f'A{row}'] = item
-        if item == "Free Cash Flow":
-            ws[f'A{row}'].font = Font(bold=True)
-    
-    # EBIT formulas
-    for j, year in enumerate(years[:5], 2):  # 2025-2029
-        col = get_column_letter(j)
-        ws[f'{col}10'] = f"=Income_Statement!{col}9"  # Operating Income
-    
-    # Terminal year EBIT
-    ws['G10'] = "=F10*(1+B6)"  # Terminal year EBIT = 2029 EBIT * (1 + growth rate)
-    
-    # Tax Rate formulas
-    for j, year in enumerate(years, 2):
-        col = get_column_letter(j)
-        ws[f'{col}11'] = "=Assumptions!B6"
-        ws[f'{col}11'].number_format = '0.00%'
+        apply(ws[f'{col}9'], font=BOLD_FONT)
     
-    # EBIT*(1-Tax Rate) formulas
-    for j, year in enumerate(years, 2):
-        col = get_column_letter(j)
-        ws[f'{col}12'] = f"={col}10*(1-{col}11)"
-    
-    # Depreciation & Amortization formulas
-    for j, year in enumerate(years[:5], 2):  # 2025-2029
-        col = get_column_letter(j)
-        ws[f'{col}13'] = f"=OPEX_Budget!{col}7"
-    
-    # Terminal year D&A
-    ws['G13'] = "=F13*(1+B6)"  # Terminal year D&A = 2029 D&A * (1 + growth rate)
-    
-    # Capital Expenditures formulas
-    for j, year in enumerate(years[:5], 2):  # 2025-2029
-        col = get_column_letter(j)
-        ws[f'{col}14'] = f"=-Cash_Flow!{col}12"  # Negative of Cash_Flow CapEx (which is already negative)
-    
-    # Terminal year CapEx (assumed equal to D&A for terminal value)
-    ws['G14'] = "=G13"  # Terminal year CapEx = Terminal year D&A
+    # Free Cash Flow line items, rows 10-16, each with its forecast period
+    # formulas and the terminal year formula (monetary values with
+    # thousands separators)
     
-    # Change in Working Capital formulas
-    for j, year in enumerate(years[:5], 2):  # 2025-2029
-        col = get_column_letter(j)
-        ws[f'{col}15'] = f"=-Cash_Flow!{col}8"  # Negative of Cash_Flow WC change
+    # EBIT (Operating Income); terminal year EBIT = final EBIT * (1 + growth rate)
+    ws['A10'] = "EBIT"
+    number_row(ws, 10, letters + [terminal],
+               [f"=Income_Statement!{col}9" for col in letters] + [f"={last}10{annualize}*(1+B6)"])
     
-    # Terminal year Change in WC
-    ws['G15'] = "=F15*(1+B6)"  # Terminal year WC = 2029 WC * (1 + growth rate)
+    # Tax Rate formulas
+    ws['A11'] = "Tax Rate"
+    number_row(ws, 11, letters + [terminal], ["=Assumptions!B6"] * len(years), number_format=PERCENT)
     
-    # Free Cash Flow formulas
-    for j, year in enumerate(years, 2):
-        col = get_column_letter(j)
-        ws[f'{col}16'] = f"={col}12+{col}13+{col}14+{col}15"
-        ws[f'{col}16'].font = Font(bold=True)
+    # EBIT*(1-Tax Rate) formulas
+    ws['A12'] = "EBIT*(1-Tax Rate)"
+    number_row(ws, 12, letters + [terminal], [f"={col}10*(1-{col}11)" for col in letters + [terminal]])
+    
+    # Depreciation & Amortization; terminal year D&A = final D&A * (1 + growth rate)
+    ws['A13'] = "Plus: Depreciation & Amortization"
+    number_row(ws, 13, letters + [terminal],
+               [f"=OPEX_Budget!{col}7" for col in letters] + [f"={last}13{annualize}*(1+B6)"])
+    
+    # Capital Expenditures: negative of Cash_Flow CapEx (which is already
+    # negative); terminal year CapEx assumed equal to terminal year D&A
+    ws['A14'] = "Less: Capital Expenditures"
+    number_row(ws, 14, letters + [terminal], [f"=-Cash_Flow!{col}12" for col in letters] + [f"={terminal}13"])
+    
+    # Change in Working Capital: negative of Cash_Flow WC change; terminal
+    # year WC = final WC * (1 + growth rate)
+    ws['A15'] = "Less: Change in Working Capital"
+    number_row(ws, 15, letters + [terminal],
+               [f"=-Cash_Flow!{col}8" for col in letters] + [f"={last}15{annualize}*(1+B6)"])
+    
+    # Free Cash Flow formulas (light yellow)
+    ws['A16'] = "Free Cash Flow"
+    apply(ws['A16'], font=BOLD_FONT, fill=YELLOW_FILL)
+    number_row(ws, 16, letters + [terminal], [f"={col}12+{col}13+{col}14+{col}15" for col in letters + [terminal]],
+               BOLD_FONT, YELLOW_FILL)
     
     # Terminal Value calculation
     ws['A18'] = "Terminal Value"
-    ws['B18'] = "=G16/(B5-B6)"  # Terminal Value using Gordon Growth Model
+    ws['B18'] = f"={terminal}16/(B5-B6)"  # Terminal Value using Gordon Growth Model
+    apply(ws['B18'], number_format=NUMBER)
     
-    # Discount Factor calculations
+    # Discount Factor calculations: 1/(1+WACC)^years, the terminal year
+    # discount factor is the same as the final period's
     ws['A19'] = "Discount Factor"
+    number_row(ws, 19, letters + [terminal],
+               [f"=1/(1+B5)^{horizon.exponent(j)}" for j in range(1, horizon.periods + 1)] + [f"={last}19"],
+               number_format='0.000')
     
-    for j, year in enumerate(years[:5], 2):  # 2025-2029
-        col = get_column_letter(j)
-        ws[f'{col}19'] = f"=1/(1+B5)^{j-1}"  # 1/(1+WACC)^year
-        ws[f'{col}19'].number_format = '0.000'
-    
-    # Terminal year discount factor (same as 2029)
-    ws['G19'] = "=F19"
-    ws['G19'].number_format = '0.000'
-    
-    # Present Value of FCF
+    # Present Value of FCF, and of the Terminal Value
     ws['A20'] = "Present Value of FCF"
-    
-    for j, year in enumerate(years[:5], 2):  # 2025-2029
-        col = get_column_letter(j)
+    for col in letters:
         ws[f'{col}20'] = f"={col}16*{col}19"
-    
-    # Present Value of Terminal Value
-    ws['G20'] = "=B18*G19"
+    ws[f'{terminal}20'] = f"=B18*{terminal}19"
+    apply(ws['B20'], number_format=NUMBER)
     
     # Sum of PV of FCF
     ws['A22'] = "Sum of PV of FCF"
-    ws['A22'].font = Font(bold=True)
-    ws['B22'] = "=SUM(B20:F20)"
-    ws['B22'].font = Font(bold=True)
+    ws['A22'].font = BOLD_FONT
+    ws['B22'] = f"=SUM(B20:{last}20)"
+    apply(ws['B22'], font=BOLD_FONT, number_format=NUMBER)
     
     # PV of Terminal Value
     ws['A23'] = "PV of Terminal Value"
-    ws['B23'] = "=G20"
+    ws['B23'] = f"={terminal}20"
+    apply(ws['B23'], number_format=NUMBER)
     
-    # Enterprise Value
+    # Enterprise Value (light blue, like the equity value and share price)
     ws['A24'] = "Enterprise Value"
-    ws['A24'].font = Font(bold=True)
+    apply(ws['A24'], font=BOLD_FONT, fill=BLUE_FILL)
     ws['B24'] = "=B22+B23"
-    ws['B24'].font = Font(bold=True)
+    apply(ws['B24'], font=BOLD_FONT, fill=BLUE_FILL, number_format=NUMBER)
     
     # Less: Net Debt
     ws['A26'] = "Less: Net Debt"
     ws['B26'] = "=Balance_Sheet!B14-Balance_Sheet!B6"  # Debt - Cash
+    apply(ws['B26'], number_format=NUMBER)
     
     # Equity Value
     ws['A27'] = "Equity Value"
-    ws['A27'].font = Font(bold=True)
+    apply(ws['A27'], font=BOLD_FONT, fill=BLUE_FILL)
     ws['B27'] = "=B24-B26"
-    ws['B27'].font = Font(bold=True)
+    apply(ws['B27'], font=BOLD_FONT, fill=BLUE_FILL, number_format=NUMBER)
     
     # Share Price
     ws['A28'] = "Share Price"
-    ws['A28'].font = Font(bold=True)
+    apply(ws['A28'], font=BOLD_FONT, fill=BLUE_FILL)
     ws['B28'] = "=B27/B7"
-    ws['B28'].number_format = '$#,##0.00'
-    ws['B28'].font = Font(bold=True)
+    apply(ws['B28'], font=BOLD_FONT, fill=BLUE_FILL, number_format='$#,##0.00')
     
     # Comparable Company Valuation section
     ws['A30'] = "Comparable Company Valuation"
-    ws['A30'].font = Font(bold=True, size=12)
+    ws['A30'].font = SECTION_FONT
     
     # EV/EBITDA Multiple Valuation
     ws['A32'] = "EV/EBITDA Multiple"
@@ -175,24 +284,27 @@ def create_stock_valuation(wb):
     ws['B32'].number_format = '0.0'
     
     ws['A33'] = "EBITDA (Last Year)"
-    ws['B33'] = "=Income_Statement!F10"  # 2029 EBITDA
+    ws['B33'] = f"={horizon.last_year_total('Income_Statement', 10)}"  # Final year EBITDA
+    apply(ws['B33'], number_format=NUMBER)
     
     ws['A34'] = "Enterprise Value"
     ws['B34'] = "=B32*B33"
+    apply(ws['B34'], number_format=NUMBER)
     
     ws['A35'] = "Less: Net Debt"
     ws['B35'] = "=B26"
+    apply(ws['B35'], number_format=NUMBER)
     
+    # Equity value and share price (light green)
     ws['A36'] = "Equity Value"
-    ws['A36'].font = Font(bold=True)
+    apply(ws['A36'], font=BOLD_FONT, fill=GREEN_FILL)
     ws['B36'] = "=B34-B35"
-    ws['B36'].font = Font(bold=True)
+    apply(ws['B36'], font=BOLD_FONT, fill=GREEN_FILL, number_format=NUMBER)
     
     ws['A37'] = "Share Price"
-    ws['A37'].font = Font(bold=True)
+    apply(ws['A37'], font=BOLD_FONT, fill=GREEN_FILL)
     ws['B37'] = "=B36/B7"
-    ws['B37'].number_format = '$#,##0.00'
-    ws['B37'].font = Font(bold=True)
+    apply(ws['B37'], font=BOLD_FONT, fill=GREEN_FILL, number_format='$#,##0.00')
     
     # P/E Multiple Valuation
     ws['A39'] = "P/E Multiple"
@@ -200,49 +312,13 @@ def create_stock_valuation(wb):
     ws['B39'].number_format = '0.0'
     
     ws['A40'] = "EPS (Last Year)"
-    ws['B40'] = "=Income_Statement!F14/B7"  # 2029 Net Income / Shares Outstanding
+    ws['B40'] = f"={horizon.last_year_total('Income_Statement', 14)}/B7"  # Final year Net Income / Shares Outstanding
     ws['B40'].number_format = '$#,##0.00'
     
+    # Share price (light orange)
     ws['A41'] = "Share Price"
-    ws['A41'].font = Font(bold=True)
+    apply(ws['A41'], font=BOLD_FONT, fill=ORANGE_FILL)
     ws['B41'] = "=B39*B40"
-    ws['B41'].number_format = '$#,##0.00'
-    ws['B41'].font = Font(bold=True)
-    
-    # Format all monetary values with thousands separator
-    for row in range(10, 17):  # FCF table
-        for col in range(2, 8):  # Columns B to G
-            if row != 11:  # Skip tax rate row
-                cell = ws[f'{get_column_letter(col)}{row}']
-                cell.number_format = '#,##0'
-    
-    # Format other monetary values
-    for row in [18, 20, 22, 23, 24, 26, 27, 33, 34, 35, 36]:
-        ws[f'B{row}'].number_format = '#,##0'
-    
-    # Set column widths
-    ws.column_dimensions['A'].width = 30
-    for col in range(2, 8):  # Columns B to G
-        ws.column_dimensions[get_column_letter(col)].width = 15
-    
-    # Add background colors to key rows
-    dcf_fill = PatternFill(start_color='DDEBF7', end_color='DDEBF7', fill_type='solid')       # Light blue
-    ev_ebitda_fill = PatternFill(start_color='E2EFDA', end_color='E2EFDA', fill_type='solid') # Light green
-    pe_fill = PatternFill(start_color='FCE4D6', end_color='FCE4D6', fill_type='solid')        # Light orange
-    
-    # Apply fills to key rows
-    for col in range(1, 3):  # Columns A to B for summary rows
-        col_letter = get_column_letter(col)
-        ws[f'{col_letter}24'].fill = dcf_fill      # Enterprise Value
-        ws[f'{col_letter}27'].fill = dcf_fill      # Equity Value
-        ws[f'{col_letter}28'].fill = dcf_fill      # Share Price (DCF)
-        ws[f'{col_letter}36'].fill = ev_ebitda_fill # Equity Value (EV/EBITDA)
-        ws[f'{col_letter}37'].fill = ev_ebitda_fill # Share Price (EV/EBITDA)
-        ws[f'{col_letter}41'].fill = pe_fill        # Share Price (P/E)
-    
-    # Apply fills to FCF row
-    for col in range(1, 8):  # Columns A to G
-        col_letter = get_column_letter(col)
-        ws[f'{col_letter}16'].fill = PatternFill(start_color='FFF2CC', end_color='FFF2CC', fill_type='solid')  # Light yellow
+    apply(ws['B41'], font=BOLD_FONT, fill=ORANGE_FILL, number_format='$#,##0.00')
     
     print("Stock_Valuation sheet created successfully")
\ No newline at end of file
@@ -0,0 +1,246 @@
+import itertools
+import math
+from copy import copy
+from io import BytesIO
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils.cell import coordinate_to_tuple
+from Formula_Engine import StreamCalculator
+from Workbook_Output import memory_writer, write_xlsx
+
+_NO_STYLE = (None, None, None, None, None)
+
+
+class BufferedCell:
+    """Lightweight stand-in for an openpyxl cell while a sheet is being built."""
+
+    __slots__ = ("value", "font", "fill", "border", "alignment", "number_format")
+
+    def __init__(self, value=None):
+        self.value = value
+        self.font = None
+        self.fill = None
+        self.border = None
+        self.alignment = None
+        self.number_format = None
+
+    @property
+    def _style(self):
+        # Mirrors openpyxl's Cell._style so style-copying code works unchanged
+        return (self.font, self.fill, self.border, self.alignment, self.number_format)
+
+    @_style.setter
+    def _style(self, style):
+        self.font, self.fill, self.border, self.alignment, self.number_format = style
+
+
+class WrittenCell(BufferedCell):
+    """Read-only copy of a cell whose row has already been streamed out."""
+
+    __slots__ = ()
+
+    def __init__(self, value=None):
+        for name in BufferedCell.__slots__:
+            object.__setattr__(self, name, None)
+        object.__setattr__(self, "value", value)
+
+    def __setattr__(self, name, value):
+        raise RuntimeError("Cell has already been written; streamed rows cannot be changed")
+
+
+class StreamingSheet:
+    """Worksheet proxy that streams one sheet out in row order.
+
+    Cells are buffered as compact BufferedCell objects until their row is
+    written to an openpyxl write-only worksheet, which serializes it
+    straight to a temporary file (or memory). A sheet whose builder writes
+    top to bottom (row_order) streams each row out as soon as the builder
+    moves on to a later one, so only the current row is buffered; other
+    sheets are buffered until flush(). The builder must set column widths
+    before the first row goes out.
+
+    Written cells are handed to the workbook's StreamCalculator, which
+    calculates their formulas and keeps only the values, so later sheets
+    can still read them (the value of a formula cell, not its text).
+    Charts and conditional formats are attached to the write-only sheet
+    and written when the workbook is saved.
+    """
+
+    def __init__(self, target, calculator, in_memory=False, row_order=False):
+        self._target = target
+        self._calculator = calculator
+        self._in_memory = in_memory
+        self._row_order = row_order
+        self._cells = {}
+        self._last_row = 0      # Last buffered row
+        self._written = 0       # Rows up to this one have been streamed out
+        self._streamed = 0      # Rows appended to the write-only sheet
+        self._cell_count = 0
+        self._styles = {}       # Resolved style arrays by the ids of the style objects
+        self.title = target.title
+        self.column_dimensions = target.column_dimensions
+        self.row_dimensions = target.row_dimensions
+        self.conditional_formatting = target.conditional_formatting
+        calculator.add_sheet(self.title)
+
+    @property
+    def flushed(self):
+        return self._written == math.inf
+
+    @property
+    def cell_count(self):
+        """Number of cells written so far, streamed out or buffered."""
+        return self._cell_count + len(self._cells)
+
+    def cell(self, row, column, value=None):
+        if row <= self._written:
+            if value is not None:
+                raise RuntimeError(f"Row {row} of {self.title} has already been written")
+            return WrittenCell(self._calculator.value(self.title, row, column))
+        if row > self._last_row:
+            if self._row_order and self._cells:
+                # Every buffered row is above this one and so complete
+                self._write_rows(row - 1)
+            self._last_row = row
+        cell = self._cells.get((row, column))
+        if cell is None:
+            cell = self._cells[(row, column)] = BufferedCell()
+        if value is not None:
+            cell.value = value
+        return cell
+
+    def __getitem__(self, coordinate):
+        return self.cell(*coordinate_to_tuple(coordinate))
+
+    def __setitem__(self, coordinate, value):
+        self.cell(*coordinate_to_tuple(coordinate), value=value).value = value
+
+    def add_chart(self, chart, anchor=None):
+        self._target.add_chart(chart, anchor)
+
+    def add_data_validation(self, data_validation):
+        self._target.data_validations.append(data_validation)
+
+    def cell_value(self, row, column):
+        """Value of one cell, without creating it (calculated once written)."""
+        if row <= self._written:
+            return self._calculator.value(self.title, row, column)
+        cell = self._cells.get((row, column))
+        return None if cell is None else cell.value
+
+    def cell_values(self):
+        """(row, col), value pairs of every non-empty cell."""
+        written = self._calculator.values(self.title)
+        return itertools.chain(written, ((key, cell.value) for key, cell in self._cells.items()))
+
+    def _row_cells(self, cells, styles):
+        row = []
+        for col, cell in cells:
+            row.extend([None] * (col - len(row) - 1))
+            out = WriteOnlyCell(self._target, value=cell.value)
+            style = cell._style
+            if style != _NO_STYLE:
+                # Resolve each distinct combination of the shared style
+                # objects against the workbook once, then copy the array
+                key = tuple(map(id, style))
+                cached = styles.get(key)
+                if cached is None:
+                    font, fill, border, alignment, number_format = style
+                    if font is not None:
+                        out.font = font
+                    if fill is not None:
+                        out.fill = fill
+                    if border is not None:
+                        out.border = border
+                    if alignment is not None:
+                        out.alignment = alignment
+                    if number_format is not None:
+                        out.number_format = number_format
+                    styles[key] = (copy(out._style), style)
+                else:
+                    out._style = copy(cached[0])
+            row.append(out)
+        return row
+
+    def _write_rows(self, last_row):
+        """Stream out the buffered rows (all up to last_row) and free them."""
+        if self._in_memory and self._target._writer is None:
+            # Set up the writer openpyxl would otherwise create on a temporary
+            # file at the first append. The sheet's top (including <cols>) is
+            # written now, so the builder must have set the column widths.
+            self._target._writer = memory_writer(self._target)
+            self._target._writer.write_top()
+        rows = {}
+        for row, col in self._cells:
+            rows.setdefault(row, []).append(col)
+
+        for row in sorted(rows):
+            for _ in range(row - self._streamed - 1):
+                self._target.append([])
+            cells = [(col, self._cells.pop((row, col))) for col in sorted(rows[row])]
+            self._target.append(self._row_cells(cells, self._styles))
+            self._cell_count += len(cells)
+            self._streamed = row
+            self._calculator.add(self.title, [((row, col), cell.value) for col, cell in cells], row)
+
+        if self._streamed:
+            # <cols> went out with the first row, so the widths are no longer needed
+            self._target.column_dimensions.clear()
+        self._written = last_row
+        self._calculator.add(self.title, (), last_row)
+
+    def flush(self):
+        """Write the remaining buffered rows to the write-only sheet."""
+        if not self.flushed:
+            self._write_rows(math.inf)
+            self._cells = {}
+
+class StreamingWorkbook:
+    """Workbook facade for the create_* functions backed by write-only sheets.
+
+    row_order names the sheets whose builders write strictly top to bottom,
+    which are streamed out row by row (see StreamingSheet). With
+    in_memory=True the write-only sheets serialize to memory rather than to
+    temporary files, so nothing touches the filesystem.
+    """
+
+    def __init__(self, in_memory=False, row_order=()):
+        self._wb = Workbook(write_only=True)
+        self._sheets = {}
+        self.in_memory = in_memory
+        self.row_order = set(row_order)
+        self.calculator = StreamCalculator()
+
+    def create_sheet(self, title):
+        target = self._wb.create_sheet(title)
+        sheet = self._sheets[title] = StreamingSheet(target, self.calculator, self.in_memory,
+                                                     title in self.row_order)
+        return sheet
+
+    def __getitem__(self, title):
+        return self._sheets[title]
+
+    def __contains__(self, title):
+        return title in self._sheets
+
+    @property
+    def sheetnames(self):
+        return list(self._sheets)
+
+    @property
+    def worksheets(self):
+        return list(self._sheets.values())
+
+    def flush(self, title):
+        """Stream out the rest of a finished sheet so its buffer can be released."""
+        self._sheets[title].flush()
+
+    def save(self, filename=None, compresslevel=None, cached_values=False):
+        """Save like Workbook_Output.ModelWorkbook.save."""
+        if cached_values:
+            raise ValueError("Streamed sheets are already written; cached values need a regular build")
+        for sheet in self._sheets.values():
+            sheet.flush()
+        target = BytesIO() if filename is None else filename
+        write_xlsx(self._wb, target, compresslevel)
+        return target.getvalue() if filename is None else None
@@ -0,0 +1,104 @@
+from copy import copy
+from functools import lru_cache
+from weakref import WeakKeyDictionary
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.styles.cell_style import StyleArray
+
+# Shared style objects used by every sheet. Reuse these instead of creating
+# new Font/PatternFill/Border objects per cell: openpyxl deduplicates styles
+# by hashing the object on every assignment, so fresh objects cost an
+# allocation and a hash each time.
+
+# Fonts
+TITLE_FONT = Font(bold=True, size=14)      # Sheet titles
+SECTION_FONT = Font(bold=True, size=12)    # Section headings
+BOLD_FONT = Font(bold=True)                # Headers, totals and key line items
+RED_FONT = Font(color="FF0000")            # Warnings (e.g. balance check)
+
+
+@lru_cache(maxsize=None)
+def solid_fill(color):
+    """Shared solid PatternFill for a hex colour such as 'E2EFDA'."""
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+# Fills
+HEADER_FILL = solid_fill('DCE6F1')     # Light blue-gray header
+BLUE_FILL = solid_fill('DDEBF7')       # Light blue
+GREEN_FILL = solid_fill('E2EFDA')      # Light green
+ORANGE_FILL = solid_fill('FCE4D6')     # Light orange
+YELLOW_FILL = solid_fill('FFF2CC')     # Light yellow
+RED_FILL = solid_fill('FFCCCC')        # Light red
+GRAY_FILL = solid_fill('F2F2F2')       # Light gray
+DARK_GRAY_FILL = solid_fill('D9D9D9')  # Gray
+
+# Borders and alignment
+THIN_SIDE = Side(style='thin')
+THIN_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+CENTER = Alignment(horizontal='center')
+RIGHT = Alignment(horizontal='right')
+WRAP = Alignment(wrap_text=True)
+
+# Number formats
+NUMBER = '#,##0'
+PERCENT = '0.00%'
+CURRENCY = '$#,##0.00'
+
+# Per-workbook cache of style transitions: (current style array, styles
+# applied) -> resulting style array. The style objects are kept in the
+# value so their ids in the key cannot be reused while the entry exists.
+_transitions = WeakKeyDictionary()
+
+
+def apply(cell, font=None, fill=None, border=None, alignment=None, number_format=None):
+    """Give a cell any of the shared styles above.
+
+    Equivalent to setting cell.font, cell.fill, ... for the arguments that
+    are not None, but each distinct change is resolved against the
+    workbook's style tables only once and then copied as a style array,
+    which makes styling large statement grids several times faster.
+    """
+    wb = getattr(getattr(cell, "parent", None), "parent", None)
+    if wb is None or not isinstance(cell._style, StyleArray):
+        # Not an openpyxl cell (e.g. a streaming buffer cell): set directly
+        _set(cell, font, fill, border, alignment, number_format)
+        return
+
+    cache = _transitions.get(wb)
+    if cache is None:
+        cache = _transitions[wb] = {}
+    key = (tuple(cell._style), id(font), id(fill), id(border), id(alignment), number_format)
+    hit = cache.get(key)
+    if hit is None:
+        _set(cell, font, fill, border, alignment, number_format)
+        cache[key] = (copy(cell._style), (font, fill, border, alignment))
+    else:
+        cell._style = copy(hit[0])
+
+
+def _set(cell, font, fill, border, alignment, number_format):
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if border is not None:
+        cell.border = border
+    if alignment is not None:
+        cell.alignment = alignment
+    if number_format is not None:
+        cell.number_format = number_format
+
+
+def number_row(ws, row, columns, values=(), font=None, fill=None, number_format=NUMBER):
+    """Write values into a row's cells, columns given by letter, and style every cell.
+
+    Columns past the end of values are left empty but styled all the same,
+    as statement grids format their blank rows too. The whole row is
+    written in one go, so a builder using it works top to bottom.
+    """
+    values = list(values)
+    for j, col in enumerate(columns):
+        cell = ws[f'{col}{row}']
+        if j < len(values):
+            cell.value = values[j]
+        apply(cell, font=font, fill=fill, number_format=number_format)
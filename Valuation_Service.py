@@ -0,0 +1,300 @@
+"""Local HTTP valuation service.
+
+Answers DCF share price, bond price/yield and project NPV questions over
+HTTP/1.1 with JSON bodies, without a Python process per request:
+
+    POST /dcf      {"Discount Rate (WACC)": 0.09, "Tax Rate": 0.21}
+    POST /bond     {"par": 1000, "coupon_rate": 0.05, "years": 10, "frequency": 2, "yield_rate": 0.06}
+    POST /project  {"cash_flows": [-500000, 120000, 150000, 180000, 200000, 270000], "discount_rate": 0.1}
+    GET  /health
+
+Any input left out keeps the value of the standard model. A body may also
+be a list of such objects, answered with a list. The model template is
+built, parsed and compiled once at startup; concurrent requests to an
+endpoint are evaluated together as one vectorized NumPy batch.
+
+    python Valuation_Service.py --port 8765
+"""
+import argparse
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+from Bond_Valuation import DEFAULT_BOND, price_bonds, solve_ytm
+from Capital_Budgeting import INITIAL_INVESTMENT, SALVAGE_VALUE, ANNUAL_CASH_FLOWS, analyze_projects
+from Scenario_Engine import SCENARIO_INPUTS, template_engine
+
+# DCF request fields and the model input cells they set
+DCF_INPUTS = SCENARIO_INPUTS + [
+    ("Long-term Growth Rate", "Stock_Valuation!B6"),
+    ("Shares Outstanding", "Stock_Valuation!B7"),
+]
+DCF_OUTPUTS = [
+    ("enterprise_value", "Stock_Valuation!B24"),
+    ("equity_value", "Stock_Valuation!B27"),
+    ("share_price", "Stock_Valuation!B28"),
+]
+BOND_TERMS = ("par", "coupon_rate", "years", "frequency", "yield_rate", "price")
+DEFAULT_PROJECT = [-INITIAL_INVESTMENT] + ANNUAL_CASH_FLOWS[:-1] + [ANNUAL_CASH_FLOWS[-1] + SALVAGE_VALUE]
+PROJECT_OUTPUTS = ("npv", "irr", "mirr", "profitability_index", "payback", "discounted_payback")
+
+MAX_BODY = 1 << 20   # bytes
+MAX_BATCH = 4096     # requests evaluated together per endpoint
+
+
+def _number(value, name):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number, got {value!r}")
+    return float(value)
+
+
+def _fields(payload, allowed):
+    if not isinstance(payload, dict):
+        raise ValueError(f"expected a JSON object, got {type(payload).__name__}")
+    unknown = set(payload) - set(allowed)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    return {name: _number(value, name) for name, value in payload.items()}
+
+
+def _json_value(value):
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+class DCFValuation:
+    """Share price from the calculated model for sets of DCF assumptions."""
+
+    def __init__(self, engine=None):
+        self.engine = engine or template_engine()
+        self.base = {label: float(self.engine[cell]) for label, cell in DCF_INPUTS}
+
+    def parse(self, payload):
+        fields = _fields(payload, self.base)
+        return [fields.get(label, base) for label, base in self.base.items()]
+
+    def evaluate(self, rows):
+        inputs = np.array(rows, dtype=float)
+        values = self.engine.calculate_scenarios(
+            {cell: inputs[:, k] for k, (_, cell) in enumerate(DCF_INPUTS)})
+        outputs = {name: np.broadcast_to(np.asarray(values[cell], dtype=float), len(rows))
+                   for name, cell in DCF_OUTPUTS}
+        return [{name: _json_value(column[i]) for name, column in outputs.items()} for i in range(len(rows))]
+
+
+class BondValuation:
+    """Price at yield_rate and yield to maturity at the market price for bonds."""
+
+    def parse(self, payload):
+        terms = dict(DEFAULT_BOND, **_fields(payload, BOND_TERMS))
+        if terms["frequency"] <= 0 or terms["years"] * terms["frequency"] < 1:
+            raise ValueError("bond must have at least one payment period")
+        return [terms[term] for term in BOND_TERMS]
+
+    def evaluate(self, rows):
+        par, coupon_rate, years, frequency, yield_rate, price = np.array(rows, dtype=float).T
+        prices = price_bonds(par, coupon_rate, years, frequency, yield_rate)
+        yields, _ = solve_ytm(price, par, coupon_rate, years, frequency)
+        return [{"price": _json_value(p), "ytm": _json_value(y)} for p, y in zip(prices, yields)]
+
+
+class ProjectValuation:
+    """NPV, IRR and paybacks of project cash flows (period 0 first)."""
+
+    def parse(self, payload):
+        if not isinstance(payload, dict):
+            raise ValueError(f"expected a JSON object, got {type(payload).__name__}")
+        unknown = set(payload) - {"cash_flows", "discount_rate"}
+        if unknown:
+            raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+        flows = payload.get("cash_flows", DEFAULT_PROJECT)
+        if not isinstance(flows, list) or len(flows) < 2:
+            raise ValueError("cash_flows must be a list of at least two numbers")
+        flows = [_number(flow, f"cash_flows[{i}]") for i, flow in enumerate(flows)]
+        return flows, _number(payload.get("discount_rate", 0.10), "discount_rate")
+
+    def evaluate(self, rows):
+        flows, rates = zip(*rows)
+        results = analyze_projects(list(flows), discount_rate=np.array(rates))
+        return [{name: _json_value(results[name][i]) for name in PROJECT_OUTPUTS} for i in range(len(rows))]
+
+
+class Batcher:
+    """Collects requests to one valuation and evaluates them in batches.
+
+    While a batch is being evaluated, new requests queue up and form the
+    next batch, so under load each NumPy call covers many requests and an
+    idle service adds no waiting time. Batches run one at a time on the
+    executor, which keeps the event loop free to read requests meanwhile.
+    """
+
+    def __init__(self, valuation, executor, max_batch=MAX_BATCH):
+        self.valuation = valuation
+        self.executor = executor
+        self.max_batch = max_batch
+        self.pending = []
+        self.worker = None
+        self.requests = 0
+        self.batches = 0
+
+    async def submit(self, row):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((row, future))
+        if self.worker is None:
+            self.worker = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        try:
+            # Let requests that arrived in the same loop iteration join the batch
+            await asyncio.sleep(0)
+            while self.pending:
+                batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+                rows = [row for row, _ in batch]
+                try:
+                    results = await loop.run_in_executor(self.executor, self.valuation.evaluate, rows)
+                except Exception as exc:
+                    results = [exc] * len(batch)
+                self.requests += len(batch)
+                self.batches += 1
+                for (_, future), result in zip(batch, results):
+                    if future.cancelled():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        finally:
+            self.worker = None
+
+
+class ValuationService:
+    """asyncio HTTP server routing JSON requests to batched valuations."""
+
+    def __init__(self, host="127.0.0.1", port=8765, max_batch=MAX_BATCH):
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="valuation")
+        self.batchers = {
+            "/dcf": Batcher(DCFValuation(), self.executor, max_batch),
+            "/bond": Batcher(BondValuation(), self.executor, max_batch),
+            "/project": Batcher(ProjectValuation(), self.executor, max_batch),
+        }
+        # Run every valuation once so the first request is not the slow one
+        for batcher in self.batchers.values():
+            batcher.valuation.evaluate([batcher.valuation.parse({})])
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+    def health(self):
+        return {
+            "status": "ok",
+            "endpoints": {path: {"requests": b.requests, "batches": b.batches}
+                          for path, b in self.batchers.items()},
+        }
+
+    async def _respond(self, method, path, body):
+        """(status, JSON-serializable body) for one request."""
+        if path == "/health":
+            return HTTPStatus.OK, self.health()
+        batcher = self.batchers.get(path)
+        if batcher is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"unknown path {path}"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{path} only accepts POST"}
+        try:
+            payload = json.loads(body) if body else {}
+            items = payload if isinstance(payload, list) else [payload]
+            rows = [batcher.valuation.parse(item) for item in items]
+        except ValueError as exc:
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+        return HTTPStatus.OK, results if isinstance(payload, list) else results[0]
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write(writer, HTTPStatus.BAD_REQUEST, {"error": "malformed request line"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    await self._write(writer, HTTPStatus.BAD_REQUEST, {"error": "invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._write(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, result = await self._respond(method.upper(), target.split("?")[0], body)
+                except Exception as exc:
+                    status, result = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}
+                await self._write(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer, status, result, keep_alive):
+        body = json.dumps(result).encode()
+        writer.write(f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                     f"Content-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8765, max_batch=MAX_BATCH):
+    service = await ValuationService(host, port, max_batch).start()
+    print(f"Valuation service listening on http://{service.host}:{service.port}", flush=True)
+    await service.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve DCF, bond and project valuations over local HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (0 picks a free port)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="most requests evaluated in one batch")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch))
+    except KeyboardInterrupt:
+        pass
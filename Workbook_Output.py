@@ -0,0 +1,165 @@
+import math
+import numbers
+import os
+from datetime import datetime, timezone
+from io import BytesIO
+from zipfile import ZipFile, ZIP_DEFLATED
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.cell._writer import _set_attributes, write_cell
+from openpyxl.comments.comment_sheet import CommentRecord
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.writer.excel import ExcelWriter
+from openpyxl.xml.functions import Element, SubElement
+from Formula_Engine import evaluate_workbook
+
+# Cached error values. The FormulaEngine returns NaN for every Excel error
+# (#DIV/0!, #NUM! from an IRR without a root, #N/A from a MATCH miss, ...)
+# without recording which, so NaN is written as the neutral #VALUE!. An
+# infinite result is an overflow, Excel's #NUM!.
+ERROR_VALUE = "#VALUE!"
+OVERFLOW_VALUE = "#NUM!"
+
+
+def _cached_value(value):
+    """(cell type, <v> text) for a computed formula value, or None to leave it uncached."""
+    if isinstance(value, (bool, np.bool_)):
+        return "b", "1" if value else "0"
+    if value is None:
+        # A formula reading only empty cells shows 0
+        return "n", "0"
+    if isinstance(value, str):
+        return "str", value
+    if isinstance(value, numbers.Integral):
+        return "n", str(int(value))
+    if isinstance(value, numbers.Real):
+        # repr round-trips the float exactly; openpyxl's safe_string keeps 16 digits
+        if math.isnan(value):
+            return "e", ERROR_VALUE
+        return ("n", repr(float(value))) if math.isfinite(value) else ("e", OVERFLOW_VALUE)
+    return None
+
+
+class CachedValueWriter(WorksheetWriter):
+    """WorksheetWriter that stores each formula's computed value as its cached value.
+
+    values maps (row, col) of formula cells to their values. openpyxl
+    otherwise writes formulas with an empty <v>, so readers of cached values
+    (load_workbook(data_only=True), pandas, ...) see None.
+    """
+
+    def __init__(self, ws, values, out=None):
+        super().__init__(ws, out=out)
+        self.values = values
+
+    def write_row(self, xf, row, row_idx):
+        attrs = {'r': f"{row_idx}"}
+        attrs.update(self.ws.row_dimensions.get(row_idx, {}))
+
+        with xf.element("row", attrs):
+            for cell in row:
+                if cell._comment is not None:
+                    self.ws._comments.append(CommentRecord.from_cell(cell))
+                if cell._value is None and not cell.has_style and not cell._comment:
+                    continue
+                cached = None
+                if cell.data_type == "f" and isinstance(cell._value, str):
+                    key = (cell.row, cell.column)
+                    cached = _cached_value(self.values[key]) if key in self.values else None
+                if cached is None:
+                    write_cell(xf, self.ws, cell, cell.has_style)
+                    continue
+                kind, text = cached
+                _, attributes = _set_attributes(cell, cell.has_style)
+                if kind != "n":
+                    attributes["t"] = kind
+                el = Element("c", attributes)
+                SubElement(el, "f").text = cell._value[1:]
+                SubElement(el, "v").text = text
+                xf.write(el)
+
+
+def memory_writer(ws, values=None):
+    """WorksheetWriter that serializes ws into a BytesIO instead of a temporary file.
+
+    With values ({(row, col): value} of its formula cells) the computed
+    values are written as the formulas' cached values.
+    """
+    if values:
+        return CachedValueWriter(ws, values, out=BytesIO())
+    return WorksheetWriter(ws, out=BytesIO())
+
+
+class MemoryExcelWriter(ExcelWriter):
+    """ExcelWriter that never touches the filesystem.
+
+    openpyxl serializes every worksheet to a temporary file before adding
+    it to the archive; this writer keeps the sheet XML in memory instead.
+    values optionally holds the computed formula values of each sheet,
+    {sheet_title: {(row, col): value}}, to write as cached values.
+    """
+
+    def __init__(self, workbook, archive, values=None):
+        super().__init__(workbook, archive)
+        self.values = values or {}
+
+    def write_worksheet(self, ws):
+        ws._drawing = SpreadsheetDrawing()
+        ws._drawing.charts = ws._charts
+        ws._drawing.images = ws._images
+        if self.workbook.write_only:
+            if not ws.closed:
+                ws.close()
+            writer = ws._writer
+        else:
+            writer = memory_writer(ws, self.values.get(ws.title))
+            writer.write()
+
+        ws._rels = writer._rels
+        self._archive.writestr(ws.path[1:], writer.read())
+        self.manifest.append(ws)
+        if not isinstance(writer.out, BytesIO):
+            # A write-only sheet streamed to a temporary file
+            writer.cleanup()
+
+
+def write_xlsx(workbook, target, compresslevel=None, writer=MemoryExcelWriter, cached_values=False):
+    """Write an openpyxl workbook as .xlsx to a filename or writable binary stream.
+
+    compresslevel is the zlib level of the archive (0 fastest and largest,
+    9 smallest; None is zlib's default of 6). The stream does not need to
+    be seekable.
+
+    With cached_values the model is first calculated with the FormulaEngine
+    and every formula cell is written with its computed value, so readers
+    of cached values get numbers without a spreadsheet application
+    recalculating the file. The formulas are kept. Errors are cached as
+    #VALUE! (#NUM! for overflow) whatever their Excel type would be,
+    since the engine represents them all as NaN.
+    """
+    values = evaluate_workbook(workbook).formula_values() if cached_values else None
+    workbook.properties.modified = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+    with ZipFile(target, 'w', ZIP_DEFLATED, allowZip64=True, compresslevel=compresslevel) as archive:
+        writer(workbook, archive, values).write_data()
+
+
+def is_path(target):
+    """True for a filename target, False for a stream."""
+    return isinstance(target, (str, bytes, os.PathLike))
+
+
+class ModelWorkbook(Workbook):
+    """Workbook whose save writes in memory and takes a stream and compression level."""
+
+    xlsx_writer = MemoryExcelWriter
+
+    def save(self, filename=None, compresslevel=None, cached_values=False):
+        """Save to a filename or writable binary stream, or return the bytes if filename is None.
+
+        cached_values also writes each formula's computed value (see write_xlsx).
+        """
+        target = BytesIO() if filename is None else filename
+        write_xlsx(self, target, compresslevel, self.xlsx_writer, cached_values)
+        return target.getvalue() if filename is None else None
@@ -0,0 +1,81 @@
+"""Build time and file size of the model against the forecast horizon length.
+
+Builds and saves the full model for a range of period counts and fits
+time = a + b * periods (likewise for file size) by least squares. Linear
+scaling shows up as an R^2 close to 1 and a flat cost per extra period.
+
+    python benchmarks/horizon_scaling.py
+    python benchmarks/horizon_scaling.py --granularity quarterly --periods 40 200 600
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Horizon import Horizon
+from main import build_workbook
+
+DEFAULT_PERIODS = [60, 120, 240, 360, 480, 600]
+
+
+def measure(horizon, streaming=False, repeat=3):
+    """Best-of-repeat build and save times (seconds) and the file size (bytes)."""
+    build_times, save_times = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "model.xlsx")
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                wb = build_workbook(horizon=horizon, streaming=streaming)
+                built = time.perf_counter()
+                wb.save(filename)
+                saved = time.perf_counter()
+            build_times.append(built - start)
+            save_times.append(saved - built)
+        size = os.path.getsize(filename)
+    return min(build_times), min(save_times), size
+
+
+def linear_fit(x, y):
+    """Intercept, slope and R^2 of a least-squares line through (x, y)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    slope, intercept = np.polyfit(x, y, 1)
+    residual = y - (intercept + slope * x)
+    total = ((y - y.mean()) ** 2).sum()
+    r2 = 1 - (residual ** 2).sum() / total if total else 1.0
+    return intercept, slope, r2
+
+
+def run(periods=DEFAULT_PERIODS, granularity="monthly", streaming=False, repeat=3):
+    rows = []
+    print(f"{'periods':>8} {'build s':>9} {'save s':>9} {'total s':>9} {'size KB':>9}")
+    for n in periods:
+        build, save, size = measure(Horizon(periods=n, granularity=granularity), streaming, repeat)
+        rows.append((n, build, save, build + save, size))
+        print(f"{n:>8} {build:>9.3f} {save:>9.3f} {build + save:>9.3f} {size / 1024:>9.1f}")
+
+    n = [row[0] for row in rows]
+    print()
+    for label, index, unit, scale in [("build time", 1, "ms", 1e3), ("save time", 2, "ms", 1e3),
+                                      ("total time", 3, "ms", 1e3), ("file size", 4, "KB", 1 / 1024)]:
+        intercept, slope, r2 = linear_fit(n, [row[index] for row in rows])
+        print(f"{label:>10}: {intercept * scale:9.1f} {unit} + {slope * scale:7.3f} {unit}/period  (R^2 = {r2:.4f})")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark model build time and size against horizon length.")
+    parser.add_argument("--periods", type=int, nargs="+", default=DEFAULT_PERIODS)
+    parser.add_argument("--granularity", default="monthly", choices=["annual", "quarterly", "monthly"])
+    parser.add_argument("--streaming", action="store_true", help="build in write-only streaming mode")
+    parser.add_argument("--repeat", type=int, default=3, help="builds per size; the fastest is reported")
+    args = parser.parse_args()
+    run(args.periods, args.granularity, args.streaming, args.repeat)
@@ -0,0 +1,155 @@
+"""Load test for the local valuation service (Valuation_Service.py).
+
+Opens --concurrency keep-alive connections to the service and sends
+--requests POSTs in total with randomized inputs, then reports the latency
+percentiles, requests per second and the service's average batch size.
+Without --port a service is started on a free localhost port for the run.
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --endpoint bond --concurrency 256 --requests 50000
+    python benchmarks/load_test.py --port 8765 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ("dcf", "bond", "project")
+
+
+def payload(endpoint, rng):
+    """Randomized request body for one endpoint."""
+    if endpoint == "dcf":
+        return {"Discount Rate (WACC)": rng.uniform(0.06, 0.14), "Tax Rate": rng.uniform(0.15, 0.35),
+                "Long-term Growth Rate": rng.uniform(0.0, 0.04)}
+    if endpoint == "bond":
+        return {"coupon_rate": rng.uniform(0.0, 0.1), "years": rng.randint(1, 30),
+                "frequency": rng.choice([1, 2, 4, 12]), "yield_rate": rng.uniform(0.01, 0.12),
+                "price": rng.uniform(800, 1200)}
+    flows = [-rng.uniform(50_000, 200_000)] + [rng.gauss(30_000, 15_000) for _ in range(rng.randint(3, 10))]
+    return {"cash_flows": flows, "discount_rate": rng.uniform(0.05, 0.15)}
+
+
+async def request(reader, writer, method, path, body=b""):
+    """Send one HTTP/1.1 request on an open connection and return (status, body)."""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(host, port, endpoints, count, latencies, errors, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(count):
+            endpoint = endpoints[i % len(endpoints)]
+            body = json.dumps(payload(endpoint, rng)).encode()
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, "POST", f"/{endpoint}", body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def health(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, body = await request(reader, writer, "GET", "/health")
+        return json.loads(body)
+    finally:
+        writer.close()
+
+
+async def run(host, port, endpoints, concurrency, requests):
+    before = await health(host, port)
+    latencies, errors = [], []
+    per_client, extra = divmod(requests, concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, endpoints, per_client + (i < extra), latencies, errors, i)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    after = await health(host, port)
+
+    served = sum(after["endpoints"][f"/{e}"]["requests"] - before["endpoints"][f"/{e}"]["requests"]
+                 for e in endpoints)
+    batches = sum(after["endpoints"][f"/{e}"]["batches"] - before["endpoints"][f"/{e}"]["batches"]
+                  for e in endpoints)
+    ms = np.array(latencies) * 1e3
+    return {
+        "endpoints": list(endpoints),
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+        "mean_batch_size": served / batches if batches else None,
+    }
+
+
+def start_service():
+    """Start Valuation_Service.py on a free localhost port and return (process, port)."""
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "Valuation_Service.py"), "--port", "0"],
+                               cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("Valuation service listening on"):
+        process.kill()
+        raise RuntimeError(f"valuation service did not start: {line!r}")
+    return process, int(line.rsplit(":", 1)[1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the local valuation service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="port of a running service (default: start one)")
+    parser.add_argument("--endpoint", choices=ENDPOINTS + ("mix",), default="mix",
+                        help="endpoint to load; mix rotates through all of them")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=20_000, help="total requests to send")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    process = None
+    port = args.port
+    if port is None:
+        process, port = start_service()
+    try:
+        endpoints = ENDPOINTS if args.endpoint == "mix" else (args.endpoint,)
+        results = asyncio.run(run(args.host, port, endpoints, args.concurrency, args.requests))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(f"{results['requests']:,} requests to {', '.join(endpoints)} over {args.concurrency} connections "
+          f"in {results['seconds']:.2f}s ({results['errors']} errors)")
+    print(f"  {results['requests_per_second']:,.0f} requests/s")
+    print(f"  latency p50 {results['p50_ms']:.2f} ms, p90 {results['p90_ms']:.2f} ms, "
+          f"p99 {results['p99_ms']:.2f} ms, max {results['max_ms']:.2f} ms")
+    if results["mean_batch_size"]:
+        print(f"  mean batch size {results['mean_batch_size']:.1f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if results["errors"] else 0)
@@ -0,0 +1,212 @@
+"""Benchmark suite for workbook generation and the valuation math.
+
+Times the full create_financial_model run, every sheet builder on its own,
+wb.save, the native recalculation and the numeric kernels (bond pricing and
+YTM, DCF surface, project NPV/IRR, NPV grid) over a range of horizon
+lengths and bond/project counts. Results are written as JSON and compared
+against a stored baseline; a case that is more than --threshold slower than
+its baseline is reported as a regression and the script exits with 1.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --quick --output results.json
+    python benchmarks/run_benchmarks.py --save-baseline
+
+Timings are machine dependent: regenerate the baseline with
+--save-baseline on the machine the comparison runs on.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import openpyxl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Horizon import Horizon
+from main import build_workbook, create_financial_model, sheet_builders
+from Formula_Engine import evaluate_workbook
+from Stock_Valuation import dcf_inputs, dcf_valuation_surface
+from Bond_Valuation import price_bonds, solve_ytm, create_bond_portfolio
+from Capital_Budgeting import analyze_projects
+from Sensitivity_Analysis import npv_grid
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Monthly horizons (periods), bond counts and project counts to run
+SIZES = {"periods": [12, 120, 360], "bonds": [1_000, 100_000], "projects": [100, 10_000]}
+QUICK_SIZES = {"periods": [12, 120], "bonds": [1_000], "projects": [100]}
+
+
+def summarize(times):
+    return {"min": min(times), "median": statistics.median(times), "repeat": len(times)}
+
+
+def timed(fn, repeat):
+    """Fastest and median wall time (seconds) of fn() over repeat runs."""
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return summarize(times)
+
+
+def bench_model(periods, repeat):
+    """End-to-end build, per-builder, save and recalculation timings for one horizon."""
+    horizon = Horizon(periods=periods, granularity="monthly")
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "model.xlsx")
+        results["create_financial_model"] = timed(lambda: create_financial_model(filename, horizon=horizon), repeat)
+
+    # Each builder runs against a workbook holding every earlier sheet, as
+    # in build_workbook, and is timed on its own
+    builders = sheet_builders(horizon=horizon)
+    builder_times = {name: [] for name, _ in builders}
+    for _ in range(repeat):
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active)
+        for name, _ in builders:
+            wb.create_sheet(name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, builder in builders:
+                start = time.perf_counter()
+                builder(wb)
+                builder_times[name].append(time.perf_counter() - start)
+    for name, times in builder_times.items():
+        results[f"builder.{name}"] = summarize(times)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        wb = build_workbook(horizon=horizon)
+    results["save"] = timed(lambda: wb.save(io.BytesIO()), repeat)
+
+    results["evaluate_workbook"] = timed(lambda: evaluate_workbook(wb), repeat)
+    inputs = dcf_inputs(evaluate_workbook(wb), horizon)
+    wacc, growth = np.linspace(0.06, 0.16, 201), np.linspace(0.0, 0.04, 161)
+    results["dcf_valuation_surface"] = timed(lambda: dcf_valuation_surface(inputs, wacc, growth), repeat)
+
+    return {f"model[periods={periods}].{name}": result for name, result in results.items()}
+
+
+def bench_bonds(count, repeat):
+    rng = np.random.default_rng(2025)
+    par = rng.choice([100.0, 1000.0], count)
+    coupon = rng.uniform(0.0, 0.1, count)
+    years = rng.integers(1, 31, count)
+    frequency = rng.choice([1, 2, 4, 12], count)
+    yields = rng.uniform(0.01, 0.12, count)
+    prices = price_bonds(par, coupon, years, frequency, yields)
+
+    def portfolio():
+        wb = openpyxl.Workbook()
+        create_bond_portfolio(wb, par, coupon, years, frequency, yields)
+
+    return {
+        f"bonds[n={count}].price_bonds": timed(lambda: price_bonds(par, coupon, years, frequency, yields), repeat),
+        f"bonds[n={count}].solve_ytm": timed(lambda: solve_ytm(prices, par, coupon, years, frequency), repeat),
+        f"bonds[n={count}].create_bond_portfolio": timed(portfolio, repeat),
+    }
+
+
+def bench_projects(count, repeat):
+    rng = np.random.default_rng(2025)
+    flows = rng.normal(30_000, 15_000, (count, 11))
+    flows[:, 0] = -rng.uniform(50_000, 200_000, count)
+    side = int(np.sqrt(count))
+    return {
+        f"projects[n={count}].analyze_projects": timed(lambda: analyze_projects(flows), repeat),
+        f"projects[n={count}].npv_grid": timed(
+            lambda: npv_grid("discount_rate", np.linspace(0.02, 0.2, side),
+                             "cash_flows", np.linspace(0.5, 1.5, side)), repeat),
+    }
+
+
+def run(sizes=SIZES, repeat=3):
+    results = {}
+    for periods in sizes["periods"]:
+        results.update(bench_model(periods, repeat))
+    for count in sizes["bonds"]:
+        results.update(bench_bonds(count, repeat))
+    for count in sizes["projects"]:
+        results.update(bench_projects(count, repeat))
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "openpyxl": openpyxl.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=0.25, min_delta=0.001):
+    """Print each case against the baseline and return the names of regressions.
+
+    A case regresses when it is more than threshold (a fraction) and more
+    than min_delta seconds slower than its baseline, so timer noise on
+    sub-millisecond kernels is not reported.
+    """
+    regressions = []
+    print(f"{'case':<60} {'min ms':>10} {'base ms':>10} {'change':>8}")
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+        line = f"{name:<60} {result['min'] * 1e3:>10.2f}"
+        if base is None:
+            print(f"{line} {'-':>10} {'new':>8}")
+            continue
+        change = result["min"] / base["min"] - 1
+        flag = ""
+        if change > threshold and result["min"] - base["min"] > min_delta:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{line} {base['min'] * 1e3:>10.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark model generation and valuation math.")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown (fraction of the baseline time) reported as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.001,
+                        help="smallest slowdown in seconds reported as a regression")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the fastest is compared")
+    parser.add_argument("--quick", action="store_true", help="run only the small sizes")
+    args = parser.parse_args()
+
+    results = run(QUICK_SIZES if args.quick else SIZES, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        compare(results, {"results": {}})
+        sys.exit(0)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+        sys.exit(1)
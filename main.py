@@ -1,9 +1,7 @@
+import argparse
+import contextlib
 import os
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.chart import BarChart, Reference
-from openpyxl.utils import get_column_letter
+import sys
 
 # Import all worksheet creation modules
 from Dashboard import create_dashboard
@@ -15,53 +13,315 @@ from OPEX_Budget import create_opex_budget
 from Income_Statement import create_income_statement
 from Balance_Sheet import create_balance_sheet
 from Cash_Flow import create_cash_flow
-from Stock_Valuation import create_stock_valuation
+from Stock_Valuation import create_stock_valuation, create_valuation_surface
 from Bond_Valuation import create_bond_valuation
 from Capital_Budgeting import create_capital_budgeting
-from Sensitivity_Analysis import create_sensitivity_analysis
+from Sensitivity_Analysis import create_npv_heatmap, create_sensitivity_analysis
 from Contributions import create_contributions
+from Formula_Engine import evaluate_workbook
+from Streaming_Builder import StreamingWorkbook
+from Horizon import DEFAULT_HORIZON
+from Model_Inputs import DEFAULT_INPUTS, load_inputs
+from Instrumentation import instrument, json_lines
+from Build_Cache import SheetCache, CachedWorkbook
+from Workbook_Output import ModelWorkbook, is_path
+from Columnar_Export import model_table, write_table
 
-def create_financial_model(filename="Financial_Model.xlsx"):
-    """Create a complete financial model Excel workbook."""
-    print("Creating Financial Model...")
+def sheet_builders(assumptions=None, horizon=DEFAULT_HORIZON, bond=None, compact_bond=False,
+                   inputs=DEFAULT_INPUTS, heatmap=None):
+    """Sheets in workbook order with the function that fills each one."""
+    # Every builder only writes to its own sheet, so a sheet is complete
+    # once its builder has run.
+    builders = [
+        ("Dashboard", lambda wb: create_dashboard(wb, horizon)),
+        ("Business_Overview", create_business_overview),
+        ("Assumptions", lambda wb: create_assumptions(wb, assumptions, horizon)),
+        ("Revenue_Forecast", lambda wb: create_revenue_forecast(wb, horizon, inputs)),
+        ("COGS_Budget", lambda wb: create_cogs_budget(wb, horizon)),
+        ("OPEX_Budget", lambda wb: create_opex_budget(wb, horizon, inputs)),
+        ("Income_Statement", lambda wb: create_income_statement(wb, horizon, inputs)),
+        ("Balance_Sheet", lambda wb: create_balance_sheet(wb, horizon, inputs)),
+        ("Cash_Flow", lambda wb: create_cash_flow(wb, horizon, inputs)),
+        ("Stock_Valuation", lambda wb: create_stock_valuation(wb, horizon, inputs)),
+        ("DCF_Surface", lambda wb: create_valuation_surface(wb, horizon=horizon)),
+        ("Bond_Valuation", lambda wb: create_bond_valuation(wb, bond, compact_bond)),
+        ("Capital_Budgeting", lambda wb: create_capital_budgeting(wb, inputs)),
+        ("Sensitivity_Analysis", lambda wb: create_sensitivity_analysis(wb, inputs=inputs)),
+        ("Contributions", create_contributions),
+    ]
+    if heatmap:
+        builders.append(("NPV_Heatmap", lambda wb: create_npv_heatmap(wb, **heatmap, inputs=inputs)))
+    return builders
+
+# Builder arguments and Model_Inputs fields each sheet's content depends
+# on, used to key the build cache. DCF_Surface values the model natively
+# from every sheet before it and Sensitivity_Analysis reads the discount
+# rate from Assumptions, so they depend on those sheets' inputs too.
+STATEMENT_INPUTS = ("base_revenues", "depreciation", "interest_expense", "capex", "dividends",
+                    "working_capital_changes", "debt_repayment", "opening_cash", "opening_ppe",
+                    "opening_debt", "common_stock", "opening_retained_earnings", "shares_outstanding")
+PROJECT_INPUTS = ("initial_investment", "salvage_value", "project_cash_flows")
+SHEET_INPUTS = {
+    "Dashboard": ("horizon",),
+    "Business_Overview": (),
+    "Assumptions": ("assumptions", "horizon"),
+    "Revenue_Forecast": ("horizon", "base_revenues"),
+    "COGS_Budget": ("horizon",),
+    "OPEX_Budget": ("horizon", "depreciation"),
+    "Income_Statement": ("horizon", "interest_expense"),
+    "Balance_Sheet": ("horizon", "opening_cash", "opening_ppe", "capex", "opening_debt", "debt_repayment",
+                      "common_stock", "opening_retained_earnings", "dividends"),
+    "Cash_Flow": ("horizon", "working_capital_changes", "capex", "debt_repayment", "dividends", "opening_cash"),
+    "Stock_Valuation": ("horizon", "shares_outstanding"),
+    "DCF_Surface": ("assumptions", "horizon") + STATEMENT_INPUTS,
+    "Bond_Valuation": ("bond", "compact_bond"),
+    "Capital_Budgeting": PROJECT_INPUTS,
+    "Sensitivity_Analysis": ("assumptions",) + PROJECT_INPUTS,
+    "Contributions": (),
+    "NPV_Heatmap": ("heatmap",) + PROJECT_INPUTS,
+}
+# Sheets a builder reads values from, which must be built in memory when
+# it is rebuilt (None: every earlier sheet)
+READS_SHEETS = {"DCF_Surface": None, "Sensitivity_Analysis": ("Assumptions",)}
+# Builders that set column widths first and then write each row whole, top
+# to bottom; in streaming mode their rows are written out as they are built
+ROW_ORDER_SHEETS = ("Dashboard", "Revenue_Forecast", "COGS_Budget", "OPEX_Budget", "Income_Statement",
+                    "Balance_Sheet", "Cash_Flow", "Stock_Valuation")
+
+@contextlib.contextmanager
+def build_step(step, wb, on_step=None, quiet=False, sheet=None, trace_memory=True):
+    """Run one build step, measured with Instrumentation.instrument if on_step is given.
+
+    quiet discards the progress lines the step prints.
+    """
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        if on_step:
+            stack.enter_context(instrument(step, wb, on_step, sheet, trace_memory))
+        yield
+
+def build_workbook(assumptions=None, streaming=False, horizon=DEFAULT_HORIZON, bond=None,
+                   compact_bond=False, on_step=None, quiet=False, trace_memory=True, cache=None,
+                   inputs=None, in_memory=False, heatmap=None):
+    """Build the complete financial model workbook in memory.
+
+    inputs is a Model_Inputs.ModelInputs with the company's figures
+    (see Model_Inputs.load_inputs); the built-in example company is used
+    if it is not given.
+
+    assumptions optionally overrides Assumptions sheet inputs by label,
+    e.g. {"Tax Rate": 0.21, "Discount Rate (WACC)": 0.09}, on top of any
+    in inputs.assumptions.
+
+    horizon is a Horizon giving the first year, number of periods and
+    annual/quarterly/monthly granularity shared by every statement.
+
+    bond optionally overrides the Bond_Valuation terms given by
+    inputs.bond; compact_bond prices it in closed form
+    instead of writing one cash flow row per period.
 
-    # Create a new workbook
-    wb = Workbook()
+    heatmap optionally adds an NPV_Heatmap sheet for the project in inputs:
+    a dict of Sensitivity_Analysis.create_npv_heatmap arguments (row_input,
+    row_values, col_input, col_values and optionally discount_rate).
+
+    With streaming=True the workbook is built in openpyxl write-only mode.
+    The sheets in ROW_ORDER_SHEETS are written out row by row while their
+    builders run; every other sheet is written out when its builder
+    finishes. Sheets go to temporary files unless in_memory is set. Formula
+    values are calculated row by row as they are written (see
+    Formula_Engine.StreamCalculator) and only those values are kept, as
+    plain numbers, for the later builders that read them. Peak memory
+    barely grows with the horizon (17 MB at 60 monthly periods, 21 MB at
+    600, most of it Sensitivity_Analysis's Monte Carlo run), but the
+    calculation makes the build slower than a regular one.
+
+    The workbook's save(filename=None, compresslevel=None) writes to a
+    filename or any writable binary stream, returns the bytes when no
+    filename is given and never uses temporary files itself (see
+    Workbook_Output).
+
+    on_step, if given, is called with a record of wall time, CPU time,
+    cells written, styles created and tracemalloc peak for every sheet
+    (see Instrumentation.instrument; trace_memory=False skips the memory
+    tracing). quiet suppresses the per-sheet progress output.
+
+    cache, a Build_Cache.SheetCache, skips every sheet whose builder inputs
+    and code are unchanged since it was last saved: the sheet is left empty
+    and its cached XML is spliced into the file by wb.save (not supported
+    with streaming=True).
+    """
+    inputs = inputs or DEFAULT_INPUTS
+    assumptions = {**inputs.assumptions, **(assumptions or {})}
+    bond = {**inputs.bond, **(bond or {})}
     
-    # Remove the default sheet
-    default_sheet = wb.active
-    wb.remove(default_sheet)
+    if cache is not None:
+        if streaming:
+            raise ValueError("the build cache cannot be combined with streaming mode")
+        wb = CachedWorkbook(cache)
+        wb.remove(wb.active)
+    elif streaming:
+        wb = StreamingWorkbook(in_memory, ROW_ORDER_SHEETS)
+    else:
+        # Create a new workbook
+        wb = ModelWorkbook()
+
+        # Remove the default sheet
+        default_sheet = wb.active
+        wb.remove(default_sheet)
     
-    # Create all sheets
-    sheets = [
-        "Dashboard", "Business_Overview", "Assumptions", "Revenue_Forecast",
-        "COGS_Budget", "OPEX_Budget", "Income_Statement", "Balance_Sheet",
-        "Cash_Flow", "Stock_Valuation", "Bond_Valuation", "Capital_Budgeting",
-        "Sensitivity_Analysis", "Contributions"
-    ]
+    builders = sheet_builders(assumptions, horizon, bond, compact_bond, inputs, heatmap)
     
-    for sheet_name in sheets:
+    # Create all sheets
+    for sheet_name, _ in builders:
         wb.create_sheet(sheet_name)
     
+    skip = set()
+    if cache is not None:
+        # Grid axes as plain lists: the repr of a long NumPy array is abbreviated
+        values = dict(inputs.as_dict(), assumptions=assumptions, horizon=horizon, bond=bond,
+                      compact_bond=compact_bond,
+                      heatmap={name: [float(v) for v in value] if name.endswith("_values") else value
+                               for name, value in (heatmap or {}).items()})
+        for position, (sheet_name, _) in enumerate(builders):
+            key = cache.key(sheet_name, position, {name: values[name] for name in SHEET_INPUTS[sheet_name]})
+            wb.keys[sheet_name] = key
+            entry = cache.load(key)
+            if entry is not None:
+                wb.cached[sheet_name] = entry
+        skip = set(wb.cached)
+        # A sheet that has to be rebuilt from other sheets needs them in memory
+        for position, (sheet_name, _) in enumerate(builders):
+            if sheet_name in READS_SHEETS and sheet_name not in wb.cached:
+                reads = READS_SHEETS[sheet_name]
+                skip -= {name for name, _ in builders[:position]} if reads is None else set(reads)
+    
     # Set up each sheet with the corresponding function
-    create_dashboard(wb)
-    create_business_overview(wb)
-    create_assumptions(wb)
-    create_revenue_forecast(wb)
-    create_cogs_budget(wb)
-    create_opex_budget(wb)
-    create_income_statement(wb)
-    create_balance_sheet(wb)
-    create_cash_flow(wb)
-    create_stock_valuation(wb)
-    create_bond_valuation(wb)
-    create_capital_budgeting(wb)
-    create_sensitivity_analysis(wb)
-    create_contributions(wb)
+    for sheet_name, builder in builders:
+        if sheet_name in skip:
+            continue
+        with build_step(sheet_name, wb, on_step, quiet, sheet_name, trace_memory):
+            builder(wb)
+            if streaming:
+                wb.flush(sheet_name)
+    
+    return wb
+
+def create_financial_model(filename="Financial_Model.xlsx", assumptions=None, streaming=False,
+                           horizon=DEFAULT_HORIZON, bond=None, compact_bond=False, on_step=None,
+                           quiet=False, trace_memory=True, cache=None, inputs=None, export=None,
+                           compresslevel=None, cached_values=False):
+    """Create a complete financial model Excel workbook.
+
+    filename is a path or a writable binary stream, which is returned after
+    the workbook is written to it; with filename=None the workbook's bytes
+    are returned instead. Neither touches the filesystem. compresslevel is
+    the zip compression level, from 0 (fastest) to 9 (smallest).
+
+    inputs, on_step, quiet, trace_memory and cache are as for build_workbook;
+    on_step also receives a "save" record for writing the file.
+
+    export optionally names a .parquet or .arrow file to also write the
+    computed statements and DCF valuation to as one columnar table (see
+    Columnar_Export; needs pyarrow and a build without a cache).
+
+    cached_values calculates the model natively and writes each formula's
+    computed value alongside it, so tools reading cached values (e.g.
+    load_workbook(data_only=True)) see numbers instead of None. It needs a
+    regular build, without streaming or a cache.
+    """
+    if export and cache is not None:
+        raise ValueError("export needs every sheet in memory and cannot be combined with the build cache")
+    if cached_values and (streaming or cache is not None):
+        raise ValueError("cached values need every sheet in memory and cannot be combined with "
+                         "streaming or the build cache")
+    if not quiet:
+        print("Creating Financial Model...")
+
+    wb = build_workbook(assumptions, streaming=streaming, horizon=horizon, bond=bond,
+                        compact_bond=compact_bond, on_step=on_step, quiet=quiet,
+                        trace_memory=trace_memory, cache=cache, inputs=inputs,
+                        in_memory=not is_path(filename))
     
     # Save the workbook
-    wb.save(filename)
-    print(f"Financial model created successfully and saved as {filename}")
+    with build_step("save", wb, on_step, quiet, trace_memory=trace_memory):
+        data = wb.save(filename, compresslevel, cached_values)
+    if export:
+        with build_step("export", wb, on_step, quiet, trace_memory=trace_memory):
+            write_table(model_table(wb, company_id=inputs.company_id if inputs else ""), export)
+    if not quiet:
+        print(f"Financial model created successfully and saved as {filename}" if is_path(filename)
+              else "Financial model created successfully")
+    return filename if data is None else data
+
+def evaluate_financial_model(wb=None):
+    """Calculate the financial model natively and return the FormulaEngine.
+
+    Values are then available by address, for example
+    engine["Stock_Valuation!B28"] for the DCF share price.
+    """
+    if wb is None:
+        wb = build_workbook()
+    return evaluate_workbook(wb)
+
+def report_import_time(top=15):
+    """Print the cold-start import time of the generator, slowest modules first.
+
+    Runs `python -X importtime -c "import main"` in a fresh interpreter so
+    nothing is already cached in sys.modules, and returns the total in
+    seconds.
+    """
+    import subprocess
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True)
+    
+    # Lines look like "import time: <self us> | <cumulative us> | <indented module>"
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative), int(own), name.rstrip()))
+    total = next(cumulative for cumulative, _, name in modules if name.strip() == "main")
+    
+    print(f"Cold start (import main): {total / 1000:.1f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, own, name in sorted(modules, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>14.1f} {own / 1000:>9.1f} {name}")
+    return total / 1e6
 
 if __name__ == "__main__":
-    create_financial_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate the financial model workbook.")
+    parser.add_argument("filename", nargs="?", default="Financial_Model.xlsx")
+    parser.add_argument("--streaming", action="store_true", help="build in write-only streaming mode")
+    parser.add_argument("--quiet", action="store_true", help="do not print progress")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write per-sheet timing and memory records as JSON lines ('-' for stdout)")
+    parser.add_argument("--inputs", metavar="FILE",
+                        help="company inputs as JSON, YAML or CSV (the first entry if the file holds several)")
+    parser.add_argument("--compresslevel", type=int, choices=range(10), metavar="0-9",
+                        help="zip compression level of the workbook (default 6)")
+    parser.add_argument("--export", metavar="FILE",
+                        help="also write the computed statements to a .parquet or .arrow file")
+    parser.add_argument("--cache", metavar="DIR", help="reuse unchanged sheets from a build cache directory")
+    parser.add_argument("--cached-values", action="store_true",
+                        help="calculate the model and save each formula's value with it, for readers of cached values")
+    parser.add_argument("--import-time", action="store_true",
+                        help="report the generator's cold-start import time by module and exit")
+    args = parser.parse_args()
+    
+    if args.import_time:
+        report_import_time()
+    else:
+        with contextlib.ExitStack() as stack:
+            on_step = None
+            if args.metrics:
+                metrics = sys.stdout if args.metrics == "-" else stack.enter_context(open(args.metrics, "w"))
+                on_step = json_lines(metrics)
+            cache = SheetCache(args.cache) if args.cache else None
+            inputs = load_inputs(args.inputs)[0] if args.inputs else None
+            create_financial_model(args.filename, streaming=args.streaming, on_step=on_step, quiet=args.quiet,
+                                   cache=cache, inputs=inputs, export=args.export,
+                                   compresslevel=args.compresslevel, cached_values=args.cached_values)
\ No newline at end of file
@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+import pytest
+
+from Capital_Budgeting import ANNUAL_CASH_FLOWS
+from Formula_Engine import FormulaEngine, evaluate_workbook
+from main import build_workbook
+
+
+def build(**kwargs):
+    return build_workbook(quiet=True, trace_memory=False, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return evaluate_workbook(build())
+
+
+def test_default_model_values(engine):
+    # Known results of the default build
+    assert engine["Stock_Valuation!B28"] == pytest.approx(10.715222703139581, rel=1e-12)
+    assert engine["Capital_Budgeting!B18"] == pytest.approx(172545.9637009393, rel=1e-12)
+    assert engine["Capital_Budgeting!B22"] == pytest.approx(0.2105070523024505, rel=1e-9)
+    assert engine["Capital_Budgeting!B26"] == pytest.approx(4.277777777777778, rel=1e-12)
+
+
+def test_capital_budgeting_npv_matches_discounting(engine):
+    # Sum of the discounted cash flows written to the sheet, period 0 included
+    rate = engine["Capital_Budgeting!B6"]
+    flows = [engine[f"Capital_Budgeting!B{row}"] for row in range(10, 10 + len(ANNUAL_CASH_FLOWS) + 1)]
+    expected = sum(flow / (1 + rate) ** year for year, flow in enumerate(flows))
+    assert engine["Capital_Budgeting!B18"] == pytest.approx(expected, rel=1e-12)
+
+
+def test_recalculate_matches_fresh_build():
+    engine = evaluate_workbook(build())
+    engine.set_value("Assumptions!B6", 0.3)
+    assert engine.recalculate() > 0
+    assert engine.recalculate() == 0
+
+    # Formula cells only: sheets such as DCF_Surface hold values computed at build time
+    fresh = evaluate_workbook(build(assumptions={"Tax Rate": 0.3}))
+    for title, cells in fresh.formula_values().items():
+        for (row, col), value in cells.items():
+            reference = fresh.address(fresh._index[title, row, col])
+            if isinstance(value, float):
+                assert engine[reference] == pytest.approx(value, rel=1e-12, nan_ok=True), reference
+            else:
+                assert engine[reference] == value, reference
+
+
+def test_scenarios_match_scalar_evaluation():
+    # Growth equal to WACC (0.10) divides by zero in the terminal value
+    growth = [0.0, 0.025, 0.1, 0.15]
+    wacc = [0.08, 0.1, 0.1, 0.12]
+    outputs = ["Stock_Valuation!B18", "Stock_Valuation!B28", "Capital_Budgeting!B18"]
+
+    engine = evaluate_workbook(build())
+    scenarios = engine.calculate_scenarios({"Stock_Valuation!B6": growth, "Assumptions!B22": wacc})
+    arrays = {reference: np.broadcast_to(scenarios[reference], len(growth)) for reference in outputs}
+
+    for i, (g, w) in enumerate(zip(growth, wacc)):
+        engine.set_values({"Stock_Valuation!B6": g, "Assumptions!B22": w})
+        engine.recalculate()
+        for reference in outputs:
+            scalar = float(engine[reference])
+            assert arrays[reference][i] == pytest.approx(scalar, rel=1e-12, nan_ok=True), (reference, i)
+    assert math.isnan(arrays["Stock_Valuation!B28"][2])
+
+
+def test_error_values_are_nan():
+    engine = FormulaEngine({"S": {(1, 1): 0, (1, 2): 1, (1, 3): -1,
+                                  (2, 1): "=1/A1", (2, 2): "=IRR(B1:B1)", (2, 3): "=MATCH(5,A1:B1,0)"}})
+    engine.calculate()
+    assert all(math.isnan(engine[f"S!{col}2"]) for col in "ABC")
+    scenarios = engine.calculate_scenarios({"S!A1": [0, 2]})
+    assert math.isnan(scenarios["S!A2"][0]) and scenarios["S!A2"][1] == 0.5